@@ -5,14 +5,16 @@ import click
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
-from clean import load_data, save_overview, handle_missing_values, handle_duplicates, save_cleaned_data
 
 
 @click.command()
 @click.option('--input_path', type=str, required=True, help="Path to the raw data file")
 @click.option('--output_path', type=str, required=True, help="Path to save the cleaned data file")
 @click.option('--log_path', type=str, required=True, help="Path to directory where logs will be saved")
-def main(input_path, output_path, log_path):
+@click.option('--chunksize', type=int, default=None, help="Clean the raw file in chunks of this many rows to bound memory use")
+@click.option('--index_path', type=str, default=None, help="Path of a persistent row-hash index to deduplicate new batches against")
+@click.option('--float32', is_flag=True, help="Parse float columns as float32 to halve their memory")
+def main(input_path, output_path, log_path, chunksize, index_path, float32):
     """
     Cleans data from a local relative path, saves the cleaned output, and logs details.
 
@@ -24,23 +26,44 @@ def main(input_path, output_path, log_path):
         Relative path to save the cleaned data file.
     log_path : str
         Directory path to save the logs as CSV files.
+    chunksize : int, optional
+        Number of rows per chunk. When given, the raw file is streamed and cleaned chunk by chunk
+        instead of being loaded whole; the output must then be a CSV file.
+    index_path : str, optional
+        Path of a persistent row-hash index (.npz). Rows already recorded in it are treated as
+        duplicates, and the rows kept in this run are added to it.
+    float32 : bool
+        Whether to parse float columns as float32 instead of float64.
 
     Returns:
     -------
     None
     """
+    from clean import load_data, save_overview, handle_missing_values, handle_duplicates, save_cleaned_data, clean_in_chunks
+    from profiler import DatasetProfile
+    from validation import schema
     try:
+        if chunksize is not None:
+            profile = clean_in_chunks(input_path, output_path, log_path, chunksize, index_path)
+            profile.save(os.path.join(log_path, "raw_profile.pickle"))
+            print(f"Cleaned data saved to {output_path}.")
+            return
+
         # Load the dataset
-        df = load_data(input_path)
+        df = load_data(input_path, schema, "float32" if float32 else "float64")
+
+        # Profile the dataset once; the overview and missing values reports are derived from it
+        profile = DatasetProfile.from_frame(df)
+        profile.save(os.path.join(log_path, "raw_profile.pickle"))
         
         # Save dataset overview
-        save_overview(df, log_path)
+        save_overview(df, log_path, profile)
 
         # Handle missing values
-        handle_missing_values(df, log_path)
+        handle_missing_values(df, log_path, profile)
 
         # Handle duplicates
-        df = handle_duplicates(df, log_path)
+        df = handle_duplicates(df, log_path, index_path)
 
         # Save cleaned data
         save_cleaned_data(df, output_path)
@@ -0,0 +1,103 @@
+import click
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+
+# Script, short help and src modules of every stage. Scripts are only imported when their
+# command runs, and import their own heavy dependencies inside main().
+STAGES = {
+    "download": ("download_data", "Download and extract the raw data.",
+                 ["download_file", "extract_specific_file", "raw_data_cache"]),
+    "clean": ("clean_data", "Clean the raw data and log an overview.",
+              ["clean", "profiler", "validation"]),
+    "validate": ("data_validation_script", "Validate a CSV file against the schema.",
+                 ["validation"]),
+    "split-eda": ("split_eda", "Split the cleaned data and render the EDA charts.",
+                  ["train_test_split", "eda_charts"]),
+    "select": ("preprocess_model_selection", "Cross-validate the candidate models and save the best one.",
+               ["cross_val_scores", "fold_cache", "artifacts"]),
+    "tune": ("tuning_script", "Fine-tune the selected model.",
+             ["model_tuning", "hyperparameter_search", "fold_cache", "trial_store"]),
+    "evaluate": ("model_evaluation", "Score the tuned model on the test set.",
+                 ["multiconfusion_matrix", "summarize_conf_matrix", "artifacts"]),
+    "pipeline": ("run_pipeline", "Run every stage in one process, skipping unchanged ones.",
+                 ["pipeline"]),
+}
+
+
+class LazyGroup(click.Group):
+    """
+    Click group whose stage commands are imported from their scripts on first use.
+    """
+
+    def list_commands(self, ctx):
+        return list(STAGES) + super().list_commands(ctx)
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in STAGES:
+            import importlib
+            return importlib.import_module(STAGES[cmd_name][0]).main
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        # List the stages from STAGES so that --help does not import any script
+        rows = [(name, short_help) for name, (_, short_help, _) in STAGES.items()]
+        rows += [(name, self.commands[name].get_short_help_str()) for name in super().list_commands(ctx)]
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
+
+
+@click.group(cls=LazyGroup)
+def cli():
+    """
+    Wine quality predictor pipeline. Every stage can also be run from its own script.
+    """
+
+
+@cli.command(short_help="Report import times and check the startup budget.")
+@click.argument("command", required=False, type=click.Choice(list(STAGES)))
+@click.option("--stage", is_flag=True, help="Profile the imports of running the stage instead of the CLI startup.")
+@click.option("--top", type=int, default=15, show_default=True, help="Number of slowest top-level imports listed.")
+@click.option("--budget", type=float, default=None, help="Startup budget in milliseconds (defaults to the documented budget).")
+def importtime(command, stage, top, budget):
+    """
+    Report the time spent importing modules, in the style of python -X importtime.
+
+    By default it profiles printing the help of the CLI, or of COMMAND, and fails when the
+    startup exceeds the budget or imports a heavy package. With --stage it profiles importing
+    the src modules that COMMAND runs.
+    """
+    sys.path.insert(0, SRC_DIR)
+    from startup import STARTUP_BUDGET_MS, import_profile, heavy_imports, startup_time, budget_error
+
+    if stage:
+        if command is None:
+            raise click.UsageError("--stage requires a COMMAND.")
+        modules = STAGES[command][2]
+        args = ["-c", f"import sys; sys.path.insert(0, {SRC_DIR!r}); import {', '.join(modules)}"]
+    else:
+        args = [os.path.abspath(__file__)] + ([command] if command else []) + ["--help"]
+    records = import_profile(args)
+
+    top_level = sorted((r for r in records if r[3] == 0), key=lambda r: r[2], reverse=True)
+    click.echo(f"{'cumulative [ms]':>16} {'self [ms]':>10}  module")
+    for module, self_us, cumulative_us, _ in top_level[:top]:
+        click.echo(f"{cumulative_us / 1000:16.1f} {self_us / 1000:10.1f}  {module}")
+    click.echo(f"Total import time: {sum(r[2] for r in top_level) / 1000:.1f} ms in {len(records)} modules")
+    heavy = heavy_imports(records)
+    click.echo(f"Heavy packages imported: {', '.join(heavy) if heavy else 'none'}")
+    if stage:
+        return
+
+    budget = STARTUP_BUDGET_MS if budget is None else budget
+    elapsed = startup_time(args)
+    click.echo(f"Startup time: {elapsed:.0f} ms (budget {budget:.0f} ms)")
+    error = budget_error(elapsed, budget, heavy)
+    if error:
+        raise click.ClickException(error)
+
+
+if __name__ == "__main__":
+    cli()
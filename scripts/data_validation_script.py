@@ -5,17 +5,28 @@ import click
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
-from validation import validate_dataset
 
 @click.command()
 @click.argument("input_path", type=click.Path(exists=True), nargs=1)
-def main(input_path):
+@click.option("--pps_sample_size", type=int, default=None, help="Rows sampled, stratified by quality, to compute the feature-label correlation on")
+@click.option("--pps_margin", type=float, default=0.05, help="Sampled scores within this distance of the threshold are recomputed on the full data (a fixed heuristic, not a confidence bound)")
+@click.option("--cache_dir", type=str, default=None, help="Directory caching feature-label correlation results")
+@click.option("--chunksize", type=int, default=None, help="Validate the CSV file in parallel chunks of about this many bytes")
+@click.option("--workers", type=int, default=None, help="Number of worker processes for chunked validation (defaults to the number of CPUs)")
+def main(input_path, pps_sample_size, pps_margin, cache_dir, chunksize, workers):
     """
     Validates the input CSV file against the predefined schema.
     
     input_path: Path to the CSV file to validate.
     """
-    validate_dataset(input_path)
+    from validation import validate_dataset, validate_in_chunks
+    if chunksize is not None:
+        if pps_sample_size is None:
+            raise click.UsageError("--chunksize requires --pps_sample_size, so the chunks are not all held in memory.")
+        validate_in_chunks(input_path, chunksize, workers, pps_sample_size=pps_sample_size,
+                           pps_margin=pps_margin, cache_dir=cache_dir)
+        return
+    validate_dataset(input_path, pps_sample_size=pps_sample_size, pps_margin=pps_margin, cache_dir=cache_dir)
 
 if __name__ == "__main__":
     main()
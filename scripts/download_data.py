@@ -7,51 +7,92 @@ import click
 import os
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
-from download_file import download_file
-from extract_specific_file import extract_specific_file
+import raw_data_cache
 
 
 @click.command()
 @click.option("--url", type=str, help="URL to download data as zip file from the Internet.")
 @click.option("--write_to", type=str, help="Path to save downloaded zip file.")
-def main(url, write_to):
+@click.option("--cache_dir", type=str, default=raw_data_cache.DEFAULT_CACHE_DIR, show_default=True,
+              help="Directory of the local raw-data cache.")
+@click.option("--cache_max_bytes", type=int, default=raw_data_cache.DEFAULT_MAX_BYTES, show_default=True,
+              help="Maximum size of the raw-data cache before least recently used files are evicted.")
+@click.option("--no_cache", is_flag=True, help="Always download and do not use the raw-data cache.")
+@click.option("--offline", is_flag=True, help="Only serve data from the cache and fail if it is missing.")
+def main(url, write_to, cache_dir, cache_max_bytes, no_cache, offline):
     """
     Downloads data zip data from the web to a local filepath and extracts it.
 
+    Downloads and extracted files are kept in a content-addressed cache keyed on the URL and
+    the server's ETag/Last-Modified header, so an unchanged file is copied into place without
+    being downloaded or extracted again.
+
     Parameters:
     ----------
     url : str
         The URL of the zip file to download.
     write_to : str
         The directory where the contents of the zip file will be extracted.
+    cache_dir : str
+        Directory of the local raw-data cache.
+    cache_max_bytes : int
+        Maximum size of the raw-data cache.
+    no_cache : bool
+        Whether to bypass the cache.
+    offline : bool
+        Whether to serve only from the cache without touching the network.
 
     Returns:
     -------
     None
     """
+    from download_file import download_file
+    from extract_specific_file import extract_files
+
     zip_path = os.path.join(write_to, "raw_data.zip")
     target_file = "winequality-red.csv"
     raw_data_file = "raw_data.csv"
+    raw_data_path = os.path.join(write_to, raw_data_file)
+
+    if offline and no_cache:
+        raise click.UsageError("--offline requires the cache and cannot be combined with --no_cache.")
 
     try:
-        download_file(url, zip_path)
-        print(f"File successfully downloaded from {url} to {zip_path}")
-
-        # Extract the specific file
-        extracted_file_path = os.path.join(write_to, target_file)
-        extract_specific_file(zip_path, target_file, extracted_file_path)
-        print(f"Extracted {target_file} to {write_to}")
-        
-        # Rename the extracted file
-        renamed_file_path = os.path.join(write_to, raw_data_file)
-        try:
-            os.rename(extracted_file_path, renamed_file_path)
-            print(f"Renamed {target_file} to {raw_data_file}")
-        except OSError as e:
-            raise OSError(f"Failed to rename file {extracted_file_path} to {renamed_file_path}. Error: {e}")
-            
+        if no_cache:
+            download_file(url, zip_path)
+            print(f"File successfully downloaded from {url} to {zip_path}")
+            extract_files(zip_path, {target_file: raw_data_path})
+            print(f"Extracted {target_file} to {raw_data_path}")
+            return
+
+        validator = None if offline else raw_data_cache.get_validator(url)
+
+        # Serve the extracted file straight from the cache when the remote file is unchanged
+        cached_member = raw_data_cache.lookup(cache_dir, url, validator, member=target_file, offline=offline)
+        if cached_member is not None:
+            raw_data_cache.materialize(cached_member, raw_data_path)
+            print(f"Copied cached {target_file} to {raw_data_path}")
+            return
+
+        cached_zip = raw_data_cache.lookup(cache_dir, url, validator, offline=offline)
+        if cached_zip is not None:
+            raw_data_cache.materialize(cached_zip, zip_path)
+            print(f"Copied cached download of {url} to {zip_path}")
+        elif offline:
+            raise FileNotFoundError(f"Offline mode: no cached copy of {url} in {cache_dir}.")
+        else:
+            download_file(url, zip_path)
+            print(f"File successfully downloaded from {url} to {zip_path}")
+            raw_data_cache.store(cache_dir, zip_path, url, validator, max_bytes=cache_max_bytes)
+
+        extract_files(zip_path, {target_file: raw_data_path})
+        print(f"Extracted {target_file} to {raw_data_path}")
+        raw_data_cache.store(cache_dir, raw_data_path, url, validator, member=target_file, max_bytes=cache_max_bytes)
+
     except Exception as e:
         print(f"An error occurred: {e}")
+        if offline:
+            sys.exit(1)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
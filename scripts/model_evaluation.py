@@ -1,24 +1,23 @@
 # Author: Timothy Singh
 # Date: 2024-12-07
 
-import pandas as pd
-import numpy as np
 import os
 import click
 import pickle
-import matplotlib.pyplot as plt
-from sklearn.metrics import multilabel_confusion_matrix, ConfusionMatrixDisplay
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
-from multiconfusion_matrix import save_confusion_matrix_multi
-from summarize_conf_matrix import summarize_conf_matrix
 
 @click.command()
 @click.option("--tuned_model_path", type=str, help="Path to access tuned model.")
 @click.option("--test_split_path", type=str, help="Path to access testing data.")
 @click.option("--test_accuracy_path", type=str, help="Path to save the test accuracy score.")
 @click.option("--figures_path", type=str, help="Path to save any figures from evaluation.")
-def main(tuned_model_path, test_split_path, test_accuracy_path, figures_path):
+@click.option("--data_format", type=click.Choice(["csv", "npy", "index"]), default="csv", show_default=True,
+              help="Artifact format of the train-test split files.")
+@click.option("--confusion_layout", type=click.Choice(["separate", "grid"]), default="separate", show_default=True,
+              help="Save one confusion matrix png per class, or all of them as panels of one figure.")
+@click.option("--no_figures", is_flag=True, help="Only compute and summarize the confusion matrices, without saving figures.")
+def main(tuned_model_path, test_split_path, test_accuracy_path, figures_path, data_format, confusion_layout, no_figures):
     """
     Finds the accuracy of the model for predictions on the testing set.
     Creates and saves confusion matrices using the One vs Rest method of comparison 
@@ -29,14 +28,22 @@ def main(tuned_model_path, test_split_path, test_accuracy_path, figures_path):
     test_split_path: Relative path to testing split of the data set.
     test_accuracy_path: Relative path to save test accuracy.
     figures_path: Path to save any figures from evaluation.
+    data_format: Artifact format of the train-test split files.
+    confusion_layout: "separate" for one png per class or "grid" for a single figure.
+    no_figures: Whether to skip saving the confusion matrix figures.
     """
+    import pandas as pd
+    import numpy as np
+    from multiconfusion_matrix import save_confusion_matrix_multi
+    from summarize_conf_matrix import summarize_conf_matrix
+    from artifacts import artifact_path, load_frame
     # Retrieve tuned model
     with open(tuned_model_path, 'rb') as f:
         best_model = pickle.load(f)
     
     # Retrieve testing set
-    X_test = pd.read_csv(f"{test_split_path}X_test.csv")
-    y_test = pd.read_csv(f"{test_split_path}y_test.csv")
+    X_test = load_frame(artifact_path(test_split_path, "X_test", data_format))
+    y_test = load_frame(artifact_path(test_split_path, "y_test", data_format))
 
     # Calculate Test Score    
     test_score = best_model.score(X_test, y_test)
@@ -44,14 +51,16 @@ def main(tuned_model_path, test_split_path, test_accuracy_path, figures_path):
 
     #Ensuring path exists for saving figures and tables:
     os.makedirs(test_accuracy_path, exist_ok=True)
-    os.makedirs(figures_path, exist_ok=True)
+    if not no_figures:
+        os.makedirs(figures_path, exist_ok=True)
 
     # Save test_accuracy_df to .csv file to scores_path
     test_accuracy_df.to_csv(os.path.join(test_accuracy_path, "test_accuracy.csv"), index=False)
     print(f"Saved test_accuracy.csv to {test_accuracy_path}")
 
     # Generate and save multi-class confusion matrices
-    confusion_matrix = save_confusion_matrix_multi(best_model, X_test, y_test, figures_path)
+    confusion_matrix = save_confusion_matrix_multi(best_model, X_test, y_test, figures_path,
+                                                   figures=not no_figures, layout=confusion_layout)
  
     # Create a DataFrame to summarize confusion matrices
     conf_matrix_summary = summarize_conf_matrix(confusion_matrix, np.unique(y_test))
@@ -1,30 +1,31 @@
 # Author: Timothy Singh
 # Date: 2024-12-07
 
-import pandas as pd
 import click
 import pickle
 import os
-from sklearn.model_selection import cross_validate
-from sklearn.compose import make_column_transformer
-from sklearn.pipeline import make_pipeline
-from sklearn.preprocessing import StandardScaler
-from sklearn.dummy import DummyClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.naive_bayes import GaussianNB
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.svm import SVC
-from sklearn.neighbors import KNeighborsClassifier
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
-from cross_val_scores import get_cross_val_scores
 
 @click.command()
 @click.option("--train_data_path", type=str, help="Relative path to retrieve training data.")
 @click.option("--scores_path", type=str, help="Relative path to save training and validation scores.")
 @click.option("--preprocessor_path", type=str, help="Relative path to save the preprocessor as .pickle file.")
 @click.option("--model_path", type=str, help="Relative path to save best performing model as .pickle file.")
-def main(train_data_path, scores_path, preprocessor_path, model_path):
+@click.option("--data_format", type=click.Choice(["csv", "npy", "index"]), default="csv", show_default=True,
+              help="Artifact format of the train-test split files.")
+@click.option("--n_jobs", type=int, default=-1, show_default=True,
+              help="Cores shared by the fits of every model and fold (-1 uses all of them, 1 runs them one after another).")
+@click.option("--min_throughput", type=float, default=None,
+              help="Fewest validation rows per second the selected model must predict (defaults to any speed).")
+@click.option("--race", is_flag=True,
+              help="Score the models fold by fold and drop the ones statistically worse than the leader.")
+@click.option("--confidence", type=float, default=0.95, show_default=True, help="Confidence level of the race eliminations.")
+@click.option("--max_fits", type=int, default=None, help="Most model fits of the race (defaults to no limit).")
+@click.option("--track_memory", is_flag=True,
+              help="Also report the peak memory of every fold, at the cost of fitting each fold a second time.")
+def main(train_data_path, scores_path, preprocessor_path, model_path, data_format, n_jobs, min_throughput,
+         race, confidence, max_fits, track_memory):
     """
     Creates preprocessor and pipelines, and evaluates the performance of different models on the training data. 
     Dumps the model with the best evaluation score as a .pickle file.
@@ -34,7 +35,26 @@ def main(train_data_path, scores_path, preprocessor_path, model_path):
     scores_path: Relative path to save training and validation scores.
     preprocessor_path: Relative path to save the preprocessor as .pickle file.
     model_path: Relative path to save best performing model as .picklefile.
+    data_format: Artifact format of the train-test split files.
+    n_jobs: Cores shared by the fits of every model and fold.
+    min_throughput: Fewest validation rows per second the selected model must predict.
+    race: Score the models fold by fold and drop the ones statistically worse than the leader.
+    confidence: Confidence level of the race eliminations.
+    max_fits: Most model fits of the race.
+    track_memory: Also report the peak memory of every fold.
     """
+    from sklearn.compose import make_column_transformer
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.dummy import DummyClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.naive_bayes import GaussianNB
+    from sklearn.tree import DecisionTreeClassifier
+    from sklearn.svm import SVC
+    from sklearn.neighbors import KNeighborsClassifier
+    from cross_val_scores import cross_validate_models, race_models, format_results, results_table, select_model
+    from fold_cache import shared_cache
+    from artifacts import artifact_path, load_frame
 
     # Ensuring file paths exists
     os.makedirs(scores_path, exist_ok=True)
@@ -42,8 +62,8 @@ def main(train_data_path, scores_path, preprocessor_path, model_path):
     os.makedirs(model_path, exist_ok=True)
 
     # Loading training set
-    X_train = pd.read_csv(f"{train_data_path}X_train.csv")
-    y_train = pd.read_csv(f"{train_data_path}y_train.csv")
+    X_train = load_frame(artifact_path(train_data_path, "X_train", data_format))
+    y_train = load_frame(artifact_path(train_data_path, "y_train", data_format))
     
     # Creating Column Transformer
     numeric_features = list(X_train.columns)
@@ -61,28 +81,24 @@ def main(train_data_path, scores_path, preprocessor_path, model_path):
         "log reg": LogisticRegression()
     }
     
-    # Creation of results dictionary
-    results= {}
+    # Creation of model pipelines and cross-evaluation of every (model, fold) pair on one worker pool,
+    # or of the models still racing, one fold at a time
+    model_pipelines = {model_key: make_pipeline(preprocessor, model) for model_key, model in models.items()}
+    if race:
+        results, finalists = race_models(model_pipelines, X_train, y_train, confidence=confidence,
+                                         max_fits=max_fits, n_jobs=n_jobs, track_memory=track_memory)
+    else:
+        results = cross_validate_models(model_pipelines, X_train, y_train, n_jobs=n_jobs, track_memory=track_memory)
+        finalists = list(results)
+    print(shared_cache().summary())
 
-    # Creation of model pipelines and cross-evaluation
-    for model_key, model in models.items():
-        model_pipeline = make_pipeline(
-            preprocessor,
-            model
-        )
-    
-        results[model_key] = get_cross_val_scores(model_pipeline,
-                                                       X_train,
-                                                       y_train)
-    
-    results_df = pd.DataFrame(results).T
-
-    # Save results_df to .csv file to scores_path
-    results_df.to_csv(os.path.join(scores_path, "initial_model_scores.csv"), index=True)
+    # Save the report table and the numeric results, with times, memory and throughput, to scores_path
+    format_results(results).to_csv(os.path.join(scores_path, "initial_model_scores.csv"), index=True)
+    results_table(results).to_csv(os.path.join(scores_path, "model_selection_results.csv"), index=True)
     print(f"Successfully saved cross validation results to {scores_path}.")
 
-    # Save model pipeline with best validation score to model_path
-    model_name = results_df["test_score"].idxmax()
+    # Save model pipeline with best mean validation score to model_path
+    model_name = select_model({model_key: results[model_key] for model_key in finalists}, min_throughput)
     model = make_pipeline(
             preprocessor,
             models[model_name]
@@ -0,0 +1,164 @@
+import click
+import importlib
+import sys
+import os
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.abspath(os.path.join(SCRIPTS_DIR, '../src'))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, SRC_DIR)
+from pipeline import Stage, local_modules, run_pipeline
+import raw_data_cache
+
+DATA_URL = "https://archive.ics.uci.edu/static/public/186/wine+quality.zip"
+STAGE_NAMES = ["download", "clean", "validate", "split", "eda", "select", "tune", "evaluate"]
+
+
+def script_stage(script):
+    """
+    Run the main command of a script in this process, importing the script on first use.
+    """
+    def run(**params):
+        importlib.import_module(script).main.callback(**params)
+    return run
+
+
+def run_eda(**params):
+    from eda_charts import run_eda_charts
+    run_eda_charts(**params)
+
+
+def artifact_files(path):
+    """
+    Files of a data artifact: .npy arrays come with a schema sidecar.
+    """
+    return [path, path + ".schema.json"] if path.endswith(".npy") else [path]
+
+
+def code(path):
+    return local_modules(path, [SCRIPTS_DIR, SRC_DIR])
+
+
+def build_stages(data_format="csv", split_format=None, eda_workers=1):
+    """
+    Declare the stages of the Makefile as a DAG, with the same files and default options.
+
+    Parameters:
+    ----------
+    data_format : str, optional
+        Format of the cleaned data (default is "csv").
+    split_format : str, optional
+        Format of the train-test split, including "index". Defaults to ``data_format``.
+    eda_workers : int, optional
+        Processes rendering the EDA charts (default is 1, rendering them in the EDA stage's
+        thread while model selection runs next to it).
+
+    Returns:
+    -------
+    list
+        The stages, in Makefile order.
+    """
+    split_format = split_format or data_format
+    cleaned = f"data/processed/cleaned_data.{data_format}"
+    split_file = "data/processed/split.npz"
+    parts = {part: f"data/processed/{part}.{split_format}" for part in ["X_train", "y_train", "X_test", "y_test"]}
+    if split_format == "index":
+        # Index views are materialized from the cleaned data when loaded
+        split_inputs = {part: [split_file] + artifact_files(cleaned) for part in parts}
+        split_outputs = [split_file]
+    else:
+        split_inputs = {part: artifact_files(path) for part, path in parts.items()}
+        split_outputs = [split_file] + [f for path in parts.values() for f in artifact_files(path)]
+
+    return [
+        Stage("download", script_stage("download_data"),
+              outputs=["data/raw/raw_data.csv"],
+              params=dict(url=DATA_URL, write_to="data/raw/", cache_dir=raw_data_cache.DEFAULT_CACHE_DIR,
+                          cache_max_bytes=raw_data_cache.DEFAULT_MAX_BYTES, no_cache=False, offline=False),
+              code=code(os.path.join(SCRIPTS_DIR, "download_data.py"))),
+        Stage("clean", script_stage("clean_data"),
+              inputs=["data/raw/raw_data.csv"],
+              outputs=artifact_files(cleaned) + ["results/tables/dataset_overview.csv", "results/tables/missing_values.csv",
+                                                 "results/tables/duplicates.csv", "results/tables/raw_profile.pickle"],
+              params=dict(input_path="data/raw/raw_data.csv", output_path=cleaned, log_path="results/tables/",
+                          chunksize=None, index_path=None, float32=False),
+              code=code(os.path.join(SCRIPTS_DIR, "clean_data.py"))),
+        Stage("validate", script_stage("data_validation_script"),
+              inputs=artifact_files(cleaned),
+              params=dict(input_path=cleaned, pps_sample_size=None, pps_margin=0.05, cache_dir=None,
+                          chunksize=None, workers=None),
+              code=code(os.path.join(SCRIPTS_DIR, "data_validation_script.py"))),
+        Stage("split", script_stage("split_eda"),
+              inputs=artifact_files(cleaned), after=["validate"],
+              outputs=split_outputs,
+              params=dict(clean_data_path=cleaned, train_test_path="data/processed/", figures_path=None, tables_path=None,
+                          data_format=split_format, eda_workers=None, pairplot_kind="reg", pairplot_sample=0,
+                          correlation_method="pearson", skip_eda=True),
+              code=code(os.path.join(SRC_DIR, "train_test_split.py")) + [os.path.join(SCRIPTS_DIR, "split_eda.py")]),
+        Stage("eda", run_eda,
+              inputs=sorted(set(split_inputs["X_train"] + split_inputs["y_train"])),
+              outputs=["results/figures/target_distribution_plot.png", "results/figures/correlation_heatmap.png",
+                       "results/figures/feature_distributions.png", "results/figures/feature_pairplots.png",
+                       "results/tables/describe_table.csv", "data/processed/X_train_profile.pickle"],
+              params=dict(figures_path="results/figures/", tables_path="results/tables/", train_test_path="data/processed/",
+                          fmt=split_format, profile_path="data/processed/X_train_profile.pickle", workers=eda_workers),
+              code=code(os.path.join(SRC_DIR, "eda_charts.py")), locks=["pyplot"]),
+        Stage("select", script_stage("preprocess_model_selection"),
+              inputs=sorted(set(split_inputs["X_train"] + split_inputs["y_train"])),
+              outputs=["results/tables/initial_model_scores.csv", "results/tables/model_selection_results.csv",
+                       "results/models/preprocessor.pickle",
+                       "results/models/base_model.pickle"],
+              params=dict(train_data_path="data/processed/", scores_path="results/tables/",
+                          preprocessor_path="results/models/", model_path="results/models/", data_format=split_format,
+                          n_jobs=-1, min_throughput=None, race=False, confidence=0.95, max_fits=None,
+                          track_memory=False),
+              code=code(os.path.join(SCRIPTS_DIR, "preprocess_model_selection.py"))),
+        Stage("tune", script_stage("tuning_script"),
+              inputs=["results/models/base_model.pickle"] + sorted({f for files in split_inputs.values() for f in files}),
+              outputs=["results/models/best_model.pickle", "results/tables/best_params.csv"],
+              params=dict(model_path="results/models/base_model.pickle", best_model_path="results/models/best_model.pickle",
+                          x_train_path=parts["X_train"], y_train_path=parts["y_train"], x_test_path=parts["X_test"],
+                          y_test_path=parts["y_test"], params_output_path="results/tables/best_params.csv",
+                          search="random", search_space=None, n_iter=50, max_fits=None, max_seconds=None, patience=None,
+                          trial_store="results/.trials.sqlite", warm_start=0),
+              code=code(os.path.join(SCRIPTS_DIR, "tuning_script.py"))),
+        Stage("evaluate", script_stage("model_evaluation"),
+              inputs=["results/models/best_model.pickle"] + sorted(set(split_inputs["X_test"] + split_inputs["y_test"])),
+              outputs=["results/tables/test_accuracy.csv", "results/tables/confusion_matrix_summary.csv",
+                       "results/figures/confusion_matrix_class_*.png"],
+              params=dict(tuned_model_path="results/models/best_model.pickle", test_split_path="data/processed/",
+                          test_accuracy_path="results/tables/", figures_path="results/figures/", data_format=split_format,
+                          confusion_layout="separate", no_figures=False),
+              code=code(os.path.join(SCRIPTS_DIR, "model_evaluation.py")), locks=["pyplot"]),
+    ]
+
+
+@click.command()
+@click.option("--data_format", type=click.Choice(["csv", "npy"]), default="csv", show_default=True,
+              help="Format of the cleaned data.")
+@click.option("--split_format", type=click.Choice(["csv", "npy", "index"]), default=None,
+              help="Format of the train-test split (defaults to the data format).")
+@click.option("--jobs", type=int, default=None, help="Maximum number of stages running at the same time (defaults to all that are ready).")
+@click.option("--eda_workers", type=int, default=1, show_default=True, help="Processes rendering the EDA charts.")
+@click.option("--force", type=click.Choice(STAGE_NAMES), multiple=True, help="Run a stage even when it is up to date. Can be repeated.")
+@click.option("--skip", type=click.Choice(STAGE_NAMES), multiple=True,
+              help="Use the existing outputs of a stage without running it, e.g. --skip download when offline. Can be repeated.")
+@click.option("--cache_dir", type=str, default="results/.pipeline", show_default=True, help="Directory of the stage records.")
+def main(data_format, split_format, jobs, eda_workers, force, skip, cache_dir):
+    """
+    Runs every stage of the analysis in one process, from downloading the data to evaluating the tuned model.
+
+    Stages run as soon as the stages they depend on are done, so EDA runs next to model selection,
+    and a stage is skipped when its code, parameters and input files are unchanged since its last run.
+    """
+    import matplotlib
+    # Figures are only saved, and pyplot must not open windows from worker threads
+    matplotlib.use("Agg")
+
+    status = run_pipeline(build_stages(data_format, split_format, eda_workers), cache_dir, jobs=jobs, force=force, skip=skip)
+    ran = [name for name, state in status.items() if state == "ran"]
+    print(f"Pipeline finished: {len(ran)} stages ran ({', '.join(ran) or 'none'}), "
+          f"{len(status) - len(ran)} were up to date or skipped.")
+
+
+if __name__ == "__main__":
+    main()
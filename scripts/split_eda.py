@@ -7,22 +7,38 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 import click
 
-from src.train_test_split import run_TrainTestSplit
-from src.eda_charts import run_eda_charts
-
 @click.command()
 @click.option("--clean_data_path", type=str, help="Path to pull raw data for train_test_split.")
 @click.option("--train_test_path", type=str, help="Path to store and access data splits.")
 @click.option("--figures_path", type=str, help="Path to save figures generated.")
 @click.option("--tables_path", type=str, help="Path to save any tables generated")
-def main(clean_data_path, train_test_path, figures_path, tables_path):
+@click.option("--data_format", type=click.Choice(["csv", "npy", "index"]), default="csv", show_default=True,
+              help="Artifact format of the train-test split files. \"index\" only saves the row indices of the split.")
+@click.option("--eda_workers", type=int, default=None,
+              help="Number of processes rendering the EDA charts (defaults to one per chart, up to the number of CPUs).")
+@click.option("--pairplot_kind", type=click.Choice(["binned", "reg"]), default="reg", show_default=True,
+              help="Pairplot engine: 2D histograms with closed-form regression lines, or seaborn's per-point regression pairplot.")
+@click.option("--pairplot_sample", type=int, default=0, show_default=True,
+              help="Number of sampled rows overlaid as points on the binned pairplot.")
+@click.option("--correlation_method", type=click.Choice(["pearson", "spearman", "kendall"]), default="pearson", show_default=True,
+              help="Correlation shown in the heatmap. Spearman and Kendall are estimated from a sample of ranks.")
+@click.option("--skip_eda", is_flag=True, help="Only split the data, without importing the plotting libraries.")
+def main(clean_data_path, train_test_path, figures_path, tables_path, data_format, eda_workers, pairplot_kind, pairplot_sample, correlation_method, skip_eda):
     """
     The main function for reading CSV from path, performing train-test split to create our training and testing 
     and creating our EDA visualizations.
     """
+    from src.train_test_split import run_TrainTestSplit
+
     os.makedirs(train_test_path, exist_ok=True)
-    run_TrainTestSplit(clean_data_path, train_test_path)
-    run_eda_charts(figures_path, tables_path, train_test_path)
+    run_TrainTestSplit(clean_data_path, train_test_path, fmt=data_format)
+    if skip_eda:
+        return
+
+    from src.eda_charts import run_eda_charts
+    run_eda_charts(figures_path, tables_path, train_test_path, fmt=data_format,
+                   profile_path=os.path.join(train_test_path, "X_train_profile.pickle"), workers=eda_workers,
+                   pairplot_kind=pairplot_kind, pairplot_sample=pairplot_sample, correlation_method=correlation_method)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
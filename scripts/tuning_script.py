@@ -5,28 +5,50 @@ import click
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
-from model_tuning import fine_tune_model
 
 @click.command()
 @click.argument("model_path", type=click.Path(exists=True))
 @click.argument("best_model_path", type=str)
-@click.argument("x_train_path", type=click.Path(exists=True))
-@click.argument("y_train_path", type=click.Path(exists=True))
-@click.argument("x_test_path", type=click.Path(exists=True))
-@click.argument("y_test_path", type=click.Path(exists=True))
+@click.argument("x_train_path", type=str)
+@click.argument("y_train_path", type=str)
+@click.argument("x_test_path", type=str)
+@click.argument("y_test_path", type=str)
 @click.argument("params_output_path", type=str)
-def main(model_path, best_model_path, x_train_path, y_train_path, x_test_path, y_test_path, params_output_path):
+@click.option("--search", type=click.Choice(["random", "halving", "tpe"]), default="random", show_default=True,
+              help="Search engine: random candidates, successive halving on the training rows, or a TPE sampler.")
+@click.option("--search_space", type=click.Path(exists=True), default=None,
+              help="JSON file of the search space (defaults to the SVC space).")
+@click.option("--n_iter", type=int, default=50, show_default=True, help="Number of candidates sampled.")
+@click.option("--max_fits", type=float, default=None, help="Most fits on full training folds (defaults to no limit).")
+@click.option("--max_seconds", type=float, default=None, help="Most seconds spent scoring candidates (defaults to no limit).")
+@click.option("--patience", type=int, default=None,
+              help="Candidates scored without improvement before the random or TPE search stops.")
+@click.option("--trial_store", type=str, default=None,
+              help="SQLite file of the fold scores, to resume interrupted searches and reuse earlier trials.")
+@click.option("--warm_start", type=int, default=0, show_default=True,
+              help="Number of the best candidates of earlier searches in the trial store scored first.")
+def main(model_path, best_model_path, x_train_path, y_train_path, x_test_path, y_test_path, params_output_path,
+         search, search_space, n_iter, max_fits, max_seconds, patience, trial_store, warm_start):
     """
     Fine-tunes a pre-trained model and saves the best model.
 
     model_path: Path to the pre-trained model file (.pkl).
     best_model_path: Path to save the fine-tuned model (.pkl).
-    x_train_path: Path to the training features (CSV).
-    y_train_path: Path to the training labels (CSV).
-    x_test_path: Path to the testing features (CSV).
-    y_test_path: Path to the testing labels (CSV).
+    x_train_path: Path to the training features (CSV, .npy or a .index split view).
+    y_train_path: Path to the training labels.
+    x_test_path: Path to the testing features.
+    y_test_path: Path to the testing labels.
     params_output_path: Path to save the best parameters (CSV).
+    search: Search engine: random, halving or tpe.
+    search_space: JSON file of the search space.
+    n_iter: Number of candidates sampled.
+    max_fits: Most fits on full training folds.
+    max_seconds: Most seconds spent scoring candidates.
+    patience: Candidates scored without improvement before the search stops.
+    trial_store: SQLite file of the fold scores.
+    warm_start: Number of the best candidates of earlier searches scored first.
     """
+    from model_tuning import fine_tune_model
     fine_tune_model(
         model_path, 
         best_model_path, 
@@ -34,7 +56,15 @@ def main(model_path, best_model_path, x_train_path, y_train_path, x_test_path, y
         y_train_path, 
         x_test_path, 
         y_test_path, 
-        params_output_path
+        params_output_path,
+        search=search,
+        search_space=search_space,
+        n_iter=n_iter,
+        max_fits=max_fits,
+        max_seconds=max_seconds,
+        patience=patience,
+        trial_store=trial_store,
+        warm_start=warm_start
     )
 
 if __name__ == "__main__":
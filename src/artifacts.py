@@ -0,0 +1,276 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+import sys
+from functools import lru_cache
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from ingest import read_csv_typed, schema_dtypes
+from row_hash_index import content_hash
+
+FORMATS = {
+    "csv": ".csv",
+    "npy": ".npy",
+    "index": ".index",
+}
+SPLIT_FILE = "split.npz"
+
+
+def artifact_path(directory, name, fmt="csv"):
+    """
+    Build the path of a pipeline artifact in the given format.
+
+    Parameters:
+    ----------
+    directory : str
+        Directory of the artifact.
+    name : str
+        Artifact name without extension (e.g. "X_train").
+    fmt : str, optional
+        One of "csv", "npy" or "index" (default is "csv"). "index"
+        artifacts are views of the cleaned dataset described by the directory's split file.
+
+    Returns:
+    -------
+    str
+        Path of the artifact.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown artifact format {fmt}. Expected one of {', '.join(FORMATS)}.")
+    return os.path.join(directory, name + FORMATS[fmt])
+
+
+def infer_format(path):
+    """
+    Infer the artifact format from a file extension.
+
+    Parameters:
+    ----------
+    path : str
+        Path of the artifact.
+
+    Returns:
+    -------
+    str
+        The artifact format.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    for fmt, fmt_extension in FORMATS.items():
+        if extension == fmt_extension:
+            return fmt
+    raise ValueError(f"Cannot infer artifact format of {path}. Expected one of {', '.join(FORMATS.values())}.")
+
+
+def _schema_path(path):
+    return path + ".schema.json"
+
+
+def save_frame(df, path):
+    """
+    Save a DataFrame or Series as a pipeline artifact, with the format taken from the extension.
+
+    ``.npy`` artifacts hold all columns as one contiguous 2D array with a JSON sidecar
+    (``<path>.schema.json``) recording column names and dtypes, so readers can memory-map them.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame or pd.Series
+        Data to save.
+    path : str
+        Output path of the artifact.
+
+    Returns:
+    -------
+    None
+    """
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+
+    output_dir = os.path.dirname(path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    fmt = infer_format(path)
+    if fmt == "index":
+        raise ValueError(f"{path} is a view of the cleaned data; write the row indices with save_split instead.")
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    else:
+        non_numeric = [column for column, dtype in df.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+        if non_numeric:
+            raise ValueError(f"Columns {non_numeric} are not numeric and cannot be saved as .npy; use csv.")
+        values = np.ascontiguousarray(df.to_numpy(dtype=np.result_type(*df.dtypes)))
+        np.save(path, values, allow_pickle=False)
+        schema = {"columns": list(map(str, df.columns)), "dtypes": [str(dtype) for dtype in df.dtypes]}
+        with open(_schema_path(path), "w") as f:
+            json.dump(schema, f)
+
+
+def load_frame(path, usecols=None, squeeze=False, schema=None, float_dtype="float64"):
+    """
+    Load a pipeline artifact written by ``save_frame``.
+
+    ``.npy`` artifacts are memory-mapped read-only; columns that share the array dtype are
+    returned as views of the mapped file instead of being parsed. ``.index`` artifacts are
+    materialized from the cleaned dataset with ``load_split_view``. With a schema, CSV files are
+    parsed straight into the schema dtypes and other formats are cast to them.
+
+    Parameters:
+    ----------
+    path : str
+        Path of the artifact.
+    usecols : list, optional
+        Subset of columns to load.
+    squeeze : bool, optional
+        Whether to return a single-column artifact as a Series (default is False).
+    schema : pa.DataFrameSchema, optional
+        Schema declaring the expected columns and dtypes.
+    float_dtype : str, optional
+        Dtype for float columns of the schema, "float64" (default) or "float32".
+
+    Returns:
+    -------
+    pd.DataFrame or pd.Series
+        The loaded data.
+    """
+    fmt = infer_format(path)
+    if fmt == "index":
+        df = load_split_view(path, usecols)
+    elif fmt == "csv":
+        df = read_csv_typed(path, schema, usecols=usecols, float_dtype=float_dtype)
+    else:
+        with open(_schema_path(path), "r") as f:
+            sidecar = json.load(f)
+        values = np.load(path, mmap_mode="r", allow_pickle=False)
+        columns = sidecar["columns"]
+        dtypes = dict(zip(columns, sidecar["dtypes"]))
+        if usecols is not None:
+            positions = [columns.index(column) for column in usecols]
+            values, columns = values[:, positions], list(usecols)
+        df = pd.DataFrame(values, columns=columns, copy=False)
+        mismatched = {column: dtypes[column] for column in columns if dtypes[column] != str(values.dtype)}
+        if mismatched:
+            df = df.astype(mismatched)
+
+    if schema is not None and fmt != "csv":
+        dtypes = schema_dtypes(schema, float_dtype)
+        try:
+            df = df.astype({column: dtypes[column] for column in df.columns if column in dtypes})
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Failed to cast {path} to the schema dtypes. Error: {e}")
+
+    if squeeze and df.shape[1] == 1:
+        return df.iloc[:, 0]
+    return df
+
+
+def save_split(path, train, test, data_path, data_hash, label="quality", random_state=None, stratified=False):
+    """
+    Save a train-test split as row indices into the cleaned dataset instead of copies of the data.
+
+    Parameters:
+    ----------
+    path : str
+        Path of the split file (.npz).
+    train : np.ndarray
+        Row positions of the training set in the cleaned dataset.
+    test : np.ndarray
+        Row positions of the test set in the cleaned dataset.
+    data_path : str
+        Path of the cleaned dataset. It is stored relative to the directory of the split file,
+        so views can be loaded from any working directory.
+    data_hash : str
+        ``content_hash`` of the cleaned dataset, checked whenever a view is materialized.
+    label : str, optional
+        Target column (default is "quality").
+    random_state : int, optional
+        Seed of the split.
+    stratified : bool, optional
+        Whether the split is stratified on the label (default is False).
+
+    Returns:
+    -------
+    None
+    """
+    output_dir = os.path.dirname(path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    data_path = os.path.relpath(os.path.abspath(data_path), os.path.dirname(os.path.abspath(path)))
+    np.savez(tmp_path, train=np.asarray(train, dtype=np.int64), test=np.asarray(test, dtype=np.int64),
+             data_path=data_path, data_hash=data_hash, label=label,
+             random_state=-1 if random_state is None else random_state, stratified=stratified)
+    os.replace(tmp_path, path)
+
+
+def load_split(path):
+    """
+    Load a split file written by ``save_split``.
+
+    Parameters:
+    ----------
+    path : str
+        Path of the split file.
+
+    Returns:
+    -------
+    dict
+        "train" and "test" row positions, "data_path" (resolved against the directory of the
+        split file), "data_hash", "label", "random_state" (None when unseeded) and "stratified".
+    """
+    with np.load(path, allow_pickle=False) as data:
+        split = {key: data[key] for key in data.files}
+    for key in ("data_path", "data_hash", "label"):
+        split[key] = str(split[key])
+    split["data_path"] = os.path.normpath(os.path.join(os.path.dirname(path), split["data_path"]))
+    split["random_state"] = None if int(split["random_state"]) < 0 else int(split["random_state"])
+    split["stratified"] = bool(split["stratified"])
+    return split
+
+
+@lru_cache(maxsize=1)
+def _load_split_source(data_path, mtime, data_hash):
+    """
+    Load and verify the cleaned dataset of a split once per process, keyed by its modification time.
+    """
+    df = load_frame(data_path)
+    if content_hash(df) != data_hash:
+        raise ValueError(f"{data_path} changed since the train-test split was made. Rerun the split.")
+    return df
+
+
+def load_split_view(path, usecols=None):
+    """
+    Materialize an ``.index`` artifact (e.g. ``X_train.index``) from the cleaned dataset.
+
+    The split file next to the artifact holds the row indices and the content hash of the
+    cleaned dataset, which is loaded and verified once per process. ``X_<part>`` views hold
+    every column except the label and ``y_<part>`` views the label only, for the "train" and
+    "test" parts.
+
+    Parameters:
+    ----------
+    path : str
+        Path of the view; the file itself does not exist.
+    usecols : list, optional
+        Subset of columns to load.
+
+    Returns:
+    -------
+    pd.DataFrame
+        The rows of the view, with a fresh RangeIndex.
+    """
+    directory, name = os.path.split(path)
+    name = os.path.splitext(name)[0]
+    kind, _, part = name.partition("_")
+    if kind not in ("X", "y") or part not in ("train", "test"):
+        raise ValueError(f"Unknown split view {name}. Expected X_train, y_train, X_test or y_test.")
+
+    split = load_split(os.path.join(directory, SPLIT_FILE))
+    data_path = split["data_path"]
+    source = _load_split_source(data_path, os.path.getmtime(data_path), split["data_hash"])
+    label = split["label"]
+    columns = [label] if kind == "y" else [column for column in source.columns if column != label]
+    if usecols is not None:
+        columns = list(usecols)
+    return source[columns].iloc[split[part]].reset_index(drop=True)
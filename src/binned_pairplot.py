@@ -0,0 +1,223 @@
+import os
+import sys
+import numpy as np
+import matplotlib.pyplot as plt
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from profiler import DatasetProfile
+
+DEFAULT_BINS = 40
+
+
+def bin_edges(minimum, maximum, bins=DEFAULT_BINS):
+    """
+    Build equal-width bin edges for every column from its minimum and maximum.
+
+    Parameters:
+    ----------
+    minimum : np.ndarray
+        Minimum of every column.
+    maximum : np.ndarray
+        Maximum of every column.
+    bins : int, optional
+        Number of bins per column (default is 40).
+
+    Returns:
+    -------
+    np.ndarray
+        Array of shape (columns, bins + 1) with the edges of every column. Constant columns get
+        a unit-wide range around their value.
+    """
+    minimum = np.asarray(minimum, dtype=float)
+    maximum = np.asarray(maximum, dtype=float)
+    constant = ~(maximum > minimum)
+    low = np.where(constant, minimum - 0.5, minimum)
+    high = np.where(constant, minimum + 0.5, maximum)
+    return low[:, None] + (high - low)[:, None] * np.linspace(0, 1, bins + 1)
+
+
+class PairHistogram:
+    """
+    Mergeable 1D and 2D histograms of every column and pair of columns, on fixed bin edges.
+
+    Every row is binned once per column with a vectorized division, and the joint counts of a
+    column with all later columns are accumulated with one ``np.bincount`` on combined bin
+    codes. Chunks binned on the same edges (e.g. from the minimum and maximum of a
+    ``DatasetProfile``) can be added one after another, and the size of the histograms does not
+    depend on the number of rows.
+
+    Parameters:
+    ----------
+    columns : list
+        Names of the numeric columns.
+    edges : np.ndarray
+        Bin edges of every column, from ``bin_edges``.
+    """
+
+    def __init__(self, columns, edges):
+        self.columns = list(columns)
+        self.edges = np.asarray(edges, dtype=float)
+        self.bins = self.edges.shape[1] - 1
+        k = len(self.columns)
+        self.counts = np.zeros((k, self.bins), dtype=np.int64)
+        self.joint = np.zeros((k, k, self.bins, self.bins), dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df, bins=DEFAULT_BINS):
+        """
+        Bin a DataFrame of numeric columns on edges spanning its own range.
+        """
+        values = df.to_numpy(dtype=float)
+        with np.errstate(invalid="ignore"):
+            edges = bin_edges(np.nanmin(values, axis=0, initial=np.inf, where=~np.isnan(values)),
+                              np.nanmax(values, axis=0, initial=-np.inf, where=~np.isnan(values)), bins)
+        return cls(df.columns, edges).update(df)
+
+    def update(self, df):
+        """
+        Add a chunk of rows with the same columns to the histograms.
+
+        Parameters:
+        ----------
+        df : pd.DataFrame
+            Chunk of rows. Values outside the edges are counted in the first or last bin and
+            missing values are skipped.
+
+        Returns:
+        -------
+        PairHistogram
+            The updated histograms.
+        """
+        values = df[self.columns].to_numpy(dtype=float)
+        low, high = self.edges[:, 0], self.edges[:, -1]
+        with np.errstate(invalid="ignore"):
+            codes = np.clip(np.floor((values - low) / (high - low) * self.bins), 0, self.bins - 1)
+        # Missing values go to an extra bin that is dropped from the counts
+        width = self.bins + 1
+        codes = np.where(np.isnan(codes), self.bins, codes).astype(np.intp)
+
+        k = len(self.columns)
+        for i in range(k):
+            self.counts[i] += np.bincount(codes[:, i], minlength=width)[:self.bins]
+            if i == k - 1:
+                break
+            # Joint codes of column i with every later column, offset so one bincount counts all pairs
+            others = k - i - 1
+            combined = codes[:, i, None] * width + codes[:, i + 1:] + np.arange(others) * width ** 2
+            joint = np.bincount(combined.ravel(), minlength=others * width ** 2).reshape(others, width, width)
+            self.joint[i, i + 1:] += joint[:, :self.bins, :self.bins]
+            self.joint[i + 1:, i] = self.joint[i, i + 1:].transpose(0, 2, 1)
+        return self
+
+
+def regression_lines(profile):
+    """
+    Least-squares regression line of every numeric column on every other one, in closed form.
+
+    The slopes and intercepts come from the means and co-moments that a ``DatasetProfile``
+    accumulates, so no pass over the rows and no model fit is needed.
+
+    Parameters:
+    ----------
+    profile : DatasetProfile
+        Profile of the data.
+
+    Returns:
+    -------
+    tuple
+        (slope, intercept): arrays where row i, column j holds the line predicting column j
+        from column i. Lines on a constant column are flat.
+    """
+    variance = np.diag(profile.co_moment)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = np.where(variance[:, None] > 0, profile.co_moment / variance[:, None], 0.0)
+    intercept = profile.co_mean[None, :] - slope * profile.co_mean[:, None]
+    return slope, intercept
+
+
+def reservoir_sample(df, sample_size, random_state=0):
+    """
+    Draw a uniform sample of rows without replacement by keeping the rows with the smallest random keys.
+
+    Keys are drawn for all rows at once, and the kept rows keep their original order. Keeping
+    the smallest keys of several chunks gives the same kind of sample as one pass over all rows.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Data to sample.
+    sample_size : int
+        Number of rows to keep.
+    random_state : int, optional
+        Seed of the random keys (default is 0).
+
+    Returns:
+    -------
+    pd.DataFrame
+        The sampled rows.
+    """
+    if sample_size >= len(df):
+        return df
+    keys = np.random.default_rng(random_state).random(len(df))
+    kept = np.sort(np.argpartition(keys, sample_size)[:sample_size])
+    return df.iloc[kept]
+
+
+def plot_binned_pairplot(X, bins=DEFAULT_BINS, sample_size=0, profile=None, height=2.5):
+    """
+    Create a pairplot of all features from pre-aggregated 2D histograms.
+
+    Off-diagonal panels show the log-scaled joint counts of a pair of features with the
+    least-squares line of the row feature on the column feature. Diagonal panels show the
+    histogram of each feature. Drawing cost depends on the number of features and bins only,
+    not on the number of rows.
+
+    Parameters:
+    ----------
+    X : pd.DataFrame
+        Numeric features.
+    bins : int, optional
+        Number of bins per feature (default is 40).
+    sample_size : int, optional
+        Number of reservoir-sampled rows drawn as a scatter overlay (default is 0, no overlay).
+    profile : DatasetProfile, optional
+        Profile of ``X`` providing the regression lines. Computed when not given.
+    height : float, optional
+        Height and width of each panel in inches (default is 2.5, as in seaborn).
+
+    Returns:
+    -------
+    matplotlib.figure.Figure
+        The pairplot figure.
+    """
+    if profile is None:
+        profile = DatasetProfile.from_frame(X)
+    columns = list(X.columns)
+    positions = [profile.numeric.index(column) for column in columns]
+    histogram = PairHistogram.from_frame(X, bins)
+    slope, intercept = regression_lines(profile)
+    sample = reservoir_sample(X, sample_size) if sample_size else None
+
+    k = len(columns)
+    fig, axes = plt.subplots(k, k, figsize=(height * k, height * k), squeeze=False, sharex="col")
+    for row in range(k):
+        for col in range(k):
+            ax = axes[row, col]
+            x_edges, y_edges = histogram.edges[col], histogram.edges[row]
+            if row == col:
+                ax.stairs(histogram.counts[col], x_edges, fill=True, alpha=0.7)
+            else:
+                ax.pcolormesh(x_edges, y_edges, np.log1p(histogram.joint[col, row].T), cmap="Blues", shading="flat")
+                if sample is not None:
+                    ax.scatter(sample.iloc[:, col], sample.iloc[:, row], s=2, color="black", alpha=0.3, linewidths=0)
+                i, j = positions[col], positions[row]
+                x = x_edges[[0, -1]]
+                ax.plot(x, intercept[i, j] + slope[i, j] * x, color="tab:red", linewidth=1)
+                ax.set_ylim(y_edges[0], y_edges[-1])
+            ax.set_xlim(x_edges[0], x_edges[-1])
+            if col == 0:
+                ax.set_ylabel(columns[row])
+            elif row != col:
+                ax.tick_params(labelleft=False)
+            if row == k - 1:
+                ax.set_xlabel(columns[col])
+    return fig
@@ -0,0 +1,253 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pandera as pa
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from row_hash_index import batch_duplicates
+
+MAX_COLUMNS = 62
+REPORT_COLUMNS = ["Column", "Check", "Failures", "Failure Cases"]
+DUPLICATE_CHECK = "Duplicate rows found."
+EMPTY_CHECK = "Empty rows found."
+# Column checks evaluated by check_bounds; any other check is left to pandera
+FAST_CHECKS = ("in_bounds", "isin")
+
+
+def in_bounds(min_value=None, max_value=None, include_min=True, include_max=True):
+    """
+    Create a pandera check that every value of a column lies within the given bounds.
+
+    The bounds are stored in the check's statistics, so ``check_bounds`` can evaluate the checks
+    of all columns together instead of running each check separately.
+
+    Parameters:
+    ----------
+    min_value : float, optional
+        Lower bound, or None for no lower bound.
+    max_value : float, optional
+        Upper bound, or None for no upper bound.
+    include_min : bool, optional
+        Whether the lower bound itself is allowed (default is True).
+    include_max : bool, optional
+        Whether the upper bound itself is allowed (default is True).
+
+    Returns:
+    -------
+    pa.Check
+        The bounds check.
+    """
+    def check_fn(s):
+        valid = pd.Series(True, index=s.index)
+        if min_value is not None:
+            valid &= (s >= min_value) if include_min else (s > min_value)
+        if max_value is not None:
+            valid &= (s <= max_value) if include_max else (s < max_value)
+        return valid.all()
+
+    statistics = {"min_value": min_value, "max_value": max_value,
+                  "include_min": include_min, "include_max": include_max}
+    return pa.Check(check_fn, name="in_bounds", statistics=statistics)
+
+
+def _describe_check(check):
+    stats = check.statistics
+    if check.name == "isin":
+        return f"isin({sorted(stats['allowed_values'])})"
+    parts = []
+    if stats["min_value"] is not None:
+        parts.append(f"{'>=' if stats['include_min'] else '>'} {stats['min_value']}")
+    if stats["max_value"] is not None:
+        parts.append(f"{'<=' if stats['include_max'] else '<'} {stats['max_value']}")
+    return "in_bounds(" + ", ".join(parts) + ")"
+
+
+def structural_schema(schema):
+    """
+    Copy a schema without its value checks, keeping column presence, dtype and nullability.
+
+    Parameters:
+    ----------
+    schema : pa.DataFrameSchema
+        Schema to copy.
+
+    Returns:
+    -------
+    pa.DataFrameSchema
+        The schema without column or DataFrame checks.
+    """
+    structural = schema.update_columns({name: {"checks": []} for name in schema.columns})
+    structural.checks = []
+    return structural
+
+
+def _checked_columns(df, schema):
+    """
+    Columns of the schema whose checks ``check_bounds`` evaluates on a DataFrame.
+    """
+    return [name for name, column in schema.columns.items()
+            if name in df.columns and pd.api.types.is_numeric_dtype(df[name].dtype)
+            and (column.checks or not column.nullable)]
+
+
+def residual_schema(schema, df):
+    """
+    Copy a schema keeping only the checks that ``check_bounds`` does not evaluate on a DataFrame.
+
+    Column presence, dtype and nullability are kept. The ``in_bounds`` and ``isin`` checks of
+    the numeric columns, and the duplicate and empty row checks, are dropped; every other column
+    or DataFrame check is kept, so validating with the copy after ``check_bounds`` covers the
+    whole schema.
+
+    Parameters:
+    ----------
+    schema : pa.DataFrameSchema
+        Schema to copy.
+    df : pd.DataFrame
+        Data the schema is checked on, or an empty frame with its columns and dtypes.
+
+    Returns:
+    -------
+    pa.DataFrameSchema
+        The schema with the remaining checks.
+    """
+    checked = set(_checked_columns(df, schema))
+    residual = schema.update_columns({
+        name: {"checks": [check for check in column.checks if name not in checked or check.name not in FAST_CHECKS]}
+        for name, column in schema.columns.items()
+    })
+    residual.checks = [check for check in schema.checks if check.error not in (DUPLICATE_CHECK, EMPTY_CHECK)]
+    return residual
+
+
+def count_checks(schema):
+    """
+    Number of column and DataFrame checks of a schema.
+    """
+    return len(schema.checks) + sum(len(column.checks) for column in schema.columns.values())
+
+
+def check_bounds(df, schema, n_failure_cases=5, duplicates=None):
+    """
+    Evaluate every bounds, allowed-value and non-null check of a schema in one vectorized pass.
+
+    The checked columns are laid out as one contiguous 2D float array and compared against
+    per-column lower and upper bound vectors at once. Duplicate and empty rows, the schema's
+    DataFrame-level checks, are found with a single row-hash pass and null scan. Every failing
+    check is reported instead of stopping at the first one. Other checks of the schema are not
+    evaluated here; ``residual_schema`` keeps them for pandera.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Data to check.
+    schema : pa.DataFrameSchema
+        Schema whose ``in_bounds`` and ``isin`` column checks are evaluated.
+    n_failure_cases : int, optional
+        Number of failing values listed per check (default is 5).
+    duplicates : np.ndarray, optional
+        Precomputed boolean mask of duplicate rows, e.g. from a row-hash index shared across
+        chunks. Computed from ``df`` when not given.
+
+    Returns:
+    -------
+    tuple
+        (mask, report): a uint64 array with one violation bitmask per row, where bit j is set
+        when the row fails a check of the j-th checked column, bit k (the number of checked
+        columns) marks duplicate rows and bit k + 1 marks empty rows; and a DataFrame with one
+        row per failing check.
+    """
+    columns = _checked_columns(df, schema)
+    if len(columns) > MAX_COLUMNS:
+        raise ValueError(f"check_bounds supports at most {MAX_COLUMNS} checked columns. Got {len(columns)}.")
+
+    k = len(columns)
+    lower = np.full(k, -np.inf)
+    upper = np.full(k, np.inf)
+    strict_lower = np.zeros(k, dtype=bool)
+    strict_upper = np.zeros(k, dtype=bool)
+    not_nullable = np.array([not schema.columns[name].nullable for name in columns], dtype=bool)
+    allowed = {}
+    descriptions = {}
+    for j, name in enumerate(columns):
+        for check in schema.columns[name].checks:
+            stats = check.statistics or {}
+            if check.name == "in_bounds":
+                if stats["min_value"] is not None:
+                    lower[j], strict_lower[j] = stats["min_value"], not stats["include_min"]
+                if stats["max_value"] is not None:
+                    upper[j], strict_upper[j] = stats["max_value"], not stats["include_max"]
+            elif check.name == "isin":
+                allowed[j] = np.asarray(sorted(stats["allowed_values"]), dtype=float)
+            else:
+                # Left to pandera through residual_schema
+                continue
+            descriptions.setdefault(j, []).append(_describe_check(check))
+
+    values = np.ascontiguousarray(df[columns].to_numpy(dtype=float))
+    missing = np.isnan(values)
+    out_of_bounds = ((values < lower) | (values > upper)
+                     | (strict_lower & (values == lower)) | (strict_upper & (values == upper)))
+    for j, allowed_values in allowed.items():
+        out_of_bounds[:, j] |= ~np.isin(values[:, j], allowed_values) & ~missing[:, j]
+    null_violations = missing & not_nullable
+
+    if duplicates is None:
+        duplicates = batch_duplicates(df)
+    empty = df.isna().to_numpy().all(axis=1)
+
+    # Pack the per-row violation flags into little-endian bits and view each row as a uint64
+    flags = np.column_stack([out_of_bounds | null_violations, duplicates, empty])
+    packed = np.packbits(flags, axis=1, bitorder="little")
+    padded = np.zeros((len(df), 8), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    mask = padded.view("<u8").ravel()
+
+    report = []
+    for j, name in enumerate(columns):
+        failing = np.flatnonzero(out_of_bounds[:, j])
+        if len(failing):
+            report.append([name, " & ".join(descriptions.get(j, [])), len(failing),
+                           values[failing[:n_failure_cases], j].tolist()])
+        failing = np.flatnonzero(null_violations[:, j])
+        if len(failing):
+            report.append([name, "not_nullable", len(failing), failing[:n_failure_cases].tolist()])
+    for check, failing in ((DUPLICATE_CHECK, duplicates), (EMPTY_CHECK, empty)):
+        if failing.any():
+            report.append(["<DataFrame>", check, int(failing.sum()),
+                           np.flatnonzero(failing)[:n_failure_cases].tolist()])
+
+    return mask, pd.DataFrame(report, columns=REPORT_COLUMNS)
+
+
+def merge_reports(reports, offsets, n_failure_cases=5):
+    """
+    Merge the reports of ``check_bounds`` on consecutive chunks of a dataset into one report.
+
+    Failure counts of the same check are summed. Failure cases that are row positions (null,
+    duplicate and empty rows) are shifted by the offset of their chunk, so they refer to rows of
+    the whole dataset.
+
+    Parameters:
+    ----------
+    reports : list of pd.DataFrame
+        Reports of the chunks, in row order.
+    offsets : list of int
+        Position of the first row of each chunk in the dataset.
+    n_failure_cases : int, optional
+        Number of failure cases kept per check (default is 5).
+
+    Returns:
+    -------
+    pd.DataFrame
+        The merged report.
+    """
+    merged = {}
+    for report, offset in zip(reports, offsets):
+        for column, check, failures, cases in report.itertuples(index=False):
+            if check in ("not_nullable", DUPLICATE_CHECK, EMPTY_CHECK):
+                cases = [offset + position for position in cases]
+            total, kept = merged.get((column, check), (0, []))
+            merged[(column, check)] = (total + failures, (kept + list(cases))[:n_failure_cases])
+    return pd.DataFrame([[column, check, failures, cases] for (column, check), (failures, cases) in merged.items()],
+                        columns=REPORT_COLUMNS)
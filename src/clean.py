@@ -1,14 +1,27 @@
 import os
 import pandas as pd
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from artifacts import save_frame
+from row_hash_index import RowHashIndex
+from profiler import DatasetProfile
+from ingest import read_csv_typed
 
-def load_data(input_path):
+def load_data(input_path, schema=None, float_dtype="float64"):
     """
     Load the dataset from a specified path.
 
+    Every column of the file is read. With a schema, its columns are parsed straight into their
+    declared dtypes, so dtype drift fails here rather than in a later stage.
+
     Parameters:
     ----------
     input_path : str
         Path to the raw data file.
+    schema : pa.DataFrameSchema, optional
+        Schema declaring the expected columns and dtypes.
+    float_dtype : str, optional
+        Dtype for float columns, "float64" (default) or "float32".
 
     Returns:
     -------
@@ -16,11 +29,11 @@ def load_data(input_path):
         Loaded dataset.
     """
     try:
-        return pd.read_csv(input_path, sep=';')
+        return read_csv_typed(input_path, schema, sep=';', float_dtype=float_dtype)
     except FileNotFoundError as e:
         raise FileNotFoundError(f"The input file at {input_path} was not found. Error: {e}")
 
-def save_overview(df, log_path):
+def save_overview(df, log_path, profile=None):
     """
     Save dataset overview (columns, non-null counts, and dtypes) to a CSV file.
 
@@ -30,6 +43,8 @@ def save_overview(df, log_path):
         Input dataset.
     log_path : str
         Path to save the overview CSV.
+    profile : DatasetProfile, optional
+        Precomputed profile of ``df``; the overview is derived from it instead of rescanning ``df``.
 
     Returns:
     -------
@@ -37,10 +52,13 @@ def save_overview(df, log_path):
     """
     os.makedirs(log_path, exist_ok=True)
     overview_file = os.path.join(log_path, "dataset_overview.csv")
-    df_info = pd.DataFrame({"Column": df.columns, "Non-Null Count": df.count(), "Dtype": df.dtypes})
+    if profile is not None:
+        df_info = profile.overview_table()
+    else:
+        df_info = pd.DataFrame({"Column": df.columns, "Non-Null Count": df.count(), "Dtype": df.dtypes})
     df_info.to_csv(overview_file, index=False)
 
-def handle_missing_values(df, log_path):
+def handle_missing_values(df, log_path, profile=None):
     """
     Generate and save a report on missing values in the dataset.
 
@@ -50,27 +68,39 @@ def handle_missing_values(df, log_path):
         Input dataset.
     log_path : str
         Path to save the missing values report.
+    profile : DatasetProfile, optional
+        Precomputed profile of ``df``; the report is derived from it instead of rescanning ``df``.
 
     Returns:
     -------
     None
     """
     os.makedirs(log_path, exist_ok=True)
-    missing_values = df.isnull().sum().reset_index()
-    missing_values.columns = ["Column", "Missing Values"]
+    if profile is not None:
+        missing_values = profile.missing_table()
+    else:
+        missing_values = df.isnull().sum().reset_index()
+        missing_values.columns = ["Column", "Missing Values"]
     missing_file = os.path.join(log_path, "missing_values.csv")
     missing_values.to_csv(missing_file, index=False)
 
-def handle_duplicates(df, log_path):
+def handle_duplicates(df, log_path, index_path=None):
     """
     Identify and save duplicates in the dataset.
 
+    Duplicates are found in a single pass over 64-bit row hashes, which yields both the
+    duplicates report and the deduplicated dataset. When ``index_path`` is given, the row-hash
+    index is loaded from and saved back to that file, so rows already seen in earlier runs are
+    treated as duplicates and new batches are deduplicated incrementally.
+
     Parameters:
     ----------
     df : pd.DataFrame
         Input dataset.
     log_path : str
         Path to save the duplicates report.
+    index_path : str, optional
+        Path of a persistent row-hash index (.npz) to deduplicate against and update.
 
     Returns:
     -------
@@ -78,15 +108,22 @@ def handle_duplicates(df, log_path):
         Dataset with duplicates removed.
     """
     os.makedirs(log_path, exist_ok=True)
-    duplicates = df[df.duplicated()].reset_index(drop=True)
+    index = RowHashIndex.load(index_path) if index_path is not None else RowHashIndex()
+    is_duplicate = index.find_duplicates(df)
+    duplicates = df[is_duplicate].reset_index(drop=True)
     duplicates_file = os.path.join(log_path, "duplicates.csv")
     duplicates.to_csv(duplicates_file, index=False)
-    return df.drop_duplicates()
+    if index_path is not None:
+        index.save(index_path)
+    return df[~is_duplicate]
 
 def save_cleaned_data(df, output_path):
     """
     Save the cleaned dataset to a specified path.
 
+    The artifact format (CSV or memory-mappable .npy) is taken from the
+    extension of ``output_path``.
+
     Parameters:
     ----------
     df : pd.DataFrame
@@ -98,5 +135,67 @@ def save_cleaned_data(df, output_path):
     -------
     None
     """
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_csv(output_path, index=False)
+    save_frame(df, output_path)
+
+def clean_in_chunks(input_path, output_path, log_path, chunksize, index_path=None):
+    """
+    Clean a raw dataset chunk by chunk so memory is bounded by the chunk size, not the dataset size.
+
+    Produces the same dataset overview, missing values and duplicates reports as the in-memory
+    functions. Column statistics are accumulated in a mergeable profile, duplicates are detected
+    across chunk boundaries with a row-hash index of every row already seen, and cleaned chunks
+    are appended to the output CSV.
+
+    Parameters:
+    ----------
+    input_path : str
+        Path to the raw data file.
+    output_path : str
+        Path to save the cleaned dataset. Must be a CSV file.
+    log_path : str
+        Path to save the overview, missing values and duplicates reports.
+    chunksize : int
+        Number of rows read per chunk.
+    index_path : str, optional
+        Path of a persistent row-hash index (.npz) to deduplicate against and update.
+
+    Returns:
+    -------
+    DatasetProfile
+        Profile of the raw dataset, including its Pearson co-moments and the rank sample for
+        Spearman and Kendall correlations.
+    """
+    if not output_path.endswith(".csv"):
+        raise ValueError(f"Chunked cleaning appends to a CSV file; got output path {output_path}.")
+    if chunksize <= 0:
+        raise ValueError("chunksize must be a positive integer.")
+
+    os.makedirs(log_path, exist_ok=True)
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    duplicates_file = os.path.join(log_path, "duplicates.csv")
+
+    try:
+        reader = pd.read_csv(input_path, sep=';', chunksize=chunksize)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"The input file at {input_path} was not found. Error: {e}")
+
+    profile = DatasetProfile()
+    index = RowHashIndex.load(index_path) if index_path is not None else RowHashIndex()
+    with reader:
+        for i, chunk in enumerate(reader):
+            profile.update(chunk)
+            is_duplicate = index.find_duplicates(chunk)
+
+            chunk[is_duplicate].to_csv(duplicates_file, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            chunk[~is_duplicate].to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+    if not profile.columns:
+        raise ValueError(f"The input file at {input_path} contains no rows.")
+    if index_path is not None:
+        index.save(index_path)
+
+    profile.overview_table().to_csv(os.path.join(log_path, "dataset_overview.csv"), index=False)
+    profile.missing_table().to_csv(os.path.join(log_path, "missing_values.csv"), index=False)
+    return profile
@@ -1,8 +1,142 @@
 # Author: Timothy Singh
 # Date: 2024-12-14
 
+import os
+import sys
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import cross_validate
+from joblib import Parallel, delayed
+from sklearn.base import clone, is_classifier
+from scipy.stats import ttest_rel
+from sklearn.model_selection import check_cv
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fold_cache import fit_and_score, fold_transforms
+
+# Columns of the scores table, in the order returned by cross_validate
+SCORE_COLUMNS = ["fit_time", "score_time", "test_score", "train_score"]
+
+
+class CVResult:
+    """
+    Per-fold cross-validation results of one model. Scores are only formatted for reports.
+
+    Parameters
+    ----------
+    fit_time : array-like
+        seconds spent fitting the model on every fold, including its preprocessing
+    score_time : array-like
+        seconds spent scoring the validation rows of every fold
+    test_score : array-like
+        validation score of every fold
+    train_score : array-like
+        training score of every fold
+    peak_memory : array-like or None
+        peak bytes allocated through Python and NumPy while fitting and scoring every fold, measured
+        in a separate traced fit so the times are untraced, and process-wide; None when not tracked
+    n_val : array-like
+        number of validation rows of every fold
+    """
+
+    def __init__(self, fit_time, score_time, test_score, train_score, peak_memory, n_val):
+        self.fit_time = np.asarray(fit_time, dtype=float)
+        self.score_time = np.asarray(score_time, dtype=float)
+        self.test_score = np.asarray(test_score, dtype=float)
+        self.train_score = np.asarray(train_score, dtype=float)
+        self.peak_memory = None if peak_memory is None else np.asarray(peak_memory, dtype=np.int64)
+        self.n_val = np.asarray(n_val, dtype=np.int64)
+
+    @property
+    def predict_throughput(self):
+        """
+        Validation rows scored per second on every fold.
+        """
+        return self.n_val / self.score_time
+
+    def summary(self):
+        """
+        Number of folds scored, mean and standard deviation over the folds of every score and time,
+        the highest peak memory, when tracked, and the mean prediction throughput.
+
+        Returns
+        ----------
+            pandas Series of floats
+        """
+        values = {"folds": len(self.test_score)}
+        for column in SCORE_COLUMNS:
+            scores = pd.Series(getattr(self, column))
+            values[f"{column}_mean"] = scores.mean()
+            values[f"{column}_std"] = scores.std()
+        if self.peak_memory is not None:
+            values["peak_memory_mb"] = self.peak_memory.max() / 1024 ** 2
+        values["predict_rows_per_s"] = self.predict_throughput.mean()
+        return pd.Series(values)
+
+    def format(self):
+        """
+        Scores as "mean (+/- std)" strings, in the order returned by cross_validate.
+        """
+        return _format_scores({column: getattr(self, column) for column in SCORE_COLUMNS})
+
+
+def results_table(results):
+    """
+    Numeric summary of the cross-validation results of several models, one row per model.
+
+    Parameters
+    ----------
+    results : dict
+        CVResult by model name
+
+    Returns
+    ----------
+        pandas DataFrame with the columns of ``CVResult.summary``
+    """
+    return pd.DataFrame({model_key: result.summary() for model_key, result in results.items()}).T
+
+
+def format_results(results):
+    """
+    Report table of the cross-validation results of several models, with "mean (+/- std)" strings.
+
+    Parameters
+    ----------
+    results : dict
+        CVResult by model name
+
+    Returns
+    ----------
+        pandas DataFrame with one row per model and the columns of ``SCORE_COLUMNS``
+    """
+    return pd.DataFrame({model_key: result.format() for model_key, result in results.items()}).T
+
+
+def select_model(results, min_throughput=None):
+    """
+    Name of the model with the highest mean validation score, among the ones predicting fast enough.
+
+    Parameters
+    ----------
+    results : dict
+        CVResult by model name
+    min_throughput : float, optional
+        fewest validation rows per second a model must score (default is None, any speed)
+
+    Returns
+    ----------
+        str, the first of the best models in the order of ``results``
+
+    Raises
+    ----------
+    ValueError
+        If no model meets ``min_throughput``.
+    """
+    table = results_table(results)
+    if min_throughput is not None:
+        table = table[table["predict_rows_per_s"] >= min_throughput]
+        if table.empty:
+            raise ValueError(f"No model scores {min_throughput} rows per second.")
+    return table["test_score_mean"].idxmax()
+
 
 def get_cross_val_scores(model, X_train, y_train):
     """
@@ -19,7 +153,8 @@ def get_cross_val_scores(model, X_train, y_train):
 
     Returns
     ----------
-        pandas Series with all mean scores from cross_validation
+        pandas Series with all mean scores from cross_validation, as "mean (+/- std)" strings;
+        use ``cross_validate_models`` to keep the per-fold numbers
     """
     if not isinstance(X_train, pd.DataFrame):
         raise TypeError(f"X_train should be of type pd.Dataframe. Got {type(X_train)}")
@@ -33,13 +168,12 @@ def get_cross_val_scores(model, X_train, y_train):
     if y_train.shape[0] == 0:
         raise ValueError("The y_train DataFrame is empty.")
 
-    scores = cross_validate(model, 
-                            X_train, 
-                            y_train, 
-                            cv = 5, 
-                            return_train_score = True
-                            )
-    
+    return cross_validate_models({"model": model}, X_train, y_train, cv=5, verbose=False)["model"].format()
+
+def _format_scores(scores):
+    """
+    Summarize the per-fold scores of one model as "mean (+/- std)" strings.
+    """
     mean_scores = pd.DataFrame(scores).mean()
     std_scores = pd.DataFrame(scores).std()
     result_scores =[]
@@ -48,3 +182,192 @@ def get_cross_val_scores(model, X_train, y_train):
 
 
     return pd.Series(data=result_scores, index=mean_scores.index)
+
+def _fit_and_score_fold(model_key, fold, estimator, X_fit, y_fit, X_val, y_val, preprocess_time, track_memory=False):
+    """
+    Fit the final estimator of one model on one preprocessed fold and score it, counting the preprocessing in the fit time.
+    """
+    scores = fit_and_score(estimator, X_fit, y_fit, X_val, y_val, track_memory=track_memory)
+    scores["fit_time"] += preprocess_time
+    scores["n_val"] = len(y_val)
+    return model_key, fold, scores
+
+def cross_validate_models(models, X_train, y_train, cv=5, n_jobs=None, verbose=True, cache=None, track_memory=False):
+    """
+    Cross-validate several models with every (model, fold) fit scheduled as one job set on a shared worker pool.
+
+    The folds are the ones cross_validate uses for ``cv``, and every fit is scored the same way,
+    so the test and train scores are identical to calling sklearn's cross_validate per model.
+    Jobs complete in any order; progress is printed as each one finishes.
+
+    The preprocessing steps of pipelines are fitted once per fold and shared through a
+    ``FoldTransformCache``, so only the final estimators are fitted in the jobs. The fit time of
+    a fold includes the time its preprocessing took when it was first fitted.
+
+    Parameters
+    ----------
+    models : dict
+        scikit-learn models by name
+    X_train : pandas DataFrame
+        values for features from training data
+    y_train : pandas Series or DataFrame
+        values for target from training data
+    cv : int, optional
+        number of folds (default is 5)
+    n_jobs : int, optional
+        number of worker processes; None runs the fits one after another in this process and
+        -1 uses every core (default is None)
+    verbose : bool, optional
+        whether to print progress (default is True)
+    cache : FoldTransformCache, optional
+        cache of the preprocessed folds (default is the cache shared by the process)
+    track_memory : bool, optional
+        whether to measure the peak memory of every fold, which fits each fold a second time
+        under tracemalloc (default is False)
+
+    Returns
+    ----------
+        dict of CVResult by model name, in the order of ``models``
+    """
+    y, folds = _training_folds(models, X_train, y_train, cv)
+    jobs = []
+    for model_key, model in models.items():
+        estimator, transformed = fold_transforms(model, X_train, y, folds, cache)
+        jobs += [delayed(_fit_and_score_fold)(model_key, fold, clone(estimator), *fold_data, track_memory)
+                 for fold, fold_data in enumerate(transformed)]
+
+    scores = {model_key: [None] * len(folds) for model_key in models}
+    parallel = Parallel(n_jobs=n_jobs, return_as="generator_unordered")
+    for done, (model_key, fold, fold_scores) in enumerate(parallel(jobs), start=1):
+        scores[model_key][fold] = fold_scores
+        if verbose:
+            print(f"[{done}/{len(jobs)}] {model_key} fold {fold + 1}: test score {fold_scores['test_score']:.3f}")
+
+    return {model_key: _cv_result(fold_scores) for model_key, fold_scores in scores.items()}
+
+
+def race_models(models, X_train, y_train, cv=5, confidence=0.95, min_folds=2, max_fits=None, n_jobs=None,
+                verbose=True, cache=None, track_memory=False):
+    """
+    Cross-validate several models fold by fold, eliminating the ones statistically dominated by the leader.
+
+    Every round scores the remaining models on one more fold, in parallel. From ``min_folds``
+    folds on, each model is compared with the model of highest mean validation score by a
+    one-sided paired t-test over the folds seen so far, and dropped when the leader is better
+    at the ``confidence`` level. Weak candidates cost a few fits instead of ``cv``, so the cost
+    of selection grows with the number of plausible models. The race stops once a single model
+    is left; models racing to the last fold have the same scores as with ``cross_validate_models``.
+
+    Parameters
+    ----------
+    models : dict
+        scikit-learn models by name
+    X_train : pandas DataFrame
+        values for features from training data
+    y_train : pandas Series or DataFrame
+        values for target from training data
+    cv : int, optional
+        number of folds, i.e. the most rounds (default is 5)
+    confidence : float, optional
+        confidence level of the elimination test (default is 0.95)
+    min_folds : int, optional
+        folds scored before the first elimination (default is 2)
+    max_fits : int, optional
+        most model fits; the race stops before a round that would exceed it. It must cover the
+        ``min_folds`` rounds of every model run before the first elimination (default is None, no limit)
+    n_jobs : int, optional
+        number of worker processes (default is None, one)
+    verbose : bool, optional
+        whether to print the progress and eliminations (default is True)
+    cache : FoldTransformCache, optional
+        cache of the preprocessed folds (default is the cache shared by the process)
+    track_memory : bool, optional
+        whether to measure the peak memory of every fold (default is False)
+
+    Returns
+    ----------
+        tuple of a dict of CVResult by model name, over the folds each model was scored on, and
+        the list of the models still in the race
+    """
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence should be between 0 and 1. Got {confidence}")
+    if max_fits is not None and max_fits < len(models) * min_folds:
+        raise ValueError(f"max_fits should be at least {len(models) * min_folds} to score the {len(models)} models "
+                         f"on the first {min_folds} folds before any elimination. Got {max_fits}")
+    y, folds = _training_folds(models, X_train, y_train, cv)
+
+    scores = {model_key: [] for model_key in models}
+    alive = list(models)
+    fits = 0
+    for fold, (train, test) in enumerate(folds):
+        if max_fits is not None and fits + len(alive) > max_fits:
+            if verbose:
+                print(f"Fit budget of {max_fits} reached after {fold} folds.")
+            break
+        jobs = []
+        for model_key in alive:
+            estimator, transformed = fold_transforms(models[model_key], X_train, y, [(train, test)], cache)
+            jobs.append(delayed(_fit_and_score_fold)(model_key, fold, clone(estimator), *transformed[0], track_memory))
+        for model_key, _, fold_scores in Parallel(n_jobs=n_jobs, return_as="generator_unordered")(jobs):
+            scores[model_key].append(fold_scores)
+        fits += len(jobs)
+
+        dominated = []
+        if fold + 1 >= min_folds and len(alive) > 1:
+            dominated = _dominated({model_key: [s["test_score"] for s in scores[model_key]] for model_key in alive},
+                                   confidence)
+            alive = [model_key for model_key in alive if model_key not in dominated]
+        if verbose:
+            eliminated = f", eliminated {', '.join(dominated)}" if dominated else ""
+            print(f"Round {fold + 1}/{len(folds)}: {len(jobs)} models scored{eliminated}.")
+        if len(alive) == 1 and fold + 1 >= min_folds:
+            break
+
+    return {model_key: _cv_result(fold_scores) for model_key, fold_scores in scores.items() if fold_scores}, alive
+
+
+def _dominated(test_scores, confidence):
+    """
+    Models whose validation scores are below the leader's by a one-sided paired t-test at the confidence level.
+    """
+    means = {model_key: np.mean(fold_scores) for model_key, fold_scores in test_scores.items()}
+    leader = max(means, key=means.get)
+    dominated = []
+    for model_key, fold_scores in test_scores.items():
+        if model_key == leader:
+            continue
+        differences = np.subtract(test_scores[leader], fold_scores)
+        if not differences.any():
+            continue
+        if np.ptp(differences) == 0:
+            # The leader is ahead by the same margin on every fold
+            dominated.append(model_key)
+            continue
+        p_value = ttest_rel(test_scores[leader], fold_scores, alternative="greater").pvalue
+        if p_value < 1 - confidence:
+            dominated.append(model_key)
+    return dominated
+
+
+def _training_folds(models, X_train, y_train, cv):
+    """
+    Check the training data and split it into the folds cross_validate uses.
+    """
+    if not isinstance(X_train, pd.DataFrame):
+        raise TypeError(f"X_train should be of type pd.Dataframe. Got {type(X_train)}")
+
+    if not (isinstance(y_train, pd.DataFrame) or isinstance(y_train, pd.Series)):
+        raise TypeError(f"y_train should be of type pd.Dataframe or pd.Series. Got {type(y_train)}")
+
+    if X_train.shape[0] == 0 or y_train.shape[0] == 0:
+        raise ValueError("The training data is empty.")
+
+    y = y_train.iloc[:, 0] if isinstance(y_train, pd.DataFrame) and y_train.shape[1] == 1 else y_train
+    classifier = any(is_classifier(model) for model in models.values())
+    return y, list(check_cv(cv, y, classifier=classifier).split(X_train, y))
+
+
+def _cv_result(fold_scores):
+    peak_memory = [s["peak_memory"] for s in fold_scores] if "peak_memory" in fold_scores[0] else None
+    return CVResult(**{field: [s[field] for s in fold_scores] for field in SCORE_COLUMNS + ["n_val"]},
+                    peak_memory=peak_memory)
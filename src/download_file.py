@@ -1,38 +1,297 @@
 import os
+import json
+import hashlib
+import threading
 import requests
-import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
-def download_file(url, output_path):
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _make_session(num_workers):
     """
-    Download a file from the given URL and save it to the specified local path.
+    Create a requests session whose connection pool can serve every worker.
+
+    Parameters:
+    ----------
+    num_workers : int
+        Number of concurrent range requests that will share the session.
+
+    Returns:
+    -------
+    requests.Session
+        Session with an HTTP(S) adapter sized to the worker count.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(num_workers, 1), max_retries=3)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _probe(session, url):
+    """
+    Ask the server for the size of the resource and whether it accepts byte ranges.
 
     Parameters:
     ----------
+    session : requests.Session
+        Session used to send the HEAD request.
     url : str
         The URL of the file to download.
-    output_path : str
-        The local path where the file will be saved.
+
+    Returns:
+    -------
+    tuple
+        (size, accepts_ranges, validator) where size is None when unknown and validator is
+        the ETag or Last-Modified header used to detect a changed remote file.
+    """
+    try:
+        response = session.head(url, allow_redirects=True)
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        return None, False, None
+
+    size = response.headers.get("Content-Length")
+    size = int(size) if size is not None and size.isdigit() else None
+    accepts_ranges = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+    validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+    return size, accepts_ranges, validator
+
+
+def _load_state(state_path, url, size, validator, part_size):
+    """
+    Load the sidecar state of an interrupted download if it still describes the same remote file.
+
+    Parameters:
+    ----------
+    state_path : str
+        Path of the JSON sidecar file.
+    url : str
+        The URL of the file to download.
+    size : int
+        Current size of the remote file.
+    validator : str or None
+        Current ETag or Last-Modified value of the remote file.
+    part_size : int
+        Size in bytes of each range request.
+
+    Returns:
+    -------
+    dict or None
+        The saved state, or None when there is nothing to resume.
+    """
+    try:
+        with open(state_path, "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    expected = {"url": url, "size": size, "validator": validator, "part_size": part_size}
+    if any(state.get(key) != value for key, value in expected.items()):
+        return None
+    return state
+
+
+def _save_state(state_path, state):
+    """
+    Atomically write the download state to its sidecar file.
+
+    Parameters:
+    ----------
+    state_path : str
+        Path of the JSON sidecar file.
+    state : dict
+        State to persist.
 
     Returns:
     -------
     None
     """
-    response = requests.get(url, stream=True)
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
 
+
+def _verify_checksum(path, checksum):
+    """
+    Compare the digest of a file against an expected checksum.
+
+    Parameters:
+    ----------
+    path : str
+        Path of the file to hash.
+    checksum : str
+        Expected digest, either "<algorithm>:<hexdigest>" or a bare SHA-256 hex digest.
+
+    Returns:
+    -------
+    None
+    """
+    algorithm, _, expected = checksum.rpartition(":")
+    digest = hashlib.new(algorithm or "sha256")
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    if digest.hexdigest().lower() != expected.lower():
+        raise ValueError(f"Checksum mismatch for {path}: expected {expected}, got {digest.hexdigest()}.")
+
+
+def _download_stream(session, url, part_path):
+    """
+    Download the whole resource with a single streamed GET request.
+
+    Parameters:
+    ----------
+    session : requests.Session
+        Session used to send the request.
+    url : str
+        The URL of the file to download.
+    part_path : str
+        Temporary path the bytes are written to.
+
+    Returns:
+    -------
+    None
+    """
     try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()  # Raise an HTTPError for bad responses
+        response = session.get(url, stream=True)
+        response.raise_for_status()
     except requests.exceptions.RequestException as e:
         raise ValueError(f"Failed to fetch data from URL: {url}. Error: {e}")
 
+    with response, open(part_path, "wb") as file:
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            file.write(chunk)
+
+
+def _download_ranges(session, url, part_path, state_path, size, validator, part_size, num_workers):
+    """
+    Download the resource as concurrent byte-range requests, resuming from the sidecar state.
+
+    Parameters:
+    ----------
+    session : requests.Session
+        Session shared by all workers.
+    url : str
+        The URL of the file to download.
+    part_path : str
+        Temporary path the bytes are written to.
+    state_path : str
+        Path of the JSON sidecar recording which parts are complete.
+    size : int
+        Size of the remote file in bytes.
+    validator : str or None
+        ETag or Last-Modified value of the remote file.
+    part_size : int
+        Size in bytes of each range request.
+    num_workers : int
+        Number of concurrent range requests.
+
+    Returns:
+    -------
+    None
+    """
+    state = _load_state(state_path, url, size, validator, part_size) if os.path.exists(part_path) else None
+    if state is None:
+        state = {"url": url, "size": size, "validator": validator, "part_size": part_size, "done": []}
+        with open(part_path, "wb") as file:
+            file.truncate(size)
+        _save_state(state_path, state)
+
+    done = set(state["done"])
+    pending = [i for i in range((size + part_size - 1) // part_size) if i not in done]
+    lock = threading.Lock()
+
+    def fetch_part(index):
+        start = index * part_size
+        end = min(start + part_size, size) - 1
+        try:
+            response = session.get(url, headers={"Range": f"bytes={start}-{end}"}, stream=True)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise ValueError(f"Failed to fetch data from URL: {url}. Error: {e}")
+        if response.status_code != 206:
+            raise ValueError(f"Server ignored the byte range request for {url} (status {response.status_code}).")
+
+        with response, open(part_path, "r+b") as file:
+            file.seek(start)
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                file.write(chunk)
+            if file.tell() != end + 1:
+                raise ValueError(f"Incomplete byte range {start}-{end} received from {url}.")
+
+        with lock:
+            state["done"].append(index)
+            _save_state(state_path, state)
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        for future in [executor.submit(fetch_part, i) for i in pending]:
+            future.result()
+
+
+def download_file(url, output_path, num_workers=4, part_size=DEFAULT_PART_SIZE, checksum=None, session=None):
+    """
+    Download a file from the given URL and save it to the specified local path.
+
+    Large files are split into concurrent byte-range requests over a pooled session. Progress is
+    recorded in a sidecar state file (``<output_path>.state``) so an interrupted transfer resumes
+    where it stopped. Servers without range support are downloaded with a single stream.
+
+    Parameters:
+    ----------
+    url : str
+        The URL of the file to download.
+    output_path : str
+        The local path where the file will be saved.
+    num_workers : int, optional
+        Number of concurrent range requests (default is 4).
+    part_size : int, optional
+        Size in bytes of each range request (default is 8 MiB).
+    checksum : str, optional
+        Expected digest of the file, either "<algorithm>:<hexdigest>" or a bare SHA-256 hex digest.
+    session : requests.Session, optional
+        Session to use instead of a newly created pooled session.
+
+    Returns:
+    -------
+    None
+    """
+    part_path = output_path + ".part"
+    state_path = output_path + ".state"
+    session = session or _make_session(num_workers)
+
     try:
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
     except OSError as e:
         raise OSError(f"Failed to create directory for output path {output_path}. Error: {e}")
 
+    size, accepts_ranges, validator = _probe(session, url)
+
     try:
-        with open(output_path, 'wb') as file:
-            for chunk in response.iter_content(chunk_size=8192):
-                file.write(chunk)
+        if accepts_ranges and size is not None and size > part_size and num_workers > 1:
+            _download_ranges(session, url, part_path, state_path, size, validator, part_size, num_workers)
+        else:
+            _download_stream(session, url, part_path)
+    except requests.exceptions.RequestException as e:
+        raise ValueError(f"Failed to fetch data from URL: {url}. Error: {e}")
     except IOError as e:
-        raise IOError(f"Failed to write to file {output_path}. Error: {e}")
\ No newline at end of file
+        raise IOError(f"Failed to write to file {output_path}. Error: {e}")
+
+    if checksum is not None:
+        try:
+            _verify_checksum(part_path, checksum)
+        except ValueError:
+            os.remove(part_path)
+            if os.path.exists(state_path):
+                os.remove(state_path)
+            raise
+
+    os.replace(part_path, output_path)
+    if os.path.exists(state_path):
+        os.remove(state_path)
@@ -1,24 +1,237 @@
 # Author: Bryan Lee
 # Date: 2024-12-07
 
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
 import os
+import sys
+import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from artifacts import artifact_path, load_frame, save_frame
+from profiler import DatasetProfile
+from binned_pairplot import plot_binned_pairplot
+from binned_kde import binned_kde
+
+# File name and label of every chart, in the order they appear in the report
+CHARTS = [
+    ("target_distribution_plot", "Target distribution plot"),
+    ("correlation_heatmap", "Correlation heatmap"),
+    ("feature_distributions", "Feature distribution plot"),
+    ("feature_pairplots", "Feature Pairplot"),
+]
+
+def plot_target_distribution(y_train):
+    """
+    Create a countplot of the target classes.
+    """
+    # seaborn is only imported by the charts drawn with it, the binned charts do not need it
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(8, 4))
+    sns.countplot(x=y_train.iloc[:, 0], ax=ax)
+    ax.set_title("Distribution of Target Class in the Data Set")
+    return fig
+
+def plot_correlation_heatmap(correlation_matrix, method='pearson'):
+    """
+    Create a heatmap of the correlation matrix of the features, computed with ``method``.
+    """
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(7, 5))
+    sns.heatmap(
+        correlation_matrix, annot=True, fmt=".2f", cmap="Blues", cbar=True, annot_kws={'size': 10, 'color': 'black'}, linewidths=0.6, ax=ax)
+    ax.set_title(f"Wine Quality Features Heatmap - {method.capitalize()} Correlation")
+    fig.tight_layout()
+    return fig
+
+def plot_feature_distributions(X_train):
+    """
+    Create a stack of Kernel Density Estimation (KDE) plots, one per feature.
+
+    The densities of all features are estimated together by ``binned_kde``, with the same
+    bandwidth and support as ``sns.kdeplot``. Constant features are left empty, as in seaborn.
+    """
+    num_features = len(X_train.columns)
+    grid, density = binned_kde(X_train)
+    fig, axes = plt.subplots(nrows=num_features, ncols=1, figsize=(10, 2*num_features), squeeze=False)
+    for i, column in enumerate(X_train.columns):
+        ax = axes[i, 0]
+        if not np.isnan(density[i]).any():
+            line, = ax.plot(grid[i], density[i])
+            ax.fill_between(grid[i], density[i], color=line.get_color(), alpha=0.25, linewidth=0)
+            ax.set_ylim(bottom=0)
+        ax.set_title(f"KDE for {column}")
+        ax.set_xlabel("Value")
+        ax.set_ylabel("Density")
+    fig.tight_layout()
+    return fig
+
+def plot_feature_pairplot(X_train, kind='reg', sample_size=0):
+    """
+    Create a regression pairplot of all features.
+
+    With kind="binned" the panels are drawn from 2D histograms with closed-form regression lines
+    (see ``plot_binned_pairplot``), so the drawing time does not grow with the number of rows;
+    with kind="reg" every point is drawn by seaborn with a bootstrapped regression fit per panel.
+    ``sample_size`` reservoir-sampled rows are overlaid as points on the binned panels.
+    """
+    if kind == 'binned':
+        fig = plot_binned_pairplot(X_train, sample_size=sample_size)
+    elif kind == 'reg':
+        import seaborn as sns
+        fig = sns.pairplot(X_train, kind='reg', diag_kind='hist').figure
+    else:
+        raise ValueError(f"Unknown pairplot kind {kind}. Expected 'binned' or 'reg'.")
+    fig.suptitle('Regression Pairplot for All Features', size=30)
+    fig.subplots_adjust(top=0.94)
+    return fig
+
+def render_chart(name, X_train, y_train, correlation_matrix, figures_path, pairplot_kind='reg', pairplot_sample=0,
+                 correlation_method='pearson'):
+    """
+    Create one EDA chart, save it as a 300 dpi png and close its figure.
+
+    Parameters:
+    ----------
+    name : str
+        Name of the chart in ``CHARTS``, also the name of the saved file.
+    X_train : pd.DataFrame
+        Training features.
+    y_train : pd.DataFrame
+        Training target.
+    correlation_matrix : pd.DataFrame
+        Correlation matrix of the training features.
+    figures_path : str
+        Directory where the chart is saved.
+    pairplot_kind : str, optional
+        Pairplot engine, "reg" (default) or "binned" (see ``plot_feature_pairplot``).
+    pairplot_sample : int, optional
+        Number of sampled rows overlaid on the binned pairplot (default is 0).
+    correlation_method : str, optional
+        Method the correlation matrix was computed with, shown in the heatmap title (default is "pearson").
+
+    Returns:
+    -------
+    float
+        Seconds spent creating and saving the chart.
+    """
+    start = time.perf_counter()
+    if name == "target_distribution_plot":
+        fig = plot_target_distribution(y_train)
+    elif name == "correlation_heatmap":
+        fig = plot_correlation_heatmap(correlation_matrix, correlation_method)
+    elif name == "feature_distributions":
+        fig = plot_feature_distributions(X_train)
+    elif name == "feature_pairplots":
+        fig = plot_feature_pairplot(X_train, pairplot_kind, pairplot_sample)
+    else:
+        raise ValueError(f"Unknown chart {name}.")
+    try:
+        fig.savefig(os.path.join(figures_path, f"{name}.png"), format="png", dpi=300)
+    finally:
+        plt.close(fig)
+    return time.perf_counter() - start
+
+def _init_render_worker():
+    # Worker processes render off-screen, whatever backend the parent uses
+    plt.switch_backend("Agg")
+
+def _render_chart_task(task):
+    """
+    Render one chart in a worker process from the shared memory-mapped copy of the training data.
+    """
+    name, data_dir, correlation_matrix, figures_path, pairplot_kind, pairplot_sample, correlation_method = task
+    try:
+        X_train = load_frame(os.path.join(data_dir, "X_train.npy"))
+        y_train = load_frame(os.path.join(data_dir, "y_train.npy"))
+        return render_chart(name, X_train, y_train, correlation_matrix, figures_path,
+                            pairplot_kind, pairplot_sample, correlation_method), None
+    except Exception as e:
+        return None, str(e)
+
+def render_charts(X_train, y_train, correlation_matrix, figures_path, workers=None, pairplot_kind='reg', pairplot_sample=0,
+                  correlation_method='pearson'):
+    """
+    Render every chart of ``CHARTS``, each in its own worker process when several are available.
+
+    The training data is written once to memory-mapped ``.npy`` files in a temporary directory,
+    which every worker maps read-only instead of receiving its own pickled copy. Workers render
+    with the off-screen Agg backend, so the wall time is bounded by the slowest chart.
+
+    Parameters:
+    ----------
+    X_train : pd.DataFrame
+        Training features.
+    y_train : pd.DataFrame
+        Training target.
+    correlation_matrix : pd.DataFrame
+        Correlation matrix of the training features.
+    figures_path : str
+        Directory where the charts are saved.
+    workers : int, optional
+        Number of worker processes. Defaults to one per chart, up to the number of CPUs; with
+        one worker the charts are rendered in the calling process.
+    pairplot_kind : str, optional
+        Pairplot engine, "reg" (default) or "binned" (see ``plot_feature_pairplot``).
+    pairplot_sample : int, optional
+        Number of sampled rows overlaid on the binned pairplot (default is 0).
+    correlation_method : str, optional
+        Method the correlation matrix was computed with (default is "pearson").
+
+    Returns:
+    -------
+    dict
+        Seconds spent on each chart that was saved, by chart name.
+    """
+    if workers is None:
+        workers = min(len(CHARTS), os.cpu_count() or 1)
+
+    if workers <= 1:
+        results = []
+        for name, _ in CHARTS:
+            try:
+                results.append((render_chart(name, X_train, y_train, correlation_matrix, figures_path,
+                                             pairplot_kind, pairplot_sample, correlation_method), None))
+            except Exception as e:
+                results.append((None, str(e)))
+    else:
+        with tempfile.TemporaryDirectory() as data_dir:
+            save_frame(X_train, os.path.join(data_dir, "X_train.npy"))
+            save_frame(y_train, os.path.join(data_dir, "y_train.npy"))
+            tasks = [(name, data_dir, correlation_matrix, figures_path, pairplot_kind, pairplot_sample, correlation_method)
+                     for name, _ in CHARTS]
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker) as pool:
+                results = list(pool.map(_render_chart_task, tasks))
+
+    timings = {}
+    for (name, label), (seconds, error) in zip(CHARTS, results):
+        if error is not None:
+            print(f"Unexpected error during {label.lower()}: {error}")
+        else:
+            timings[name] = seconds
+            print(f"{label} saved in {seconds:.2f}s.")
+    return timings
 
 # EDA Charts
-def run_eda_charts(figures_path, tables_path, train_test_path):
+def run_eda_charts(figures_path, tables_path, train_test_path, fmt='csv', profile_path=None, workers=None,
+                   pairplot_kind='reg', pairplot_sample=0, correlation_method='pearson'):
     """
     Generates and saves exploratory data analysis (EDA) charts and tables for the training dataset.
 
     This function performs several EDA tasks on the training data:
-    1. It saves a descriptive statistics table of the features.
+    1. It profiles the features in one pass and saves a descriptive statistics table derived from the profile.
     2. It creates and saves a distribution plot for the target variable.
-    3. It generates a correlation heatmap for the features.
+    3. It generates a correlation heatmap for the features from the profile.
     4. It creates Kernel Density Estimation (KDE) plots for each feature's distribution.
     5. It creates and saves a pairplot showing the relationships between all features.
 
     All generated plots are saved in the specified directory, and tables are stored in another directory.
+    The charts are rendered in parallel worker processes by ``render_charts``, and the time spent on
+    each is printed.
 
     Parameters:
     ----------
@@ -34,10 +247,31 @@ def run_eda_charts(figures_path, tables_path, train_test_path):
         The directory path where the training data files (X_train.csv and y_train.csv) are stored. These files are 
         used to generate the EDA charts and tables.
 
+    fmt : str, optional
+        Artifact format of the training data files: "csv" or "npy" (default is "csv").
+
+    profile_path : str, optional
+        File path where the profile of the training features is saved as a pickle artifact.
+
+    workers : int, optional
+        Number of processes rendering the charts. Defaults to one per chart, up to the number of CPUs.
+
+    pairplot_kind : str, optional
+        Pairplot engine: "reg" (default), seaborn's per-point regression pairplot shown in the
+        report, or "binned", drawn from 2D histograms in a time independent of the number of rows.
+
+    pairplot_sample : int, optional
+        Number of reservoir-sampled rows overlaid as points on the binned pairplot (default is 0).
+
+    correlation_method : str, optional
+        Correlation shown in the heatmap: "pearson" (default), exact from the profile's co-moments,
+        or "spearman" or "kendall", estimated from the profile's rank sample.
+
     Returns:
     -------
-    None
-        This function does not return any value but will print success or error messages as it processes each step.
+    dict
+        Seconds spent on each saved chart, by chart name. Success or error messages are printed as
+        each step is processed.
 
     Raises:
     ------
@@ -48,61 +282,21 @@ def run_eda_charts(figures_path, tables_path, train_test_path):
     try:
         os.makedirs(figures_path, exist_ok=True)
         os.makedirs(tables_path, exist_ok=True)
-        X_train = pd.read_csv(os.path.join(train_test_path, 'X_train.csv'))
-        y_train = pd.read_csv(os.path.join(train_test_path, 'y_train.csv'))
+        X_train = load_frame(artifact_path(train_test_path, 'X_train', fmt))
+        y_train = load_frame(artifact_path(train_test_path, 'y_train', fmt))
+
+        # One-pass profile shared by the describe table and the correlation heatmap
+        profile = DatasetProfile.from_frame(X_train)
+        if profile_path is not None:
+            profile.save(profile_path)
 
         # Describe plot
-        describe_df = X_train.describe()
+        describe_df = profile.describe_table()
         describe_df.to_csv(os.path.join(tables_path, "describe_table.csv"))
         print('Describe table saved.')
     except Exception as e:
         print(f"Describe plot error: {e}")
-    
-    try:
-        # Target Distribution Plot
-        plt.figure(figsize=(8, 4))
-        sns.countplot(x=y_train.iloc[:, 0])
-        plt.title("Distribution of Target Class in the Data Set")
-        plt.savefig(os.path.join(figures_path, "target_distribution_plot.png"), format="png", dpi=300)
-        print('Target distribution plot saved.')
-    except Exception as e:
-        print(f"Unexpected error during target distribution plot: {e}")
+        return {}
 
-    try:
-        # Correlation Heatmap
-        plt.figure(figsize=(7, 5))
-        correlation_matrix = X_train.corr(method='pearson')
-        sns.heatmap(
-            correlation_matrix, annot=True, fmt=".2f", cmap="Blues", cbar=True, annot_kws={'size': 10, 'color': 'black'}, linewidths=0.6)
-        plt.title("Wine Quality Features Heatmap - Pearson Correlation")
-        plt.tight_layout()
-        plt.savefig(os.path.join(figures_path, "correlation_heatmap.png"), format="png", dpi=300)
-        print('Correlation heatmap saved.')
-    except Exception as e:
-        print(f"Unexpected error during correlation heatmap: {e}")
-
-    try:
-        # KDE Plot for Feature Distributions
-        num_features = len(X_train.columns)
-        fig, axes = plt.subplots(nrows=num_features, ncols=1, figsize=(10, 2*num_features))
-        for i, column in enumerate(X_train.columns):
-            sns.kdeplot(X_train[column], ax=axes[i], fill=True)
-            axes[i].set_title(f"KDE for {column}")
-            axes[i].set_xlabel("Value")
-            axes[i].set_ylabel("Density")
-        plt.tight_layout()
-        plt.savefig(os.path.join(figures_path, "feature_distributions.png"), format="png", dpi=300)
-        print("Feature distribution plot saved.")
-    except Exception as e:
-        print(f"Unexpected error during feature distribution plot: {e}")
-
-    try:
-        # Pairplot for all features
-        plt.figure(figsize=(8, 4))
-        feature_pairplot = sns.pairplot(X_train, kind='reg', diag_kind='hist')
-        feature_pairplot.fig.suptitle('Regression Pairplot for All Features', size=30)
-        feature_pairplot.fig.subplots_adjust(top=0.94)
-        plt.savefig(os.path.join(figures_path, "feature_pairplots.png"), format="png", dpi=300)
-        print("Feature Pairplot saved.")
-    except Exception as e:
-        print(f"Unexpected error during feature pairplot: {e}")
\ No newline at end of file
+    return render_charts(X_train, y_train, profile.correlation(correlation_method), figures_path, workers,
+                         pairplot_kind, pairplot_sample, correlation_method)
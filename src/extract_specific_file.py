@@ -1,6 +1,53 @@
 import os
-import requests
+import shutil
 import zipfile
+from contextlib import contextmanager
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def extract_files(zip_path, targets, buffer_size=COPY_BUFFER_SIZE):
+    """
+    Extract several files from a ZIP archive in a single pass, streaming each member to disk.
+
+    Members are copied through a fixed-size buffer, so peak memory does not depend on the
+    decompressed size of the member.
+
+    Parameters:
+    ----------
+    zip_path : str
+        Path to the ZIP archive.
+    targets : dict
+        Mapping of member name inside the archive to the path the member is saved to.
+    buffer_size : int, optional
+        Size in bytes of the copy buffer (default is 1 MiB).
+
+    Returns:
+    -------
+    None
+    """
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            missing = []
+            for name in targets:
+                try:
+                    zip_ref.getinfo(name)
+                except KeyError:
+                    missing.append(name)
+            if missing:
+                raise ValueError(f"The target file {', '.join(missing)} was not found in the ZIP archive.")
+
+            for target_file, output_path in targets.items():
+                output_dir = os.path.dirname(output_path)
+                if output_dir:
+                    os.makedirs(output_dir, exist_ok=True)
+                with zip_ref.open(target_file) as src, open(output_path, 'wb') as dest:
+                    shutil.copyfileobj(src, dest, buffer_size)
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ValueError(f"Failed to extract files {', '.join(targets)} from {zip_path}. Error: {e}")
+    except IOError as e:
+        raise IOError(f"Failed to write extracted files to {', '.join(targets.values())}. Error: {e}")
+
 
 def extract_specific_file(zip_path, target_file, output_path):
     """
@@ -19,16 +66,38 @@ def extract_specific_file(zip_path, target_file, output_path):
     -------
     None
     """
+    extract_files(zip_path, {target_file: output_path})
+
+
+@contextmanager
+def open_member(zip_path, target_file):
+    """
+    Open a file inside a ZIP archive as a decompressing binary stream.
+
+    The stream can be handed directly to a parser such as ``pd.read_csv`` (optionally with
+    ``chunksize``), so the member is never written to a temporary file or held in memory whole.
+
+    Parameters:
+    ----------
+    zip_path : str
+        Path to the ZIP archive.
+    target_file : str
+        The name of the file to open.
+
+    Yields:
+    -------
+    zipfile.ZipExtFile
+        Readable binary stream of the decompressed member.
+    """
     try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            if target_file not in zip_ref.namelist():
-                raise ValueError(f"The target file {target_file} was not found in the ZIP archive.")
+        zip_ref = zipfile.ZipFile(zip_path, 'r')
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Failed to open {target_file} from {zip_path}. Error: {e}")
 
-            # Extract only the specified file
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            with zip_ref.open(target_file) as src, open(output_path, 'wb') as dest:
-                dest.write(src.read())
-    except (zipfile.BadZipFile, KeyError) as e:
-        raise ValueError(f"Failed to extract file {target_file} from {zip_path}. Error: {e}")
-    except IOError as e:
-        raise IOError(f"Failed to write extracted file to {output_path}. Error: {e}")
\ No newline at end of file
+    with zip_ref:
+        try:
+            zip_ref.getinfo(target_file)
+        except KeyError:
+            raise ValueError(f"The target file {target_file} was not found in the ZIP archive.")
+        with zip_ref.open(target_file) as src:
+            yield src
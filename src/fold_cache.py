@@ -0,0 +1,270 @@
+import time
+import hashlib
+import tracemalloc
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from joblib import hash as joblib_hash
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+
+# Memory held by the transformed folds of one process; the wine data takes about 0.5 MB per fold
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def data_fingerprint(X, y=None):
+    """
+    Hash the content of a feature frame and its target, including column names and dtypes.
+
+    Parameters:
+    ----------
+    X : pd.DataFrame
+        Features.
+    y : pd.Series or pd.DataFrame, optional
+        Target.
+
+    Returns:
+    -------
+    str
+        Hex digest identifying the data.
+    """
+    digest = hashlib.sha256()
+    for data in (X, y):
+        if data is None:
+            continue
+        digest.update(repr(list(data.columns) if isinstance(data, pd.DataFrame) else data.name).encode())
+        digest.update(repr(list(data.dtypes) if isinstance(data, pd.DataFrame) else data.dtype).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def split_pipeline(model):
+    """
+    Split a model into its preprocessing steps and its final estimator.
+
+    Parameters:
+    ----------
+    model : estimator
+        A scikit-learn Pipeline or a single estimator.
+
+    Returns:
+    -------
+    tuple
+        (preprocessor, estimator): a Pipeline of every step but the last one, or None when the
+        model has no preprocessing, and the final estimator.
+    """
+    if isinstance(model, Pipeline) and len(model.steps) > 1:
+        return Pipeline(model.steps[:-1]), model.steps[-1][1]
+    return None, model
+
+
+def _nbytes(data):
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        return int(data.memory_usage(index=True, deep=True).sum())
+    return getattr(data, "nbytes", 0)
+
+
+class FoldTransformCache:
+    """
+    Bounded in-memory cache of preprocessing fitted on cross-validation folds.
+
+    An entry holds the fitted preprocessor and the transformed training and validation rows of
+    one fold. It is keyed on the preprocessor's parameters, the data and the fold indices, so
+    every model and every tuning trial sharing a preprocessor reuses its transforms instead of
+    refitting it. The least recently used entries are evicted once the cache holds more than
+    ``max_bytes``.
+
+    Parameters:
+    ----------
+    max_bytes : int, optional
+        Memory limit of the transformed data (default is 256 MiB). A single fold larger than
+        the limit is transformed but not kept.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, preprocessor, data_hash, train, test):
+        """
+        Cache key of a fold from the unfitted preprocessor's parameters, the data and the fold indices.
+        """
+        digest = hashlib.sha256()
+        digest.update(joblib_hash(clone(preprocessor)).encode())
+        digest.update(data_hash.encode())
+        for indices in (train, test):
+            digest.update(np.asarray(indices, dtype=np.int64).tobytes())
+            digest.update(b"|")
+        return digest.hexdigest()
+
+    def transform(self, preprocessor, X, y, train, test, data_hash=None):
+        """
+        Fit a preprocessor on the training rows of a fold and transform both parts, or reuse the cached result.
+
+        Parameters:
+        ----------
+        preprocessor : estimator
+            Unfitted transformer. It is cloned before fitting.
+        X : pd.DataFrame
+            Features.
+        y : pd.Series
+            Target.
+        train : np.ndarray
+            Positions of the training rows of the fold.
+        test : np.ndarray
+            Positions of the validation rows of the fold.
+        data_hash : str, optional
+            ``data_fingerprint(X, y)``, to avoid hashing the data once per fold.
+
+        Returns:
+        -------
+        tuple
+            (fitted, X_fit, X_val, fit_time): the fitted preprocessor, the transformed training
+            and validation rows, and the seconds spent fitting and transforming when the fold
+            was first seen. Cached arrays are shared: do not modify them.
+        """
+        key = self.key(preprocessor, data_hash or data_fingerprint(X, y), train, test)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        start = time.perf_counter()
+        fitted = clone(preprocessor)
+        X_fit = fitted.fit_transform(X.iloc[train], y.iloc[train])
+        X_val = fitted.transform(X.iloc[test])
+        entry = (fitted, X_fit, X_val, time.perf_counter() - start)
+
+        size = _nbytes(X_fit) + _nbytes(X_val)
+        if size <= self.max_bytes:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = entry
+                    self.nbytes += size
+                while self.nbytes > self.max_bytes:
+                    _, (_, old_fit, old_val, _) = self._entries.popitem(last=False)
+                    self.nbytes -= _nbytes(old_fit) + _nbytes(old_val)
+                    self.evictions += 1
+        return entry
+
+    def clear(self):
+        """
+        Drop every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def summary(self):
+        """
+        One-line report of the fits saved by the cache.
+        """
+        return (f"Fold transform cache: {self.misses} preprocessor fits, {self.hits} reused, "
+                f"{len(self)} folds held ({self.nbytes / 1024 ** 2:.1f} MiB), {self.evictions} evicted.")
+
+
+_shared_cache = FoldTransformCache()
+
+
+def shared_cache():
+    """
+    The cache shared by every cross-validation in this process, e.g. model selection and tuning
+    run in one process by ``scripts/run_pipeline.py``.
+    """
+    return _shared_cache
+
+
+def fold_transforms(model, X, y, folds, cache=None):
+    """
+    Preprocess every fold of a model once, reusing the folds already in the cache.
+
+    Parameters:
+    ----------
+    model : estimator
+        A scikit-learn Pipeline or a single estimator.
+    X : pd.DataFrame
+        Features.
+    y : pd.Series
+        Target.
+    folds : list
+        (train, test) position arrays of every fold.
+    cache : FoldTransformCache, optional
+        Cache to use (default is ``shared_cache()``).
+
+    Returns:
+    -------
+    tuple
+        (estimator, transformed): the unfitted final estimator of the model, and one
+        (X_fit, y_fit, X_val, y_val, preprocess_time) tuple per fold. Without preprocessing
+        steps the rows are only split.
+    """
+    preprocessor, estimator = split_pipeline(model)
+    if preprocessor is None:
+        return estimator, [(X.iloc[train], y.iloc[train], X.iloc[test], y.iloc[test], 0.0) for train, test in folds]
+    cache = shared_cache() if cache is None else cache
+    data_hash = data_fingerprint(X, y)
+    transformed = []
+    for train, test in folds:
+        _, X_fit, X_val, preprocess_time = cache.transform(preprocessor, X, y, train, test, data_hash)
+        transformed.append((X_fit, y.iloc[train], X_val, y.iloc[test], preprocess_time))
+    return estimator, transformed
+
+
+def _peak_memory(estimator, X_fit, y_fit, X_val, y_val):
+    """
+    Peak bytes allocated through Python and NumPy while fitting an unfitted estimator and scoring it once.
+    """
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        estimator.fit(X_fit, y_fit)
+        estimator.score(X_val, y_val)
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+
+def fit_and_score(estimator, X_fit, y_fit, X_val, y_val, train_score=True, track_memory=False):
+    """
+    Fit an estimator on the training part of a fold and score it on both parts, as cross_validate does.
+
+    Returns:
+    -------
+    dict
+        fit_time, score_time (of the validation rows), test_score and, unless ``train_score`` is
+        False, train_score. With ``track_memory``, also peak_memory: the most bytes allocated
+        through Python and NumPy at once while a clone of the estimator is fitted and scored a
+        second time under tracemalloc, so that tracing does not slow the timed fit. tracemalloc
+        traces the whole process, so allocations of other threads running meanwhile are counted
+        too, and memory allocated by compiled libraries outside of NumPy, e.g. the kernel cache
+        of libsvm, is not.
+    """
+    start = time.perf_counter()
+    estimator.fit(X_fit, y_fit)
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    test_score = estimator.score(X_val, y_val)
+    score_time = time.perf_counter() - start
+    scores = {"fit_time": fit_time, "score_time": score_time, "test_score": test_score}
+    if train_score:
+        scores["train_score"] = estimator.score(X_fit, y_fit)
+    if track_memory:
+        scores["peak_memory"] = _peak_memory(clone(estimator), X_fit, y_fit, X_val, y_val)
+    return scores
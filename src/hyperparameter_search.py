@@ -0,0 +1,571 @@
+import math
+import time
+import json
+import hashlib
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs, hash as joblib_hash
+from scipy.stats import loguniform, uniform, randint
+from sklearn.base import clone, is_classifier
+from sklearn.model_selection import ParameterSampler, check_cv
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fold_cache import data_fingerprint, fit_and_score, fold_transforms
+from trial_store import trial_key
+
+# Search space of the SVC pipeline, as a config: lists are categorical choices and
+# {"loguniform" | "uniform" | "int": [low, high]} are ranges
+DEFAULT_SEARCH_SPACE = {
+    "svc__C": {"loguniform": [1e-3, 1e3]},
+    "svc__gamma": {"loguniform": [1e-3, 1e3]},
+    "svc__decision_function_shape": ["ovr", "ovo"],
+    "svc__class_weight": [None, "balanced"],
+}
+
+RANGE_KINDS = ("loguniform", "uniform", "int")
+
+
+class SearchSpace:
+    """
+    Hyperparameters to search and the values each one can take.
+
+    Parameters:
+    ----------
+    config : dict
+        Values of every parameter by name: a list of choices, a ``{"loguniform": [low, high]}``,
+        ``{"uniform": [low, high]}`` or ``{"int": [low, high]}`` range (bounds included), or a
+        scipy distribution, which only the random engine can sample.
+    """
+
+    def __init__(self, config):
+        self.config = dict(config)
+        for name, spec in self.config.items():
+            if isinstance(spec, dict):
+                if len(spec) != 1 or next(iter(spec)) not in RANGE_KINDS:
+                    raise ValueError(f"Range of {name} should be one of {', '.join(RANGE_KINDS)} with [low, high].")
+                low, high = next(iter(spec.values()))
+                if not low < high:
+                    raise ValueError(f"Range of {name} should have low < high. Got [{low}, {high}]")
+            elif not (isinstance(spec, list) and spec) and not hasattr(spec, "rvs"):
+                raise ValueError(f"Values of {name} should be a non-empty list, a range or a distribution.")
+
+    @classmethod
+    def from_json(cls, path):
+        """
+        Load a search space from a JSON file holding its config.
+        """
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def __iter__(self):
+        return iter(self.config)
+
+    def distributions(self):
+        """
+        The space as the ``param_distributions`` of ``RandomizedSearchCV``.
+        """
+        distributions = {}
+        for name, spec in self.config.items():
+            if isinstance(spec, dict):
+                (kind, (low, high)), = spec.items()
+                distributions[name] = {"loguniform": lambda: loguniform(low, high),
+                                       "uniform": lambda: uniform(low, high - low),
+                                       "int": lambda: randint(low, high + 1)}[kind]()
+            else:
+                distributions[name] = spec
+        return distributions
+
+    def kind(self, name):
+        """
+        "categorical", "loguniform", "uniform" or "int". Scipy distributions have no kind.
+        """
+        spec = self.config[name]
+        if isinstance(spec, dict):
+            return next(iter(spec))
+        if isinstance(spec, list):
+            return "categorical"
+        raise ValueError(f"{name} is a scipy distribution; model-based search needs a list or a range.")
+
+    def bounds(self, name):
+        """
+        Bounds of a range on the scale it is searched on: log10 for loguniform ranges.
+        """
+        low, high = next(iter(self.config[name].values()))
+        return (np.log10(low), np.log10(high)) if self.kind(name) == "loguniform" else (low, high)
+
+    def decode(self, name, x):
+        """
+        Value of a range parameter from its position on the search scale.
+        """
+        kind = self.kind(name)
+        if kind == "loguniform":
+            return float(10 ** x)
+        if kind == "int":
+            return int(round(x))
+        return float(x)
+
+    def encode(self, name, value):
+        """
+        Position of a value on the search scale of its parameter, or the index of a choice.
+        """
+        kind = self.kind(name)
+        if kind == "categorical":
+            return self.config[name].index(value)
+        return np.log10(value) if kind == "loguniform" else float(value)
+
+    def contains(self, params):
+        """
+        Whether a parameter set has exactly the parameters of the space, with values it can take.
+        Values of scipy distributions are not checked.
+        """
+        if set(params) != set(self.config):
+            return False
+        for name, value in params.items():
+            spec = self.config[name]
+            if isinstance(spec, list) and value not in spec:
+                return False
+            if isinstance(spec, dict):
+                low, high = next(iter(spec.values()))
+                if isinstance(value, (bool, str)) or value is None or not low <= value <= high:
+                    return False
+        return True
+
+
+class SearchBudget:
+    """
+    Limits of a search, in model fits and wall-clock seconds.
+
+    Parameters:
+    ----------
+    max_fits : float, optional
+        Most fits on full training folds. A fit on a fraction of the rows of a fold counts as
+        that fraction (default is None, no limit).
+    max_seconds : float, optional
+        Most seconds from the creation of the budget (default is None, no limit).
+    """
+
+    def __init__(self, max_fits=None, max_seconds=None):
+        self.max_fits = max_fits
+        self.max_seconds = max_seconds
+        self.fits = 0.0
+        self.start = time.perf_counter()
+
+    @property
+    def unlimited(self):
+        return self.max_fits is None and self.max_seconds is None
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def allows(self, fits):
+        """
+        Whether there is time left and ``fits`` more fits stay within the limit.
+        """
+        if self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+            return False
+        return self.max_fits is None or self.fits + fits <= self.max_fits + 1e-9
+
+    def spend(self, fits):
+        self.fits += fits
+
+
+def _score_fold(candidate, fold, params, estimator, X_fit, y_fit, X_val, y_val):
+    return candidate, fold, fit_and_score(estimator.set_params(**params), X_fit, y_fit, X_val, y_val, train_score=False)
+
+
+class FoldEvaluator:
+    """
+    Scores parameters of the final step of a pipeline by cross-validation on cached, preprocessed folds.
+
+    The folds are the ones ``RandomizedSearchCV`` uses and are preprocessed once through the
+    fold transform cache. Candidates can be fitted on a subset of the training rows of every
+    fold; subsets are nested, so a larger one contains the smaller ones, and always scored on
+    the full validation rows.
+
+    Parameters:
+    ----------
+    model : Pipeline
+        Unfitted pipeline. Parameters are prefixed with the name of its last step.
+    X : pd.DataFrame
+        Training features.
+    y : pd.Series
+        Training labels.
+    cv : int, optional
+        Number of folds (default is 5).
+    n_jobs : int, optional
+        Processes fitting the folds (default is None, one).
+    random_state : int, optional
+        Seed of the row subsets.
+    cache : FoldTransformCache, optional
+        Cache of the preprocessed folds (default is the cache shared by the process).
+    budget : SearchBudget, optional
+        Budget charged with every fit (default is no limit).
+    store : TrialStore, optional
+        Store recording the score of every fold as it completes. Folds already in the store are
+        read back instead of fitted and cost nothing (default is None, no store).
+    """
+
+    def __init__(self, model, X, y, cv=5, n_jobs=None, random_state=None, cache=None, budget=None, store=None):
+        self.model = model
+        self.prefix = f"{model.steps[-1][0]}__"
+        self.n_jobs = n_jobs
+        self.budget = budget or SearchBudget()
+        self.folds = list(check_cv(cv, y, classifier=is_classifier(model)).split(X, y))
+        self.estimator, self.transformed = fold_transforms(model, X, y, self.folds, cache)
+        rng = np.random.RandomState(random_state)
+        self._orders = [rng.permutation(len(y_fit)) for _, y_fit, _, _, _ in self.transformed]
+        self.n_classes = y.nunique()
+        self.fits = 0
+        self.reused = 0
+        self.store = store
+        if store is not None:
+            self.model_hash = joblib_hash(clone(model))
+            self.data_hash = data_fingerprint(X, y)
+            split = hashlib.sha256()
+            for train, test in self.folds:
+                split.update(np.asarray(train, dtype=np.int64).tobytes() + b"|" + np.asarray(test, dtype=np.int64).tobytes() + b"|")
+            self.split_hash = split.hexdigest()
+
+    @property
+    def n_samples(self):
+        """
+        Training rows of the smallest fold.
+        """
+        return min(len(order) for order in self._orders)
+
+    def cost(self, n_candidates, n_samples=None, candidates=None):
+        """
+        Full-fold fits of scoring ``n_candidates`` on ``n_samples`` training rows per fold. Given
+        the ``candidates``, folds already in the trial store are free.
+        """
+        fraction = 1.0 if n_samples is None else min(1.0, n_samples / self.n_samples)
+        folds = n_candidates * len(self.folds)
+        if candidates is not None and self.store is not None:
+            folds -= len(self.store.get(self._trial_keys(candidates, n_samples).values()))
+        return folds * fraction
+
+    def _subset(self, fold, n_samples):
+        """
+        Sorted positions of the training rows fitted on a fold, or None for all of them.
+        """
+        if n_samples is None or n_samples >= len(self._orders[fold]):
+            return None
+        return np.sort(self._orders[fold][:n_samples])
+
+    def _fold_data(self, fold, n_samples):
+        X_fit, y_fit, X_val, y_val, _ = self.transformed[fold]
+        rows = self._subset(fold, n_samples)
+        if rows is None:
+            return X_fit, y_fit, X_val, y_val
+        X_subset = X_fit.iloc[rows] if hasattr(X_fit, "iloc") else X_fit[rows]
+        return X_subset, y_fit.iloc[rows], X_val, y_val
+
+    def _trial_keys(self, candidates, n_samples):
+        rows = [self._subset(fold, n_samples) for fold in range(len(self.folds))]
+        rows = [None if r is None else hashlib.sha256(r.astype(np.int64).tobytes()).hexdigest() for r in rows]
+        return {(candidate, fold): trial_key(self.model_hash, self.data_hash, self.split_hash, fold, rows[fold], params)
+                for candidate, params in enumerate(candidates) for fold in range(len(self.folds))}
+
+    def prior_best(self, top=5):
+        """
+        Best parameters stored by earlier searches of the same model on the same folds.
+
+        Returns:
+        -------
+        list
+            (params, mean score) of up to ``top`` candidates, best first; empty without a store.
+        """
+        if self.store is None:
+            return []
+        return self.store.best(self.model_hash, self.data_hash, self.split_hash, len(self.folds), top)
+
+    def evaluate(self, candidates, n_samples=None):
+        """
+        Mean validation score of every candidate over the folds.
+
+        Parameters:
+        ----------
+        candidates : list
+            Parameters of every candidate, prefixed with the name of the final step.
+        n_samples : int, optional
+            Training rows per fold (default is None, all of them).
+
+        Returns:
+        -------
+        np.ndarray
+            Mean score of every candidate, in order.
+        """
+        keys = self._trial_keys(candidates, n_samples) if self.store is not None else {}
+        stored = self.store.get(keys.values()) if keys else {}
+        data = [self._fold_data(fold, n_samples) for fold in range(len(self.folds))]
+        scores = np.zeros(len(candidates))
+        jobs = []
+        for candidate, params in enumerate(candidates):
+            for fold in range(len(self.folds)):
+                key = keys.get((candidate, fold))
+                if key in stored:
+                    scores[candidate] += stored[key]
+                    self.reused += 1
+                    continue
+                jobs.append(delayed(_score_fold)(candidate, fold,
+                                                 {name[len(self.prefix):]: value for name, value in params.items()},
+                                                 clone(self.estimator), *data[fold]))
+
+        for candidate, fold, fold_scores in Parallel(n_jobs=self.n_jobs, return_as="generator_unordered")(jobs):
+            scores[candidate] += fold_scores["test_score"]
+            if self.store is not None:
+                # Recorded as soon as the fold completes, so an interrupted search loses at most the running fits
+                self.store.put(keys[(candidate, fold)], self.model_hash, self.data_hash, self.split_hash,
+                               candidates[candidate], fold, None if self._subset(fold, n_samples) is None else n_samples,
+                               fold_scores["test_score"], fold_scores["fit_time"], fold_scores["score_time"])
+        self.fits += len(jobs)
+        self.budget.spend(self.cost(len(jobs), n_samples) / len(self.folds))
+        return scores / len(self.folds)
+
+
+class _Plateau:
+    """
+    Counts the trials since the best score last improved by more than ``min_delta``.
+    """
+
+    def __init__(self, patience=None, min_delta=0.0):
+        self.patience = patience
+        self.min_delta = min_delta
+        self.best = -np.inf
+        self.waited = 0
+
+    def update(self, score):
+        """
+        Record a score and return whether the search has plateaued.
+        """
+        self.waited = 0 if score > self.best + self.min_delta else self.waited + 1
+        self.best = max(self.best, score)
+        return self.patience is not None and self.waited >= self.patience
+
+
+def _sample(space, n_iter, random_state, initial=()):
+    """
+    Warm-start candidates followed by the candidates ``RandomizedSearchCV`` samples, ``n_iter`` in all.
+    """
+    initial = [dict(params) for params in initial][:n_iter]
+    sampled = list(ParameterSampler(space.distributions(), n_iter - len(initial), random_state=random_state)) \
+        if n_iter > len(initial) else []
+    return initial + sampled
+
+
+def random_search(evaluator, space, n_iter=50, random_state=None, patience=None, min_delta=0.0, initial=()):
+    """
+    Score candidates sampled as ``RandomizedSearchCV`` samples them, in order, until the budget or patience runs out.
+
+    Without a budget or patience, all candidates are scored in one parallel batch, and the best
+    one is the one ``RandomizedSearchCV`` selects. ``initial`` candidates, e.g. the best of earlier
+    searches, are scored first in place of the last sampled ones.
+
+    Returns:
+    -------
+    list
+        (params, score, n_samples) of every scored candidate.
+    """
+    candidates = _sample(space, n_iter, random_state, initial)
+    if evaluator.budget.unlimited and patience is None:
+        return [(params, score, None) for params, score in zip(candidates, evaluator.evaluate(candidates))]
+
+    trials, plateau = [], _Plateau(patience, min_delta)
+    batch_size = effective_n_jobs(evaluator.n_jobs)
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start:start + batch_size]
+        while batch and not evaluator.budget.allows(evaluator.cost(len(batch), candidates=batch)):
+            batch = batch[:-1]
+        if not batch:
+            break
+        for params, score in zip(batch, evaluator.evaluate(batch)):
+            trials.append((params, score, None))
+            if plateau.update(score):
+                return trials
+        if len(batch) < batch_size and start + len(batch) < len(candidates):
+            break
+    return trials
+
+
+def halving_search(evaluator, space, n_iter=50, random_state=None, factor=3, min_samples=None, initial=(), **_):
+    """
+    Successive halving on the number of training rows: score many candidates on few rows, and
+    only the best ``1 / factor`` of them on ``factor`` times more rows, up to the full folds.
+    ``initial`` candidates join the first rung in place of the last sampled ones.
+
+    Returns:
+    -------
+    list
+        (params, score, n_samples) of every scored candidate and rung; ``n_samples`` is None on
+        the full folds.
+    """
+    candidates = _sample(space, n_iter, random_state, initial)
+    full = evaluator.n_samples
+    min_samples = min(full, min_samples or max(full // factor ** int(math.log(len(candidates), factor)),
+                                               10 * evaluator.n_classes))
+    rungs = 1 + min(int(math.log(len(candidates), factor)), int(math.log(full / min_samples, factor)))
+
+    trials = []
+    for rung in range(rungs):
+        n_samples = None if rung == rungs - 1 else int(full / factor ** (rungs - 1 - rung))
+        if not evaluator.budget.allows(evaluator.cost(len(candidates), n_samples, candidates)):
+            break
+        scores = evaluator.evaluate(candidates, n_samples)
+        trials += [(params, score, n_samples) for params, score in zip(candidates, scores)]
+        # Stable sort keeps the sampling order among ties
+        keep = max(1, math.ceil(len(candidates) / factor))
+        candidates = [candidates[i] for i in np.argsort(-scores, kind="stable")[:keep]]
+    return trials
+
+
+def _parzen_log_density(x, centers, low, high):
+    """
+    Log density at ``x`` of a Gaussian mixture on ``centers`` plus a uniform prior over [low, high].
+    """
+    width = high - low
+    sigma = width / max(1, len(centers)) ** 0.2 / 4
+    mixture = np.exp(-0.5 * ((x[:, None] - centers[None, :]) / sigma) ** 2) / (sigma * np.sqrt(2 * np.pi))
+    density = (mixture.sum(axis=1) + 1 / width) / (len(centers) + 1)
+    return np.log(density)
+
+
+def _tpe_suggest(space, trials, rng, gamma=0.25, n_candidates=24):
+    """
+    Suggest parameters with a tree-structured Parzen estimator: draw values of every parameter
+    from the density of the best ``gamma`` fraction of the trials, and keep the one most likely
+    under it relative to the density of the other trials.
+    """
+    ranked = sorted(trials, key=lambda trial: -trial[1])
+    n_good = max(1, int(math.ceil(gamma * len(ranked))))
+    good, bad = ranked[:n_good], ranked[n_good:]
+    params = {}
+    for name in space:
+        kind = space.kind(name)
+        if kind == "categorical":
+            k = len(space.config[name])
+            good_p, bad_p = [(np.bincount(np.array([space.encode(name, p[name]) for p, _, _ in part], dtype=int),
+                                          minlength=k) + 1) / (len(part) + k) for part in (good, bad)]
+            draws = rng.choice(k, size=n_candidates, p=good_p)
+            params[name] = space.config[name][draws[np.argmax(np.log(good_p[draws]) - np.log(bad_p[draws]))]]
+        else:
+            low, high = space.bounds(name)
+            good_x = np.array([space.encode(name, p[name]) for p, _, _ in good])
+            bad_x = np.array([space.encode(name, p[name]) for p, _, _ in bad])
+            sigma = (high - low) / max(1, len(good_x)) ** 0.2 / 4
+            draws = np.clip(rng.choice(good_x, size=n_candidates) + rng.normal(scale=sigma, size=n_candidates), low, high)
+            ratio = _parzen_log_density(draws, good_x, low, high) - _parzen_log_density(draws, bad_x, low, high)
+            params[name] = space.decode(name, draws[np.argmax(ratio)])
+    return params
+
+
+def tpe_search(evaluator, space, n_iter=50, random_state=None, patience=None, min_delta=0.0, n_startup=10, initial=(),
+               **_):
+    """
+    Sequential model-based search: ``n_startup`` random candidates, then candidates suggested by a
+    tree-structured Parzen estimator fitted to the scores so far, one at a time, until ``n_iter``
+    candidates, the budget or the patience run out. ``initial`` candidates are scored before the
+    random ones, so the estimator starts from the best region of earlier searches.
+
+    Returns:
+    -------
+    list
+        (params, score, n_samples) of every scored candidate.
+    """
+    rng = np.random.RandomState(random_state)
+    startup = _sample(space, min(len(initial) + n_startup, n_iter), random_state, initial)
+    trials, plateau = [], _Plateau(patience, min_delta)
+    for i in range(n_iter):
+        params = startup[i] if i < len(startup) else _tpe_suggest(space, trials, rng)
+        if not evaluator.budget.allows(evaluator.cost(1, candidates=[params])):
+            break
+        score = evaluator.evaluate([params])[0]
+        trials.append((params, score, None))
+        if plateau.update(score):
+            break
+    return trials
+
+
+# Search engines by name, called with the evaluator, the space and the search options
+SEARCH_ENGINES = {
+    "random": random_search,
+    "halving": halving_search,
+    "tpe": tpe_search,
+}
+
+
+def run_search(model, space, X, y, engine="random", n_iter=50, cv=5, max_fits=None, max_seconds=None, patience=None,
+               n_jobs=None, random_state=None, cache=None, store=None, warm_start=0, verbose=True, **options):
+    """
+    Search the parameters of the final step of a pipeline on cached folds, within a budget.
+
+    Parameters:
+    ----------
+    model : Pipeline
+        Unfitted pipeline with preprocessing steps.
+    space : SearchSpace or dict
+        Search space, or its config.
+    X : pd.DataFrame
+        Training features.
+    y : pd.Series
+        Training labels.
+    engine : str, optional
+        Name of a search engine of ``SEARCH_ENGINES`` (default is "random").
+    n_iter : int, optional
+        Number of candidates (default is 50).
+    cv : int, optional
+        Number of folds (default is 5).
+    max_fits : float, optional
+        Most fits on full training folds; fits on fewer rows count as a fraction (default is no limit).
+    max_seconds : float, optional
+        Most seconds spent scoring candidates (default is no limit).
+    patience : int, optional
+        Candidates scored without improving the best score before the random and TPE engines
+        stop (default is None, no early stopping).
+    n_jobs : int, optional
+        Processes fitting the folds (default is None, one).
+    random_state : int, optional
+        Seed of the sampling.
+    cache : FoldTransformCache, optional
+        Cache of the preprocessed folds (default is the cache shared by the process).
+    store : TrialStore, optional
+        Store of the fold scores. Scores of earlier runs on the same model, data and folds are
+        read back instead of refitted, so re-running an interrupted search resumes it (default
+        is None, no store).
+    warm_start : int, optional
+        Number of the best candidates of earlier searches in ``store`` scored first, when they
+        lie in ``space`` (default is 0).
+    verbose : bool, optional
+        Whether to print a summary (default is True).
+    **options
+        Options of the engine, e.g. ``factor`` of successive halving.
+
+    Returns:
+    -------
+    tuple
+        (best_estimator, best_params, best_score, trials): the pipeline refitted on all of ``X``
+        with the best parameters on the most rows scored, the parameters, their mean validation
+        score, and (params, score, n_samples) of every scored candidate.
+    """
+    if engine not in SEARCH_ENGINES:
+        raise ValueError(f"Unknown search engine {engine}. Choose one of {', '.join(SEARCH_ENGINES)}.")
+    space = space if isinstance(space, SearchSpace) else SearchSpace(space)
+    budget = SearchBudget(max_fits, max_seconds)
+    evaluator = FoldEvaluator(model, X, y, cv=cv, n_jobs=n_jobs, random_state=random_state, cache=cache, budget=budget,
+                              store=store)
+    initial = [params for params, _ in evaluator.prior_best(warm_start) if space.contains(params)] if warm_start else []
+    trials = SEARCH_ENGINES[engine](evaluator, space, n_iter=n_iter, random_state=random_state, patience=patience,
+                                    initial=initial, **options)
+    if not trials:
+        raise RuntimeError("The budget does not allow scoring a single candidate.")
+
+    # Best of the candidates scored on the most rows, the first one among ties
+    most_rows = max(trials, key=lambda trial: trial[2] or np.inf)[2]
+    finalists = [trial for trial in trials if trial[2] == most_rows]
+    best_params, best_score, _ = finalists[int(np.argmax([score for _, score, _ in finalists]))]
+    best_estimator = clone(model).set_params(**best_params).fit(X, y)
+    if verbose:
+        reused = f", {evaluator.reused} fold scores read from the trial store" if store is not None else ""
+        warm = f", warm-started from {len(initial)} earlier candidates" if initial else ""
+        print(f"{engine} search: {len(trials)} candidates scored with {evaluator.fits} fits "
+              f"({budget.fits:.1f} full-fold fits){reused}{warm} in {budget.elapsed():.1f}s, best score {best_score:.3f}.")
+    return best_estimator, best_params, best_score, trials
@@ -0,0 +1,172 @@
+import io
+import os
+import pandas as pd
+
+FLOAT_DTYPES = ("float64", "float32")
+
+
+def parser_engine():
+    """
+    Pick the fastest available CSV parser backend.
+
+    Returns:
+    -------
+    str
+        "pyarrow" (multithreaded) when pyarrow is installed, otherwise pandas' "c" engine.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "c"
+    return "pyarrow"
+
+
+def schema_dtypes(schema, float_dtype="float64"):
+    """
+    Map the columns of a pandera schema to the dtypes used to parse them.
+
+    Parameters:
+    ----------
+    schema : pa.DataFrameSchema
+        Schema declaring the expected columns and dtypes.
+    float_dtype : str, optional
+        Dtype for float columns, "float64" (default) or "float32" to halve their memory.
+
+    Returns:
+    -------
+    dict
+        Mapping of column name to dtype string.
+    """
+    if float_dtype not in FLOAT_DTYPES:
+        raise ValueError(f"float_dtype must be one of {', '.join(FLOAT_DTYPES)}. Got {float_dtype}.")
+    dtypes = {}
+    for name, column in schema.columns.items():
+        dtype = str(column.dtype)
+        dtypes[name] = float_dtype if dtype.startswith("float") else dtype
+    return dtypes
+
+
+def read_csv_typed(input_path, schema=None, sep=',', usecols=None, float_dtype="float64"):
+    """
+    Read a CSV file with explicit dtypes and columns taken from a pandera schema.
+
+    Every schema column present in the file is parsed straight into its declared dtype, using
+    the multithreaded pyarrow parser when it is installed. A value that does not
+    fit its declared dtype raises at read time instead of surfacing in a later stage.
+
+    Parameters:
+    ----------
+    input_path : str
+        Path to the CSV file.
+    schema : pa.DataFrameSchema, optional
+        Schema declaring the expected columns and dtypes. Without it, dtypes are inferred.
+    sep : str, optional
+        Field delimiter (default is ',').
+    usecols : list, optional
+        Columns to read (e.g. ``list(schema.columns)``). Defaults to every column in the file.
+    float_dtype : str, optional
+        Dtype for float columns, "float64" (default) or "float32".
+
+    Returns:
+    -------
+    pd.DataFrame
+        The parsed data.
+    """
+    engine = parser_engine()
+    if schema is None:
+        return pd.read_csv(input_path, sep=sep, usecols=usecols, engine=engine)
+
+    header = list(pd.read_csv(input_path, sep=sep, nrows=0).columns)
+    dtypes = schema_dtypes(schema, float_dtype)
+    if usecols is None:
+        usecols = header
+    dtype = {column: dtypes[column] for column in usecols if column in dtypes}
+
+    try:
+        return pd.read_csv(input_path, sep=sep, usecols=usecols, dtype=dtype, engine=engine)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Failed to parse {input_path} with the schema dtypes {dtype}. Error: {e}")
+
+
+def byte_ranges(input_path, chunksize):
+    """
+    Split the data lines of a CSV file into byte ranges of about ``chunksize`` bytes.
+
+    Every range starts at the beginning of a line and ends just after a newline, so the ranges
+    can be parsed independently, e.g. in separate processes. Quoted fields containing newlines
+    are not supported.
+
+    Parameters:
+    ----------
+    input_path : str
+        Path to the CSV file.
+    chunksize : int
+        Approximate number of bytes per range.
+
+    Returns:
+    -------
+    tuple
+        (header, ranges): the header line as bytes and a list of (start, end) byte offsets
+        covering every line after the header.
+    """
+    if chunksize <= 0:
+        raise ValueError("chunksize must be a positive integer.")
+    with open(input_path, "rb") as f:
+        header = f.readline()
+        size = os.fstat(f.fileno()).st_size
+        ranges = []
+        start = f.tell()
+        while start < size:
+            end = start + chunksize
+            if end < size:
+                # Move the end just past the newline of the line containing byte end - 1
+                f.seek(end - 1)
+                f.readline()
+                end = f.tell()
+            end = min(end, size)
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def read_csv_range(input_path, start, end, columns, schema=None, sep=',', float_dtype="float64"):
+    """
+    Parse the lines of a CSV file between two byte offsets from ``byte_ranges``.
+
+    Parameters:
+    ----------
+    input_path : str
+        Path to the CSV file.
+    start : int
+        Offset of the first byte, at the beginning of a line.
+    end : int
+        Offset just past the last byte, after a newline or at the end of the file.
+    columns : list
+        Column names from the file's header.
+    schema : pa.DataFrameSchema, optional
+        Schema declaring the expected dtypes. Without it, dtypes are inferred.
+    sep : str, optional
+        Field delimiter (default is ',').
+    float_dtype : str, optional
+        Dtype for float columns of the schema, "float64" (default) or "float32".
+
+    Returns:
+    -------
+    pd.DataFrame
+        The parsed rows.
+    """
+    with open(input_path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    dtype = None
+    if schema is not None:
+        dtypes = schema_dtypes(schema, float_dtype)
+        dtype = {column: dtypes[column] for column in columns if column in dtypes}
+    if not data.strip():
+        return pd.DataFrame(columns=columns).astype(dtype or {})
+
+    try:
+        return pd.read_csv(io.BytesIO(data), sep=sep, header=None, names=columns, dtype=dtype,
+                           engine=parser_engine())
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Failed to parse bytes {start}-{end} of {input_path} with the schema dtypes {dtype}. Error: {e}")
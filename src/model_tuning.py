@@ -1,7 +1,72 @@
 import pickle
 import pandas as pd
-from scipy.stats import loguniform
 from sklearn.model_selection import RandomizedSearchCV
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from artifacts import load_frame
+from fold_cache import shared_cache, split_pipeline
+from hyperparameter_search import DEFAULT_SEARCH_SPACE, SearchSpace, run_search
+from trial_store import TrialStore
+
+
+def searches_final_step(model, param_distributions):
+    """
+    Whether a model is a pipeline with preprocessing steps and every searched parameter belongs to its final step.
+    """
+    preprocessor, _ = split_pipeline(model)
+    return preprocessor is not None and all(name.startswith(f"{model.steps[-1][0]}__") for name in param_distributions)
+
+
+def cached_random_search(model, param_distributions, X, y, n_iter=10, cv=5, n_jobs=None, random_state=None, cache=None):
+    """
+    Randomized search over the final estimator of a pipeline, reusing the preprocessed folds.
+
+    It samples the candidates and splits the folds exactly as ``RandomizedSearchCV`` does and
+    picks the same best candidate, but fits the preprocessing steps once per fold through a
+    ``FoldTransformCache`` instead of once per candidate and fold. Only parameters of the final
+    step can be searched.
+
+    Parameters:
+    ----------
+    model : Pipeline
+        Unfitted pipeline. Searched parameters are prefixed with the name of its last step.
+    param_distributions : dict
+        Distributions or lists of values of the parameters, as for ``RandomizedSearchCV``.
+    X : pd.DataFrame
+        Training features.
+    y : pd.Series
+        Training labels.
+    n_iter : int, optional
+        Number of sampled candidates (default is 10).
+    cv : int, optional
+        Number of folds (default is 5).
+    n_jobs : int, optional
+        Processes fitting the candidates (default is None, one).
+    random_state : int, optional
+        Seed of the candidate sampler.
+    cache : FoldTransformCache, optional
+        Cache of the preprocessed folds (default is the cache shared by the process).
+
+    Returns:
+    -------
+    tuple
+        (best_estimator, best_params, best_score): the pipeline refitted on all of ``X`` with the
+        best parameters, the parameters, and their mean validation score.
+
+    Raises:
+    ------
+    ValueError
+        If a parameter does not belong to the final step.
+    """
+    if not searches_final_step(model, param_distributions):
+        raise ValueError("Only parameters of the final step of a pipeline can be searched on cached folds.")
+    best_estimator, best_params, best_score, _ = run_search(
+        model, SearchSpace(param_distributions), X, y, engine="random", n_iter=n_iter, cv=cv, n_jobs=n_jobs,
+        random_state=random_state, cache=cache, verbose=False
+    )
+    return best_estimator, best_params, best_score
+
 
 def fine_tune_model(
     model_path, 
@@ -10,7 +75,15 @@ def fine_tune_model(
     y_train_path, 
     x_test_path, 
     y_test_path, 
-    params_output_path
+    params_output_path,
+    search="random",
+    search_space=None,
+    n_iter=50,
+    max_fits=None,
+    max_seconds=None,
+    patience=None,
+    trial_store=None,
+    warm_start=0
 ):
     """
     Fine-tunes a pre-trained model and saves the best model and parameters.
@@ -18,47 +91,70 @@ def fine_tune_model(
     Parameters:
     - model_path: Path to the pre-trained model file (.pkl).
     - best_model_path: Path to save the fine-tuned model (.pkl).
-    - x_train_path: Path to the training features (CSV).
-    - y_train_path: Path to the training labels (CSV).
-    - x_test_path: Path to the testing features (CSV).
-    - y_test_path: Path to the testing labels (CSV).
+    - x_train_path: Path to the training features (CSV, .npy or a .index split view).
+    - y_train_path: Path to the training labels (CSV, .npy or a .index split view).
+    - x_test_path: Path to the testing features (CSV, .npy or a .index split view).
+    - y_test_path: Path to the testing labels (CSV, .npy or a .index split view).
     - params_output_path: Path to save the best parameters (CSV).
+    - search: Search engine: "random" (the candidates of RandomizedSearchCV), "halving"
+      (successive halving on the number of training rows) or "tpe" (tree-structured Parzen estimator).
+    - search_space: Search space config, or path to a JSON file holding it (default is the SVC space
+      of DEFAULT_SEARCH_SPACE).
+    - n_iter: Number of candidates sampled (default is 50).
+    - max_fits: Most fits on full training folds, fits on fewer rows counting as a fraction (default is no limit).
+    - max_seconds: Most seconds spent scoring candidates (default is no limit).
+    - patience: Candidates scored without improvement before the random and TPE searches stop
+      (default is None, no early stopping).
+    - trial_store: Path of a SQLite file recording the score of every fold of every candidate. Scores
+      already in it are read back instead of refitted, so an interrupted search resumes where it
+      stopped (default is None, no store).
+    - warm_start: Number of the best candidates stored by earlier searches scored first (default is 0).
     """
     # Load the saved model pipeline
     with open(model_path, "rb") as f:
         loaded_model = pickle.load(f)
 
     # Load datasets
-    X_train = pd.read_csv(x_train_path)
-    y_train = pd.read_csv(y_train_path).squeeze()
-    X_test = pd.read_csv(x_test_path)
-    y_test = pd.read_csv(y_test_path).squeeze()
+    X_train = load_frame(x_train_path)
+    y_train = load_frame(y_train_path, squeeze=True)
+    X_test = load_frame(x_test_path)
+    y_test = load_frame(y_test_path, squeeze=True)
 
     # Define hyperparameter search space
-    param_dist = {
-        'svc__C': loguniform(1e-3, 1e3),
-        'svc__gamma': loguniform(1e-3, 1e3),
-        'svc__decision_function_shape': ['ovr', 'ovo'],
-        'svc__class_weight': [None, 'balanced']
-    }
-
-    # Perform randomized search with cross-validation
-    random_search = RandomizedSearchCV(
-        loaded_model, param_dist, n_iter=50, cv=5, n_jobs=-1, random_state=42
-    )
-
-    # Fit the model
-    random_search.fit(X_train, y_train)
+    if isinstance(search_space, str):
+        space = SearchSpace.from_json(search_space)
+    else:
+        space = SearchSpace(DEFAULT_SEARCH_SPACE if search_space is None else search_space)
 
-    # Output best hyperparameters and best cross-validation score
-    best_params = random_search.best_params_
-    best_score = random_search.best_score_
+    # Search the final step with cross-validation, preprocessing every fold only once
+    if searches_final_step(loaded_model, space):
+        store = TrialStore(trial_store) if trial_store else None
+        try:
+            best_estimator, best_params, best_score, _ = run_search(
+                loaded_model, space, X_train, y_train, engine=search, n_iter=n_iter, cv=5, max_fits=max_fits,
+                max_seconds=max_seconds, patience=patience, n_jobs=-1, random_state=42, store=store,
+                warm_start=warm_start
+            )
+        finally:
+            if store is not None:
+                store.close()
+        print(shared_cache().summary())
+    elif (search == "random" and max_fits is None and max_seconds is None and patience is None
+          and not trial_store and not warm_start):
+        random_search = RandomizedSearchCV(
+            loaded_model, space.distributions(), n_iter=n_iter, cv=5, n_jobs=-1, random_state=42
+        )
+        random_search.fit(X_train, y_train)
+        best_estimator, best_params, best_score = (random_search.best_estimator_, random_search.best_params_,
+                                                   random_search.best_score_)
+    else:
+        raise ValueError("Budgeted, model-based and stored searches only tune the final step of a pipeline.")
 
-    print("Finished Random Search")
+    print(f"Finished {search} search")
 
     # Save the best model pipeline
     with open(best_model_path, "wb") as f:
-        pickle.dump(random_search.best_estimator_, f)
+        pickle.dump(best_estimator, f)
 
     print(f"Best model saved to {best_model_path}")
 
@@ -2,18 +2,56 @@
 # Date: 2024-12-14
 
 import matplotlib.pyplot as plt
-from sklearn.metrics import multilabel_confusion_matrix, ConfusionMatrixDisplay
+from sklearn.metrics import multilabel_confusion_matrix
 import numpy as np
 import pandas as pd
 import os
 
+CONFUSION_LAYOUTS = ("separate", "grid")
+
+def _draw_matrix(ax, image, texts, matrix, label):
+    """
+    Draw one one-vs-rest confusion matrix on an existing image and its four value labels.
+
+    Mirrors ``ConfusionMatrixDisplay.plot``: values are written in the lightest or darkest color
+    of the colormap, whichever contrasts with the cell.
+    """
+    image.set_data(matrix)
+    image.set_clim(matrix.min(), matrix.max())
+    cmap_min, cmap_max = image.cmap(0.0), image.cmap(1.0)
+    threshold = (matrix.max() + matrix.min()) / 2.0
+    for (i, j), text in np.ndenumerate(texts):
+        text.set_text(format(matrix[i, j], "d"))
+        text.set_color(cmap_max if matrix[i, j] < threshold else cmap_min)
+    ax.set_xticks([0, 1], ["Not " + str(label), label])
+    ax.set_yticks([0, 1], ["Not " + str(label), label])
+
+
+def _matrix_axes(ax, cmap):
+    """
+    Set up an axes with an empty 2x2 confusion matrix image and its value labels.
+    """
+    image = ax.imshow(np.zeros((2, 2), dtype=int), interpolation="nearest", cmap=cmap)
+    texts = np.empty((2, 2), dtype=object)
+    for i, j in np.ndindex(2, 2):
+        texts[i, j] = ax.text(j, i, "", ha="center", va="center")
+    ax.set_xlabel("Predicted label")
+    ax.set_ylabel("True label")
+    ax.set_ylim((1.5, -0.5))
+    return image, texts
+
+
 # Multi-class Confusion Matrix
-def save_confusion_matrix_multi(model, X_test, y_test, save_path):
+def save_confusion_matrix_multi(model, X_test, y_test, save_path, figures=True, layout="separate"):
     """
     Given a model and X_test and y_test from the test split, multi-class confusion matrices 
     are created, using One vs Rest, where the correct predictions of each class are compared to all
     other classes.
 
+    With layout="separate" every matrix is saved to its own png, redrawn on a single reused
+    figure, so memory stays flat however many classes there are. With layout="grid" all matrices
+    are drawn as panels of one figure saved once.
+
     Parameters
     ----------
     model :
@@ -24,19 +62,23 @@ def save_confusion_matrix_multi(model, X_test, y_test, save_path):
         values for target from testing data
     save_path : str
         relative path of where the generated figures should be saved
+    figures : bool, optional
+        whether to save figures; with False only the matrices are computed (default is True)
+    layout : str, optional
+        "separate" (default) for one confusion_matrix_class_<label>.png per class, or "grid" for
+        a single confusion_matrices.png
 
     Returns
     ----------
         Returns multi-class confusion matrix (ndarray).
     """
-    os.makedirs(save_path, exist_ok=True)
     if not isinstance(X_test, pd.DataFrame):
         raise TypeError(f"X_test should be of type pd.Dataframe. Got {type(X_test)}")
     
     if not (isinstance(y_test, pd.DataFrame) or isinstance(y_test, pd.Series) or isinstance(y_test, pd.core.frame.DataFrame)):
         raise TypeError(f"y_test should be of type pd.Dataframe or pd.Series. Got {type(y_test)}")
     
-    if not (isinstance(save_path, str)):
+    if figures and not (isinstance(save_path, str)):
         raise TypeError(f"save_path should be of type string (str). Got {type(save_path)}")
 
     if X_test.shape[0] == 0:
@@ -45,23 +87,53 @@ def save_confusion_matrix_multi(model, X_test, y_test, save_path):
     if y_test.shape[0] == 0:
         raise ValueError("The y_test DataFrame is empty.")
     
-    if save_path == "":
+    if figures and save_path == "":
         raise ValueError("save_path cannot be a blank string.")
 
+    if layout not in CONFUSION_LAYOUTS:
+        raise ValueError(f"Unknown layout {layout}. Expected 'separate' or 'grid'.")
+
     labels = np.unique(y_test)
     
     y_pred = model.predict(X_test)
     confusion_matrix = multilabel_confusion_matrix(y_test, y_pred, labels = labels)
+    if not figures:
+        return confusion_matrix
+    os.makedirs(save_path, exist_ok=True)
     
-    # Iterate over each label's confusion matrix
+    # Each label's matrix is drawn like ConfusionMatrixDisplay.plot(cmap='Greens')
     # With reference to: sklearn.metrics.multilabel_confusion_matrix. In Scikit-learn documentation. 
     # https://scikit-learn.org/dev/modules/generated/sklearn.metrics.multilabel_confusion_matrix.html
 
-    for i in range(len(labels)):
-        matrix = ConfusionMatrixDisplay(confusion_matrix=confusion_matrix[i], 
-                                        display_labels=["Not " + str(labels[i]), labels[i]])
-        matrix.plot(cmap='Greens')
-        plt.savefig(f"{save_path}confusion_matrix_class_{labels[i]}.png")
-        print(f"Saved confusion_matrix_class_{labels[i]}.png to {save_path}")
+    if layout == "grid":
+        ncols = min(len(labels), 3)
+        nrows = -(-len(labels) // ncols)
+        fig, axes = plt.subplots(nrows, ncols, figsize=(4 * ncols, 3.5 * nrows), squeeze=False)
+        try:
+            for ax, matrix, label in zip(axes.flat, confusion_matrix, labels):
+                image, texts = _matrix_axes(ax, "Greens")
+                _draw_matrix(ax, image, texts, matrix, label)
+                fig.colorbar(image, ax=ax)
+                ax.set_title(f"Class {label}")
+            for ax in axes.flat[len(labels):]:
+                ax.set_axis_off()
+            fig.tight_layout()
+            fig.savefig(f"{save_path}confusion_matrices.png")
+        finally:
+            plt.close(fig)
+        print(f"Saved confusion_matrices.png to {save_path}")
+        return confusion_matrix
+
+    fig, ax = plt.subplots()
+    try:
+        image, texts = _matrix_axes(ax, "Greens")
+        colorbar = fig.colorbar(image, ax=ax)
+        for matrix, label in zip(confusion_matrix, labels):
+            _draw_matrix(ax, image, texts, matrix, label)
+            colorbar.update_normal(image)
+            fig.savefig(f"{save_path}confusion_matrix_class_{label}.png")
+            print(f"Saved confusion_matrix_class_{label}.png to {save_path}")
+    finally:
+        plt.close(fig)
 
-    return confusion_matrix
\ No newline at end of file
+    return confusion_matrix
@@ -0,0 +1,355 @@
+import os
+import ast
+import glob
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+CACHE_VERSION = 1
+# Slack on output modification times, for file systems that round them to the second or two
+MTIME_TOLERANCE = 2.0
+
+
+class Stage:
+    """
+    One step of a pipeline: a callable with the files it reads and writes.
+
+    Parameters:
+    ----------
+    name : str
+        Unique name of the stage.
+    run : callable
+        Function running the stage, called with ``params`` as keyword arguments.
+    inputs : list, optional
+        Files read by the stage. A stage depends on the stages whose outputs it reads.
+    outputs : list, optional
+        Files written by the stage. Glob patterns match every file the stage writes, e.g. one
+        figure per class.
+    params : dict, optional
+        JSON-serializable keyword arguments of ``run``.
+    code : list, optional
+        Source files of the stage. Their code, without comments and docstrings, is part of the
+        cache key.
+    after : list, optional
+        Names of stages that must succeed first without providing an input, e.g. a validation.
+    locks : list, optional
+        Names of resources the stage cannot share with concurrently running stages, e.g.
+        "pyplot", whose global state is not thread-safe.
+    """
+
+    def __init__(self, name, run, inputs=(), outputs=(), params=None, code=(), after=(), locks=()):
+        self.name = name
+        self.run = run
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = dict(params or {})
+        self.code = list(code)
+        self.after = list(after)
+        self.locks = sorted(locks)
+
+
+def file_hash(path, block_size=1 << 20):
+    """
+    Compute the SHA-256 hex digest of a file's content, reading it in blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_fingerprint(paths):
+    """
+    Hash the code of Python source files, ignoring comments, docstrings and formatting.
+
+    Parameters:
+    ----------
+    paths : list
+        Paths of the source files.
+
+    Returns:
+    -------
+    str
+        Hex digest of the abstract syntax trees of the files, in order.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path) as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            body = getattr(node, "body", None)
+            if (isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)) and body
+                    and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant)
+                    and isinstance(body[0].value.value, str)):
+                node.body = body[1:] or [ast.Pass()]
+        digest.update(os.path.basename(path).encode())
+        digest.update(ast.dump(tree).encode())
+    return digest.hexdigest()
+
+
+def local_modules(path, search_dirs):
+    """
+    Find a source file and every module of the project it imports, directly or transitively.
+
+    Imports anywhere in the file count, including the ones inside functions, and both
+    ``import module`` and ``from src.module import name`` resolve to ``<dir>/module.py``.
+
+    Parameters:
+    ----------
+    path : str
+        Path of the source file.
+    search_dirs : list
+        Directories holding the project's modules.
+
+    Returns:
+    -------
+    list
+        Sorted paths of the file and the project modules it depends on.
+    """
+    found, pending = set(), [os.path.abspath(path)]
+    while pending:
+        current = pending.pop()
+        if current in found:
+            continue
+        found.add(current)
+        with open(current) as f:
+            tree = ast.parse(f.read())
+        names = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names += [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+                names.append(node.module)
+        for name in names:
+            module = name.split(".")[-1] if name.startswith("src.") else name.split(".")[0]
+            for directory in search_dirs:
+                candidate = os.path.abspath(os.path.join(directory, f"{module}.py"))
+                if os.path.exists(candidate):
+                    pending.append(candidate)
+                    break
+    return sorted(found)
+
+
+class StageCache:
+    """
+    Records of the cache key and output hashes of every stage that ran, one JSON file per stage.
+
+    File hashes are memoized on the file's size and modification time, so unchanged files are
+    only read once per process.
+
+    Parameters:
+    ----------
+    cache_dir : str
+        Directory of the stage records.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+    def hash(self, path):
+        """
+        Content hash of a file, reusing the last hash while its size and mtime are unchanged.
+        """
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._hashes.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        digest = file_hash(path)
+        with self._lock:
+            self._hashes[path] = (signature, digest)
+        return digest
+
+    def _record_path(self, name):
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def load(self, name):
+        """
+        Load the record of a stage, or None when it never ran.
+        """
+        try:
+            with open(self._record_path(name)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def save(self, name, key, outputs):
+        """
+        Save the cache key of a stage and the hashes of the outputs it wrote.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        record = {"key": key, "outputs": {path: self.hash(path) for path in outputs}}
+        tmp_path = self._record_path(name) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(record, f, indent=1)
+        os.replace(tmp_path, self._record_path(name))
+
+    def mark_failed(self, name):
+        """
+        Replace the record of a stage with one that never matches, so the stage runs again next time.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._record_path(name) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"key": None, "failed": True, "outputs": {}}, f, indent=1)
+        os.replace(tmp_path, self._record_path(name))
+
+    def is_current(self, name, key, outputs):
+        """
+        Whether a stage last ran with this key and its outputs are still the files it wrote.
+        """
+        record = self.load(name)
+        if record is None or record["key"] != key or sorted(record["outputs"]) != sorted(outputs):
+            return False
+        return all(os.path.exists(path) and self.hash(path) == digest for path, digest in record["outputs"].items())
+
+
+def expand_outputs(patterns):
+    """
+    List the files of the outputs of a stage, expanding glob patterns to the files they match.
+    """
+    paths = []
+    for pattern in patterns:
+        paths += sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+    return paths
+
+
+def stage_key(stage, cache):
+    """
+    Cache key of a stage from its code, parameters and the content of its inputs.
+    """
+    key = {
+        "version": CACHE_VERSION,
+        "code": code_fingerprint(stage.code),
+        "params": stage.params,
+        "inputs": {path: cache.hash(path) for path in stage.inputs},
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _dependencies(stages):
+    """
+    Map every stage to the stages producing its inputs or listed in its ``after``.
+    """
+    producers = {}
+    for stage in stages:
+        for pattern in stage.outputs:
+            producers[pattern] = stage.name
+    names = {stage.name for stage in stages}
+    dependencies = {}
+    for stage in stages:
+        unknown = [name for name in stage.after if name not in names]
+        if unknown:
+            raise ValueError(f"Stage {stage.name} runs after unknown stages: {', '.join(unknown)}.")
+        dependencies[stage.name] = ({producers[path] for path in stage.inputs if path in producers}
+                                    | set(stage.after)) - {stage.name}
+    return dependencies
+
+
+def run_pipeline(stages, cache_dir, jobs=None, force=(), skip=()):
+    """
+    Run a DAG of stages in one process, skipping the stages whose code, parameters and inputs are unchanged.
+
+    A stage runs as soon as the stages it depends on have finished, so independent branches run
+    concurrently in threads. Before running, its cache key is computed from the hashes of its
+    code, parameters and input files. When the key matches the record of its last run and the
+    outputs are still the files it wrote, the stage is skipped. A downstream stage whose
+    upstream stage re-ran but rewrote identical files is skipped too.
+
+    Parameters:
+    ----------
+    stages : list
+        Stages of the pipeline. Every stage name must be unique.
+    cache_dir : str
+        Directory of the stage records.
+    jobs : int, optional
+        Maximum number of stages running at the same time. Defaults to the number of stages.
+    force : list, optional
+        Names of stages to run even when they are up to date.
+    skip : list, optional
+        Names of stages not to run, whose outputs are used as they are.
+
+    Returns:
+    -------
+    dict
+        Status of every stage: "ran", "cached" or "skipped", in the order the stages finished.
+
+    Raises:
+    ------
+    RuntimeError
+        If a stage fails or does not write its outputs during this run. Stages already running
+        are finished first, and stages depending on the failed one are not started. The failed
+        stage's record is marked failed, so it runs again next time even if older outputs are
+        still on disk.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    if len(by_name) != len(stages):
+        raise ValueError("Stage names must be unique.")
+    unknown = [name for name in list(force) + list(skip) if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown stages: {', '.join(unknown)}.")
+    dependencies = _dependencies(stages)
+    cache = StageCache(cache_dir)
+    locks = {name: threading.Lock() for stage in stages for name in stage.locks}
+
+    def execute(stage):
+        if stage.name in skip:
+            return "skipped"
+        key = stage_key(stage, cache)
+        if stage.name not in force and cache.is_current(stage.name, key, expand_outputs(stage.outputs)):
+            print(f"[{stage.name}] unchanged, skipped.")
+            return "cached"
+        start, started = time.perf_counter(), time.time() - MTIME_TOLERANCE
+        held = [locks[name] for name in stage.locks]
+        for lock in held:
+            lock.acquire()
+        try:
+            stage.run(**stage.params)
+            # Outputs left over from an earlier run do not count, e.g. when a script reports its
+            # own error instead of raising it
+            missing = [pattern for pattern in stage.outputs
+                       if not any(os.path.exists(path) and os.path.getmtime(path) >= started
+                                  for path in expand_outputs([pattern]))]
+            if missing:
+                raise RuntimeError(f"Stage {stage.name} did not write {', '.join(missing)}.")
+        except BaseException as e:
+            cache.mark_failed(stage.name)
+            if isinstance(e, SystemExit):
+                raise RuntimeError(f"exited with status {e.code}") from e
+            raise
+        finally:
+            for lock in reversed(held):
+                lock.release()
+        cache.save(stage.name, key, expand_outputs(stage.outputs))
+        print(f"[{stage.name}] finished in {time.perf_counter() - start:.2f}s.")
+        return "ran"
+
+    status, running, failed = {}, {}, None
+    with ThreadPoolExecutor(max_workers=jobs or len(stages) or 1) as pool:
+        while True:
+            if failed is None:
+                for stage in stages:
+                    if (stage.name not in status and stage.name not in running.values()
+                            and dependencies[stage.name] <= status.keys()):
+                        running[pool.submit(execute, stage)] = stage.name
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    status[name] = future.result()
+                except Exception as e:
+                    failed = failed or (name, e)
+    if failed is not None:
+        name, error = failed
+        raise RuntimeError(f"Stage {name} failed: {error}") from error
+    if len(status) < len(stages):
+        raise ValueError(f"Stages {', '.join(s.name for s in stages if s.name not in status)} depend on each other in a cycle.")
+    return status
@@ -0,0 +1,432 @@
+import io
+import os
+import sys
+import copy
+import pickle
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from ingest import byte_ranges, read_csv_range
+from row_hash_index import row_hashes
+
+DEFAULT_SKETCH_SIZE = 4096
+DEFAULT_RANK_SAMPLE_SIZE = 4096
+CORRELATION_METHODS = ("pearson", "spearman", "kendall")
+
+
+def common_dtype(first, second):
+    """
+    Combine the dtypes inferred for the same column in two chunks, as a single read would.
+
+    Parameters:
+    ----------
+    first : np.dtype
+        Dtype inferred for the column in one chunk.
+    second : np.dtype
+        Dtype inferred for the column in another chunk.
+
+    Returns:
+    -------
+    np.dtype
+        The dtype of the column across both chunks.
+    """
+    if first == second:
+        return first
+    if pd.api.types.is_numeric_dtype(first) and pd.api.types.is_numeric_dtype(second):
+        return np.result_type(first, second)
+    return np.dtype(object)
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch for one numeric column.
+
+    Values are kept exactly until a level holds more than ``size`` items; that level is then
+    compacted by keeping every other sorted item at twice the weight (a simplified KLL sketch).
+    Quantiles are exact, with the same linear interpolation as pandas, while nothing has been
+    compacted, and have a rank error of roughly ``1 / size`` afterwards.
+
+    Parameters:
+    ----------
+    size : int, optional
+        Maximum number of items per level (default is 4096).
+    """
+
+    def __init__(self, size=DEFAULT_SKETCH_SIZE):
+        self.size = size
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(0)
+
+    def update(self, values):
+        """
+        Add an array of non-null values to the sketch.
+        """
+        self.levels[0] = np.concatenate([self.levels[0], np.asarray(values, dtype=float)])
+        self._compact()
+
+    def merge(self, other):
+        """
+        Add every item of another sketch to this one.
+        """
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compact()
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self.size:
+                items = np.sort(self.levels[level])
+                if len(items) % 2:
+                    items, kept = items[:-1], items[-1:]
+                else:
+                    kept = np.empty(0)
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[self._rng.integers(2)::2]])
+                self.levels[level] = kept
+            level += 1
+
+    def quantile(self, q):
+        """
+        Estimate the q-th quantile (0 <= q <= 1) of the values added so far.
+        """
+        if all(len(items) == 0 for items in self.levels[1:]):
+            return float(np.quantile(self.levels[0], q)) if len(self.levels[0]) else np.nan
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items)
+        items, cumulative = items[order], np.cumsum(weights[order])
+        return float(items[np.searchsorted(cumulative, q * cumulative[-1])])
+
+    def rank(self, values):
+        """
+        Estimate the mid-rank of each value among the values added so far, as a fraction in [0, 1].
+
+        The rank of a value is the weight of the items below it plus half the weight of the items
+        equal to it, which is an affine map of ``pd.Series.rank(method="average")`` while nothing
+        has been compacted.
+        """
+        items = np.concatenate(self.levels)
+        if len(items) == 0:
+            return np.full(len(values), np.nan)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items)
+        items, cumulative = items[order], np.concatenate([[0.0], np.cumsum(weights[order])])
+        below = cumulative[np.searchsorted(items, values, side="left")]
+        through = cumulative[np.searchsorted(items, values, side="right")]
+        return (below + through) / (2 * cumulative[-1])
+
+
+def _smallest_keys(keys, rows, size):
+    """
+    Keep the rows with the ``size`` smallest keys.
+    """
+    if keys is not None and len(keys) > size:
+        kept = np.argsort(keys, kind="stable")[:size]
+        keys, rows = keys[kept], rows[kept]
+    return keys, rows
+
+
+class DatasetProfile:
+    """
+    One-pass, mergeable summary statistics of a dataset.
+
+    A single vectorized pass per chunk collects non-null and missing counts and dtypes for every
+    column, and for numeric columns the mean and variance (Welford/Chan updates), minimum,
+    maximum, a quantile sketch and the co-moment matrix used for Pearson correlation. Profiles
+    of separate chunks can be merged, and the dataset overview, missing values, describe and
+    correlation tables are all derived from the profile instead of rescanning the data.
+
+    Co-moments are accumulated over rows where every numeric column is present, which matches
+    pandas' pairwise correlation whenever the numeric columns have no missing values.
+
+    Spearman and Kendall correlations are estimated from a sample of those complete rows: the
+    rows with the smallest row hashes, so the sample is the same however the data is chunked or
+    merged. Spearman ranks the sampled values within each column's quantile sketch, i.e. among
+    all rows of the dataset. Both are exact while the dataset fits in the sample and the sketches.
+
+    Parameters:
+    ----------
+    sketch_size : int, optional
+        Size of each column's quantile sketch (default is 4096).
+    rank_sample_size : int, optional
+        Number of complete rows sampled for the rank correlations (default is 4096).
+    """
+
+    def __init__(self, sketch_size=DEFAULT_SKETCH_SIZE, rank_sample_size=DEFAULT_RANK_SAMPLE_SIZE):
+        self.sketch_size = sketch_size
+        self.rank_sample_size = rank_sample_size
+        self.columns = []
+        self.dtypes = {}
+        self.non_null = {}
+        self.rows = 0
+        self.numeric = []
+        self.count = self.mean = self.m2 = self.min = self.max = None
+        self.sketches = []
+        self.co_count = 0
+        self.co_mean = self.co_moment = None
+        self.rank_keys = self.rank_sample = None
+
+    @classmethod
+    def from_frame(cls, df, sketch_size=DEFAULT_SKETCH_SIZE, rank_sample_size=DEFAULT_RANK_SAMPLE_SIZE):
+        """
+        Profile a DataFrame in one pass.
+        """
+        profile = cls(sketch_size, rank_sample_size)
+        profile.update(df)
+        return profile
+
+    def update(self, df):
+        """
+        Add a chunk of rows to the profile.
+
+        Parameters:
+        ----------
+        df : pd.DataFrame
+            Chunk with the same columns as the chunks profiled before.
+
+        Returns:
+        -------
+        DatasetProfile
+            The updated profile.
+        """
+        chunk = DatasetProfile(self.sketch_size, self.rank_sample_size)
+        chunk.columns = list(df.columns)
+        chunk.dtypes = df.dtypes.to_dict()
+        chunk.rows = len(df)
+        chunk.numeric = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column].dtype)
+                         and not pd.api.types.is_bool_dtype(df[column].dtype)]
+
+        values = df[chunk.numeric].to_numpy(dtype=float)
+        present = ~np.isnan(values)
+        counts = present.sum(axis=0)
+        chunk.count = counts.astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            chunk.mean = np.where(counts > 0, np.nansum(values, axis=0) / counts, 0.0)
+            chunk.m2 = np.nansum(np.where(present, values - chunk.mean, 0.0) ** 2, axis=0)
+        chunk.min = np.where(counts > 0, np.where(present, values, np.inf).min(axis=0, initial=np.inf), np.inf)
+        chunk.max = np.where(counts > 0, np.where(present, values, -np.inf).max(axis=0, initial=-np.inf), -np.inf)
+        for j in range(values.shape[1]):
+            sketch = QuantileSketch(self.sketch_size)
+            sketch.update(values[present[:, j], j])
+            chunk.sketches.append(sketch)
+
+        is_complete = present.all(axis=1)
+        complete = values[is_complete]
+        chunk.co_count = len(complete)
+        chunk.co_mean = complete.mean(axis=0) if len(complete) else np.zeros(values.shape[1])
+        centered = complete - chunk.co_mean
+        chunk.co_moment = centered.T @ centered
+        chunk.rank_keys, chunk.rank_sample = _smallest_keys(
+            row_hashes(df.loc[is_complete, chunk.numeric]), complete, self.rank_sample_size)
+
+        missing = df.isna().to_numpy().sum(axis=0)
+        chunk.non_null = dict(zip(chunk.columns, (len(df) - missing).tolist()))
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """
+        Merge the profile of another chunk of the same dataset into this profile.
+
+        Parameters:
+        ----------
+        other : DatasetProfile
+            Profile of other rows with the same columns.
+
+        Returns:
+        -------
+        DatasetProfile
+            The merged profile.
+        """
+        if not self.columns:
+            self.__dict__.update({k: v for k, v in other.__dict__.items() if k not in ("sketch_size", "rank_sample_size")})
+            self.rank_keys, self.rank_sample = _smallest_keys(self.rank_keys, self.rank_sample, self.rank_sample_size)
+            return self
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge profiles of datasets with different columns.")
+
+        self.dtypes = {c: common_dtype(self.dtypes[c], other.dtypes[c]) for c in self.columns}
+        self.non_null = {c: self.non_null[c] + other.non_null[c] for c in self.columns}
+        self.rows += other.rows
+
+        # A column parsed as numeric in one chunk but not another loses its numeric statistics
+        if other.numeric != self.numeric:
+            shared = [c for c in self.numeric if c in other.numeric]
+            self._restrict(shared)
+            other = copy.copy(other)._restrict(shared)
+
+        # Chan et al. parallel update of per-column means and sums of squared deviations
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(n > 0, self.mean + delta * other.count / n, 0.0)
+            m2 = self.m2 + other.m2 + np.where(n > 0, delta ** 2 * self.count * other.count / n, 0.0)
+        self.count, self.mean, self.m2 = n, mean, m2
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+
+        # The same update applied to the co-moment matrix of complete rows
+        co_n = self.co_count + other.co_count
+        if co_n:
+            co_delta = other.co_mean - self.co_mean
+            self.co_moment = (self.co_moment + other.co_moment
+                              + np.outer(co_delta, co_delta) * self.co_count * other.co_count / co_n)
+            self.co_mean = self.co_mean + co_delta * other.co_count / co_n
+        self.co_count = co_n
+        self.rank_keys, self.rank_sample = _smallest_keys(np.concatenate([self.rank_keys, other.rank_keys]),
+                                                          np.concatenate([self.rank_sample, other.rank_sample]),
+                                                          self.rank_sample_size)
+        return self
+
+    def _restrict(self, columns):
+        """
+        Keep the numeric statistics of the given columns only.
+        """
+        positions = [self.numeric.index(c) for c in columns]
+        self.numeric = list(columns)
+        self.count, self.mean, self.m2 = self.count[positions], self.mean[positions], self.m2[positions]
+        self.min, self.max = self.min[positions], self.max[positions]
+        self.sketches = [self.sketches[i] for i in positions]
+        self.co_mean = self.co_mean[positions]
+        self.co_moment = self.co_moment[np.ix_(positions, positions)]
+        self.rank_sample = self.rank_sample[:, positions]
+        return self
+
+    def overview_table(self):
+        """
+        Columns, non-null counts and dtypes, as written to dataset_overview.csv.
+        """
+        return pd.DataFrame({"Column": self.columns,
+                             "Non-Null Count": [self.non_null[c] for c in self.columns],
+                             "Dtype": [self.dtypes[c] for c in self.columns]})
+
+    def missing_table(self):
+        """
+        Missing value counts per column, as written to missing_values.csv.
+        """
+        return pd.DataFrame({"Column": self.columns,
+                             "Missing Values": [self.rows - self.non_null[c] for c in self.columns]})
+
+    def describe_table(self):
+        """
+        Summary statistics of the numeric columns in the layout of ``pd.DataFrame.describe``.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(np.where(self.count > 1, self.m2 / (self.count - 1), np.nan))
+        has_values = self.count > 0
+        rows = {
+            "count": self.count,
+            "mean": np.where(has_values, self.mean, np.nan),
+            "std": std,
+            "min": np.where(has_values, self.min, np.nan),
+            "25%": [s.quantile(0.25) for s in self.sketches],
+            "50%": [s.quantile(0.5) for s in self.sketches],
+            "75%": [s.quantile(0.75) for s in self.sketches],
+            "max": np.where(has_values, self.max, np.nan),
+        }
+        return pd.DataFrame(rows, index=self.numeric).T
+
+    def correlation(self, method="pearson"):
+        """
+        Correlation matrix of the numeric columns.
+
+        Pearson correlation is exact and derived from the co-moments. Spearman and Kendall
+        correlations are computed on the sampled rows, with Spearman ranks taken from the quantile
+        sketches of the whole columns.
+
+        Parameters:
+        ----------
+        method : str, optional
+            "pearson" (default), "spearman" or "kendall".
+
+        Returns:
+        -------
+        pd.DataFrame
+            Correlation matrix indexed by the numeric columns.
+        """
+        if method not in CORRELATION_METHODS:
+            raise ValueError(f"Unknown correlation method {method}. Expected one of {', '.join(CORRELATION_METHODS)}.")
+        if method == "spearman":
+            ranks = np.column_stack([sketch.rank(self.rank_sample[:, j]) for j, sketch in enumerate(self.sketches)])
+            return pd.DataFrame(ranks, columns=self.numeric).corr()
+        if method == "kendall":
+            return pd.DataFrame(self.rank_sample, columns=self.numeric).corr(method="kendall")
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scale = np.sqrt(np.diag(self.co_moment))
+            corr = self.co_moment / np.outer(scale, scale)
+        np.fill_diagonal(corr, np.where(scale > 0, 1.0, np.nan))
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.numeric, columns=self.numeric)
+
+    def save(self, path):
+        """
+        Save the profile as a pickle artifact.
+        """
+        output_dir = os.path.dirname(path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a profile saved with ``save``.
+        """
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+def _profile_byte_range(task):
+    """
+    Profile one byte range of a CSV file in a worker process of ``profile_in_chunks``.
+    """
+    input_path, start, end, columns, sep, sketch_size, rank_sample_size = task
+    return DatasetProfile(sketch_size, rank_sample_size).update(read_csv_range(input_path, start, end, columns, sep=sep))
+
+
+def profile_in_chunks(input_path, chunksize, workers=None, sep=",", sketch_size=DEFAULT_SKETCH_SIZE,
+                      rank_sample_size=DEFAULT_RANK_SAMPLE_SIZE):
+    """
+    Profile a CSV file larger than memory in one parallel pass.
+
+    Worker processes parse and profile newline-aligned byte ranges of the file, and their
+    profiles are merged in file order. Only the profiles, whose size does not depend on the
+    number of rows, are sent back to the parent process.
+
+    Parameters:
+    ----------
+    input_path : str
+        Path to the CSV file.
+    chunksize : int
+        Approximate number of bytes per chunk.
+    workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    sep : str, optional
+        Field delimiter (default is ',').
+    sketch_size : int, optional
+        Size of each column's quantile sketch (default is 4096).
+    rank_sample_size : int, optional
+        Number of complete rows sampled for the rank correlations (default is 4096).
+
+    Returns:
+    -------
+    DatasetProfile
+        Profile of the whole file.
+    """
+    header, ranges = byte_ranges(input_path, chunksize)
+    columns = list(pd.read_csv(io.BytesIO(header), sep=sep, nrows=0).columns)
+    tasks = [(input_path, start, end, columns, sep, sketch_size, rank_sample_size) for start, end in ranges]
+
+    profile = DatasetProfile(sketch_size, rank_sample_size)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_profile in pool.map(_profile_byte_range, tasks):
+            profile.merge(chunk_profile)
+    return profile
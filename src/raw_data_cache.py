@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "wine_quality_predictor")
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _index_path(cache_dir):
+    return os.path.join(cache_dir, "index.json")
+
+
+def _object_path(cache_dir, sha256):
+    return os.path.join(cache_dir, "objects", sha256[:2], sha256)
+
+
+def _load_index(cache_dir):
+    try:
+        with open(_index_path(cache_dir), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(cache_dir, index):
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = _index_path(cache_dir) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp_path, _index_path(cache_dir))
+
+
+def _entry_key(url, validator, member):
+    return hashlib.sha256(f"{url}\n{validator}\n{member}".encode("utf-8")).hexdigest()
+
+
+def file_sha256(path):
+    """
+    Compute the SHA-256 digest of a file without loading it into memory.
+
+    Parameters:
+    ----------
+    path : str
+        Path of the file to hash.
+
+    Returns:
+    -------
+    str
+        Hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_validator(url, timeout=10):
+    """
+    Fetch the ETag or Last-Modified header of a remote file with a HEAD request.
+
+    Parameters:
+    ----------
+    url : str
+        The URL of the remote file.
+    timeout : float, optional
+        Seconds to wait for the server (default is 10).
+
+    Returns:
+    -------
+    str or None
+        The validator, or None when the server sends neither header.
+    """
+    # requests is only imported for online lookups, so cache-only commands start quickly
+    import requests
+
+    try:
+        response = requests.head(url, allow_redirects=True, timeout=timeout)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        raise ValueError(f"Failed to fetch data from URL: {url}. Error: {e}")
+    return response.headers.get("ETag") or response.headers.get("Last-Modified")
+
+
+def lookup(cache_dir, url, validator=None, member=None, offline=False):
+    """
+    Find a cached file for a URL (and optionally an archive member inside it).
+
+    Online lookups only hit when the remote validator matches the one recorded at store time.
+    Offline lookups ignore the validator and return the most recently stored entry for the URL.
+    An object whose contents no longer match its digest is removed and counts as a miss.
+
+    Parameters:
+    ----------
+    cache_dir : str
+        Root directory of the cache.
+    url : str
+        The URL the file was downloaded from.
+    validator : str, optional
+        Current ETag or Last-Modified value of the remote file.
+    member : str, optional
+        Name of the archive member, when the cached file was extracted from the download.
+    offline : bool, optional
+        Whether to skip validator matching (default is False).
+
+    Returns:
+    -------
+    str or None
+        Path of the cached object, or None on a miss.
+    """
+    index = _load_index(cache_dir)
+    if offline:
+        candidates = [e for e in index.values() if e["url"] == url and e["member"] == member]
+        entry = max(candidates, key=lambda e: e["stored"], default=None)
+    elif validator is None:
+        entry = None
+    else:
+        entry = index.get(_entry_key(url, validator, member))
+
+    if entry is None:
+        return None
+
+    path = _object_path(cache_dir, entry["sha256"])
+    if not os.path.exists(path):
+        return None
+    if os.path.getsize(path) != entry["size"] or file_sha256(path) != entry["sha256"]:
+        os.remove(path)
+        return None
+
+    entry["last_access"] = time.time()
+    _save_index(cache_dir, index)
+    return path
+
+
+def store(cache_dir, path, url, validator=None, member=None, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Add a file to the cache under its SHA-256 digest and evict old entries beyond the size bound.
+
+    Parameters:
+    ----------
+    cache_dir : str
+        Root directory of the cache.
+    path : str
+        Path of the file to cache.
+    url : str
+        The URL the file was downloaded from.
+    validator : str, optional
+        ETag or Last-Modified value of the remote file.
+    member : str, optional
+        Name of the archive member, when the file was extracted from the download.
+    max_bytes : int, optional
+        Maximum total size of cached objects (default is 1 GiB).
+
+    Returns:
+    -------
+    str
+        SHA-256 digest of the stored file.
+    """
+    sha256 = file_sha256(path)
+    object_path = _object_path(cache_dir, sha256)
+    if not os.path.exists(object_path):
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        tmp_path = object_path + ".tmp"
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, object_path)
+
+    now = time.time()
+    index = _load_index(cache_dir)
+    index[_entry_key(url, validator, member)] = {
+        "url": url,
+        "validator": validator,
+        "member": member,
+        "sha256": sha256,
+        "size": os.path.getsize(object_path),
+        "stored": now,
+        "last_access": now,
+    }
+    _save_index(cache_dir, index)
+    evict(cache_dir, max_bytes)
+    return sha256
+
+
+def evict(cache_dir, max_bytes):
+    """
+    Remove least recently used objects until the cache fits in the size bound.
+
+    Parameters:
+    ----------
+    cache_dir : str
+        Root directory of the cache.
+    max_bytes : int
+        Maximum total size of cached objects.
+
+    Returns:
+    -------
+    None
+    """
+    index = _load_index(cache_dir)
+
+    # Several entries may share one object, so account for each object at its most recent use
+    objects = {}
+    for entry in index.values():
+        last_access, size = objects.get(entry["sha256"], (0, entry["size"]))
+        objects[entry["sha256"]] = (max(last_access, entry["last_access"]), size)
+
+    total = sum(size for _, size in objects.values())
+    removed = set()
+    for sha256, (_, size) in sorted(objects.items(), key=lambda item: item[1][0]):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(_object_path(cache_dir, sha256))
+        except FileNotFoundError:
+            pass
+        removed.add(sha256)
+        total -= size
+
+    if removed:
+        _save_index(cache_dir, {k: e for k, e in index.items() if e["sha256"] not in removed})
+
+
+def materialize(object_path, output_path):
+    """
+    Copy a cached object to the output path.
+
+    The object is copied rather than linked, so writers of the output path can never modify
+    the cache. The copy is written to a temporary file and moved into place.
+
+    Parameters:
+    ----------
+    object_path : str
+        Path of the cached object.
+    output_path : str
+        Destination path.
+
+    Returns:
+    -------
+    None
+    """
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    tmp_path = output_path + ".tmp"
+    shutil.copyfile(object_path, tmp_path)
+    os.replace(tmp_path, output_path)
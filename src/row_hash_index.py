@@ -0,0 +1,287 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+# Two independent 16-character keys give every row a primary hash and a verification fingerprint
+HASH_KEY = "0123456789123456"
+FINGERPRINT_KEY = "wine-quality-row"
+
+
+def row_hashes(df, hash_key=HASH_KEY):
+    """
+    Compute a 64-bit hash of every row of a DataFrame.
+
+    Numeric columns are hashed as float64 so that a value parsed as int in one batch and as
+    float in another hashes identically.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Input dataset.
+    hash_key : str, optional
+        16-character key of the hash function.
+
+    Returns:
+    -------
+    np.ndarray
+        uint64 array with one hash per row.
+    """
+    # Only cast the numeric columns that are not float64 already, avoiding a copy of the frame
+    to_float = {c: "float64" for c, dtype in df.dtypes.items()
+                if pd.api.types.is_numeric_dtype(dtype) and dtype != np.float64}
+    if to_float:
+        df = df.astype(to_float)
+    return pd.util.hash_pandas_object(df, index=False, hash_key=hash_key).to_numpy()
+
+
+def content_hash(df):
+    """
+    Compute a SHA-256 digest of the columns and rows of a DataFrame, in order.
+
+    Like ``row_hashes``, it does not depend on whether numeric columns were parsed as int or
+    float, so the same data stored in different artifact formats has the same hash.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Input dataset.
+
+    Returns:
+    -------
+    str
+        Hex digest of the data.
+    """
+    digest = hashlib.sha256(json.dumps(list(map(str, df.columns))).encode())
+    digest.update(row_hashes(df).tobytes())
+    return digest.hexdigest()
+
+
+def _rows_equal(left, right):
+    """
+    Compare two equally shaped DataFrames row by row, treating missing values as equal.
+    """
+    left, right = left.reset_index(drop=True), right.reset_index(drop=True)
+    return ((left == right) | (left.isna() & right.isna())).all(axis=1).to_numpy()
+
+
+def batch_duplicates(df, hashes=None):
+    """
+    Flag rows that repeat an earlier row of the same DataFrame.
+
+    Rows sharing a hash are compared value by value, so a hash collision never flags a distinct row.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Batch of rows.
+    hashes : np.ndarray, optional
+        Row hashes of ``df`` from ``row_hashes``. Computed when not given.
+
+    Returns:
+    -------
+    np.ndarray
+        Boolean mask, True for duplicate rows. The first occurrence is never flagged.
+    """
+    if hashes is None:
+        hashes = row_hashes(df)
+    within = pd.Index(hashes).duplicated(keep="first")
+
+    # Verify candidate duplicates against the first row sharing their hash
+    candidates = np.flatnonzero(within)
+    if len(candidates):
+        involved = np.flatnonzero(np.isin(hashes, hashes[candidates]))
+        first_of = pd.Series(involved, index=hashes[involved])
+        first_of = first_of[~first_of.index.duplicated(keep="first")]
+        first = first_of.loc[hashes[candidates]].to_numpy()
+        within[candidates] = _rows_equal(df.iloc[candidates], df.iloc[first])
+    return within
+
+
+def _merge_runs(runs):
+    """
+    Merge runs of (hashes, fingerprints) sorted by hash into one sorted run.
+    """
+    hashes = np.concatenate([run_hashes for run_hashes, _ in runs])
+    fingerprints = np.concatenate([run_fingerprints for _, run_fingerprints in runs])
+    # A stable sort of concatenated sorted runs is a linear-time merge
+    order = np.argsort(hashes, kind="stable")
+    return hashes[order], fingerprints[order]
+
+
+class RowHashIndex:
+    """
+    Index of 64-bit row hashes used to find duplicate rows in one pass and across batches.
+
+    Every row is identified by a primary hash and an independent fingerprint hash. Within a
+    batch, rows sharing a primary hash are compared value by value, so a hash collision can at
+    worst keep a duplicate but never drops a distinct row. Rows from earlier batches are only
+    kept as hashes; a match against them requires both the primary hash and the fingerprint to
+    agree.
+
+    The hashes are kept as a few runs sorted by hash, each at least twice the size of the next
+    one. A batch adds a run, and runs are merged only when the newer one catches up with the
+    older one, so adding n rows in any number of batches costs O(n log n) overall instead of
+    rewriting the whole index for every batch.
+
+    Parameters:
+    ----------
+    hashes : np.ndarray, optional
+        Sorted uint64 primary hashes of rows already seen.
+    fingerprints : np.ndarray, optional
+        uint64 fingerprints aligned with ``hashes``.
+    """
+
+    def __init__(self, hashes=None, fingerprints=None):
+        self._runs = []
+        if hashes is not None and len(hashes):
+            self._runs.append((hashes, fingerprints))
+
+    def __len__(self):
+        return sum(len(hashes) for hashes, _ in self._runs)
+
+    def _compact(self):
+        """
+        Merge every run into one.
+        """
+        if len(self._runs) > 1:
+            self._runs = [_merge_runs(self._runs)]
+
+    @property
+    def hashes(self):
+        """
+        Sorted uint64 primary hashes of every row in the index.
+        """
+        self._compact()
+        return self._runs[0][0] if self._runs else np.empty(0, dtype=np.uint64)
+
+    @property
+    def fingerprints(self):
+        """
+        uint64 fingerprints aligned with ``hashes``.
+        """
+        self._compact()
+        return self._runs[0][1] if self._runs else np.empty(0, dtype=np.uint64)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index saved with ``save``, or return an empty index when the file does not exist.
+
+        Parameters:
+        ----------
+        path : str
+            Path of the index file (.npz).
+
+        Returns:
+        -------
+        RowHashIndex
+            The loaded index.
+        """
+        if not os.path.exists(path):
+            return cls()
+        with np.load(path) as data:
+            return cls(data["hashes"], data["fingerprints"])
+
+    def save(self, path):
+        """
+        Save the index to a compressed .npz file.
+
+        Parameters:
+        ----------
+        path : str
+            Path of the index file.
+
+        Returns:
+        -------
+        None
+        """
+        output_dir = os.path.dirname(path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(tmp_path, hashes=self.hashes, fingerprints=self.fingerprints)
+        os.replace(tmp_path, path)
+
+    def _seen(self, hashes, fingerprints):
+        """
+        Flag rows whose hash and fingerprint are both already in the index.
+        """
+        seen = np.zeros(len(hashes), dtype=bool)
+        if not self._runs:
+            return seen
+        # Sorted queries walk the index in order, which is several times faster than random lookups
+        order = np.argsort(hashes)
+        sorted_hashes = hashes[order]
+        for run_hashes, run_fingerprints in self._runs:
+            left = np.empty(len(hashes), dtype=np.intp)
+            right = np.empty(len(hashes), dtype=np.intp)
+            left[order] = np.searchsorted(run_hashes, sorted_hashes, side="left")
+            right[order] = np.searchsorted(run_hashes, sorted_hashes, side="right")
+
+            # Compare the fingerprints of the k-th entry sharing each row's hash, for every k at once;
+            # distinct rows sharing a 64-bit hash are rare, so this takes one or two steps
+            candidates = np.flatnonzero(right > left)
+            offset = 0
+            while len(candidates):
+                seen[candidates] |= run_fingerprints[left[candidates] + offset] == fingerprints[candidates]
+                offset += 1
+                candidates = candidates[right[candidates] > left[candidates] + offset]
+        return seen
+
+    def find_duplicates(self, df, update=True):
+        """
+        Flag rows that repeat an earlier row of the batch or a row from a previous batch.
+
+        Parameters:
+        ----------
+        df : pd.DataFrame
+            Batch of rows.
+        update : bool, optional
+            Whether to add the batch's unique rows to the index (default is True).
+
+        Returns:
+        -------
+        np.ndarray
+            Boolean mask, True for duplicate rows. The first occurrence is never flagged.
+        """
+        hashes = row_hashes(df)
+        within = batch_duplicates(df, hashes)
+
+        # Fingerprints are only needed to match or extend rows of earlier batches
+        if not update and len(self.hashes) == 0:
+            return within
+        return self.merge_hashes(hashes, row_hashes(df, FINGERPRINT_KEY), within, update)
+
+    def merge_hashes(self, hashes, fingerprints, within, update=True):
+        """
+        Flag rows of a hashed batch that repeat a row from a previous batch.
+
+        This is the part of ``find_duplicates`` that only needs hashes, so batches hashed in
+        other processes can be deduplicated against one shared index.
+
+        Parameters:
+        ----------
+        hashes : np.ndarray
+            uint64 primary hashes of the batch's rows, from ``row_hashes``.
+        fingerprints : np.ndarray
+            uint64 fingerprints of the batch's rows, from ``row_hashes`` with ``FINGERPRINT_KEY``.
+        within : np.ndarray
+            Boolean mask of rows repeating an earlier row of the same batch.
+        update : bool, optional
+            Whether to add the batch's unique rows to the index (default is True).
+
+        Returns:
+        -------
+        np.ndarray
+            Boolean mask, True for duplicate rows.
+        """
+        duplicates = within | self._seen(hashes, fingerprints)
+        if update and not duplicates.all():
+            order = np.argsort(hashes[~duplicates], kind="stable")
+            self._runs.append((hashes[~duplicates][order], fingerprints[~duplicates][order]))
+            # Merge the newest runs while they are not at least halving in size
+            while len(self._runs) > 1 and len(self._runs[-2][0]) < 2 * len(self._runs[-1][0]):
+                self._runs[-2:] = [_merge_runs(self._runs[-2:])]
+        return duplicates
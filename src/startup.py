@@ -0,0 +1,135 @@
+import re
+import sys
+import time
+import subprocess
+
+# Wall time allowed for the CLI to start and print its help, in milliseconds. The interpreter and
+# its site packages take about 50 ms and click about 25 ms; the rest is headroom for slower machines.
+STARTUP_BUDGET_MS = 250
+
+# Packages that take 0.1 s or more to import and must only be imported by a running stage
+HEAVY_MODULES = ("numpy", "pandas", "scipy", "sklearn", "matplotlib", "seaborn", "pandera", "deepchecks", "requests")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def parse_importtime(stderr):
+    """
+    Parse the report that ``python -X importtime`` writes to standard error.
+
+    Parameters:
+    ----------
+    stderr : str
+        Standard error of the profiled interpreter.
+
+    Returns:
+    -------
+    list
+        One (module, self_us, cumulative_us, depth) tuple per imported module, in the order the
+        imports finished. Top-level imports have depth 0 and their cumulative time includes
+        every nested import.
+    """
+    records = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return records
+
+
+def import_profile(args, python=sys.executable):
+    """
+    Run a Python command with ``-X importtime`` and collect the time spent importing each module.
+
+    Parameters:
+    ----------
+    args : list
+        Arguments passed to the interpreter after ``-X importtime``, e.g. a script and its
+        options or ``["-c", "import pandas"]``.
+    python : str, optional
+        Interpreter to run (default is the current one).
+
+    Returns:
+    -------
+    list
+        The parsed report, see ``parse_importtime``.
+
+    Raises:
+    ------
+    RuntimeError
+        If the command fails.
+    """
+    result = subprocess.run([python, "-X", "importtime", *args], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Profiled command failed: {result.stderr.strip().splitlines()[-1:]}")
+    return parse_importtime(result.stderr)
+
+
+def heavy_imports(records):
+    """
+    List the heavy packages imported in a profile.
+
+    Parameters:
+    ----------
+    records : list
+        Parsed report from ``parse_importtime``.
+
+    Returns:
+    -------
+    list
+        Sorted names of the packages of ``HEAVY_MODULES`` that were imported.
+    """
+    return sorted({module.split(".")[0] for module, _, _, _ in records} & set(HEAVY_MODULES))
+
+
+def startup_time(args, repeat=5, python=sys.executable):
+    """
+    Measure the wall time of a Python command, including interpreter startup.
+
+    Parameters:
+    ----------
+    args : list
+        Arguments passed to the interpreter.
+    repeat : int, optional
+        Number of runs (default is 5). The fastest one is reported, as the others only add
+        noise from the rest of the machine.
+    python : str, optional
+        Interpreter to run (default is the current one).
+
+    Returns:
+    -------
+    float
+        Fastest wall time in milliseconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([python, *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def budget_error(elapsed, budget, heavy):
+    """
+    Check a measured startup against the budget.
+
+    Parameters:
+    ----------
+    elapsed : float
+        Startup wall time in milliseconds, from ``startup_time``.
+    budget : float
+        Startup budget in milliseconds.
+    heavy : list
+        Heavy packages imported at startup, from ``heavy_imports``.
+
+    Returns:
+    -------
+    str or None
+        Why the startup fails its budget, or None when it passes.
+    """
+    if elapsed > budget:
+        return "Startup is over budget."
+    if heavy:
+        return "Startup imports heavy packages; import them inside the command instead."
+    return None
@@ -1,30 +1,84 @@
 # Author: Bryan Lee
 # Date: 2024-12-07
 
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from artifacts import artifact_path, load_frame, save_frame, save_split, SPLIT_FILE
+from row_hash_index import content_hash
+from validation import schema
+
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+
+def split_indices(y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=True):
+    """
+    Split row positions into training and test sets, stratified on the target when possible.
+
+    Parameters:
+    ----------
+    y : pd.Series
+        Target variable.
+    test_size : float, optional
+        Fraction of rows in the test set (default is 0.2).
+    random_state : int, optional
+        Seed of the split (default is 42), so every run produces the same split.
+    stratify : bool, optional
+        Whether to keep the class proportions of the target in both sets (default is True).
+        Falls back to an unstratified split when a class is too small to be split.
+
+    Returns:
+    -------
+    tuple
+        (train, test, stratified): sorted int64 row positions of both sets and whether the
+        split is stratified.
+    """
+    positions = np.arange(len(y))
+    if stratify:
+        try:
+            train, test = train_test_split(positions, test_size=test_size, random_state=random_state, stratify=y)
+            return np.sort(train), np.sort(test), True
+        except ValueError as e:
+            print(f"Cannot stratify the split on {y.name}, using an unstratified split instead: {e}")
+    train, test = train_test_split(positions, test_size=test_size, random_state=random_state)
+    return np.sort(train), np.sort(test), False
 
 # Train-test split
-def run_TrainTestSplit(clean_data_path, train_test_path):
+def run_TrainTestSplit(clean_data_path, train_test_path, fmt='csv', random_state=RANDOM_STATE, stratify=True):
     """
-    Splits a dataset into training and testing subsets and saves them as CSV files.
+    Splits a dataset into training and testing subsets and saves them as pipeline artifacts.
 
     This function reads a cleaned dataset from the specified file path, separates the features 
-    (X) and the target variable (y), performs a train-test split, and saves the resulting 
-    subsets (X_train, y_train, X_test, y_test) into the specified directory. The function 
-    handles potential errors during file reading and data splitting.
+    (X) and the target variable (y), performs a seeded train-test split stratified on 'quality',
+    and saves the resulting subsets (X_train, y_train, X_test, y_test) into the specified
+    directory. The row indices of both sets and the content hash of the cleaned dataset are
+    always saved to split.npz; with fmt="index" they are the only output, and the subsets are
+    materialized from the cleaned dataset when loaded. The function handles potential errors
+    during file reading and data splitting.
 
     Parameters:
     ----------
     clean_data_path : str
-        The file path to the cleaned dataset in CSV format. The dataset is expected to have 
+        The file path to the cleaned dataset in any artifact format (CSV or .npy). The dataset is expected to have 
         a 'quality' column as the target variable and the rest of the columns as features.
 
     train_test_path : str
         The directory path where the train-test split CSV files (X_train, y_train, X_test, 
         y_test) will be saved. If the directory doesn't exist, it will be created.
 
+    fmt : str, optional
+        Artifact format of the split files: "csv", "npy" or "index"
+        (default is "csv").
+
+    random_state : int, optional
+        Seed of the split (default is 42).
+
+    stratify : bool, optional
+        Whether to stratify the split on 'quality' (default is True).
+
     Returns:
     -------
     None
@@ -40,7 +94,7 @@ def run_TrainTestSplit(clean_data_path, train_test_path):
     
     try:
         # Load data
-        df = pd.read_csv(clean_data_path)
+        df = load_frame(clean_data_path, schema=schema)
     except Exception as e:
         print(f'issue with reading csv: {e}') 
 
@@ -48,12 +102,20 @@ def run_TrainTestSplit(clean_data_path, train_test_path):
         X = df.drop('quality', axis=1)
         y = df['quality']
         
-        # Train-test split
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
-        X_train.to_csv(os.path.join(train_test_path, "X_train.csv"), index=False)
-        y_train.to_csv(os.path.join(train_test_path, "y_train.csv"), index=False)
-        X_test.to_csv(os.path.join(train_test_path, "X_test.csv"), index=False)
-        y_test.to_csv(os.path.join(train_test_path, "y_test.csv"), index=False)
+        # Seeded, stratified train-test split, recorded as row indices into the cleaned data
+        train, test, stratified = split_indices(y, random_state=random_state, stratify=stratify)
+        save_split(os.path.join(train_test_path, SPLIT_FILE), train, test, clean_data_path, content_hash(df),
+                   label='quality', random_state=random_state, stratified=stratified)
+        if fmt == 'index':
+            print('Train-test split functioning properly')
+            return
+
+        X_train, X_test = X.iloc[train].reset_index(drop=True), X.iloc[test].reset_index(drop=True)
+        y_train, y_test = y.iloc[train].reset_index(drop=True), y.iloc[test].reset_index(drop=True)
+        save_frame(X_train, artifact_path(train_test_path, "X_train", fmt))
+        save_frame(y_train, artifact_path(train_test_path, "y_train", fmt))
+        save_frame(X_test, artifact_path(train_test_path, "X_test", fmt))
+        save_frame(y_test, artifact_path(train_test_path, "y_test", fmt))
         print('Train-test split functioning properly')
     except Exception as e:
         print(f"Unexpected error during train-test split: {e}")
\ No newline at end of file
@@ -0,0 +1,147 @@
+import json
+import time
+import sqlite3
+import hashlib
+import os
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    data TEXT NOT NULL,
+    split TEXT NOT NULL,
+    params TEXT NOT NULL,
+    fold INTEGER NOT NULL,
+    n_samples INTEGER,
+    score REAL NOT NULL,
+    fit_time REAL NOT NULL,
+    score_time REAL NOT NULL,
+    created REAL NOT NULL
+)
+"""
+
+
+def params_json(params):
+    """
+    Canonical JSON of a parameter set: sorted keys, NumPy scalars as Python numbers.
+    """
+    return json.dumps(params, sort_keys=True, default=lambda value: value.item())
+
+
+def trial_key(model, data, split, fold, rows, params):
+    """
+    Key of one fold of one candidate.
+
+    Parameters:
+    ----------
+    model : str
+        Hash of the unfitted model the parameters are set on.
+    data : str
+        Hash of the training data.
+    split : str
+        Hash of the training and validation rows of every fold.
+    fold : int
+        Index of the fold in the split.
+    rows : str or None
+        Hash of the training rows fitted when they are a subset of the fold, else None.
+    params : dict
+        Parameters of the candidate.
+
+    Returns:
+    -------
+    str
+        Hex digest identifying the trial.
+    """
+    return hashlib.sha256(f"{model}\n{data}\n{split}\n{fold}\n{rows}\n{params_json(params)}".encode()).hexdigest()
+
+
+class TrialStore:
+    """
+    SQLite file recording the validation score of every fold of every candidate as it completes.
+
+    A search that scores the same parameters of the same model on the same folds of the same
+    data reads the score back instead of refitting, so an interrupted search resumes where it
+    stopped and overlapping searches share their trials.
+
+    Parameters:
+    ----------
+    path : str
+        Path of the SQLite file, created with its directory if needed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(_SCHEMA)
+            self._connection.execute("CREATE INDEX IF NOT EXISTS trials_model_data ON trials (model, data, split)")
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM trials").fetchone()[0]
+
+    def close(self):
+        self._connection.close()
+
+    def get(self, keys):
+        """
+        Scores of the stored trials among ``keys``.
+
+        Returns:
+        -------
+        dict
+            Score by key, for the keys found.
+        """
+        scores = {}
+        keys = list(keys)
+        # SQLite limits the number of parameters of a statement
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            rows = self._connection.execute(
+                f"SELECT key, score FROM trials WHERE key IN ({', '.join('?' * len(batch))})", batch
+            )
+            scores.update(rows.fetchall())
+        return scores
+
+    def put(self, key, model, data, split, params, fold, n_samples, score, fit_time=0.0, score_time=0.0):
+        """
+        Record the score of one fold of one candidate, committed at once so it survives the process.
+        """
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, data, split, params_json(params), fold, n_samples, float(score), float(fit_time),
+                 float(score_time), time.time()),
+            )
+
+    def best(self, model, data, split, n_folds, top=5):
+        """
+        Best parameters scored earlier on every full fold of the same model, data and split.
+
+        Parameters:
+        ----------
+        model : str
+            Hash of the unfitted model.
+        data : str
+            Hash of the training data.
+        split : str
+            Hash of the folds.
+        n_folds : int
+            Number of folds of the split.
+        top : int, optional
+            Number of parameter sets returned (default is 5).
+
+        Returns:
+        -------
+        list
+            (params, mean score) of the best candidates, best first.
+        """
+        rows = self._connection.execute(
+            "SELECT params, AVG(score) AS mean_score FROM trials "
+            "WHERE model = ? AND data = ? AND split = ? AND n_samples IS NULL "
+            "GROUP BY params HAVING COUNT(DISTINCT fold) = ? ORDER BY mean_score DESC, MIN(created) LIMIT ?",
+            (model, data, split, n_folds, top),
+        )
+        return [(json.loads(params), score) for params, score in rows.fetchall()]
@@ -3,23 +3,39 @@
 
 import pandera as pa
 import pandas as pd
-from deepchecks.tabular import Dataset
-from deepchecks.tabular.checks import FeatureLabelCorrelation
+import numpy as np
+import hashlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from artifacts import load_frame
+from bounds_check import (in_bounds, check_bounds, structural_schema, residual_schema, count_checks, merge_reports,
+                          DUPLICATE_CHECK, REPORT_COLUMNS)
+from ingest import byte_ranges, read_csv_range, schema_dtypes
+from row_hash_index import RowHashIndex, row_hashes, batch_duplicates, FINGERPRINT_KEY
 
-# Define the DataFrame schema
+# Bump when the schema or the feature-label correlation check changes, to invalidate cached results
+SCHEMA_VERSION = 1
+PPS_THRESHOLD = 0.9
+
+# Define the DataFrame schema. Column bounds are declared with in_bounds so that
+# check_bounds can evaluate all of them in one vectorized pass.
 schema = pa.DataFrameSchema(
     {
-        "fixed acidity": pa.Column(float, pa.Check(lambda s: (s > 0).all()), nullable=False),
-        "volatile acidity": pa.Column(float, pa.Check(lambda s: (s > 0).all()), nullable=False),
-        "citric acid": pa.Column(float, pa.Check(lambda s: (s >= 0).all()), nullable=False),
-        "residual sugar": pa.Column(float, pa.Check(lambda s: (s >= 0).all()), nullable=False),
-        "chlorides": pa.Column(float, pa.Check(lambda s: (s >= 0).all()), nullable=False),
-        "free sulfur dioxide": pa.Column(float, pa.Check(lambda s: (s >= 0).all()), nullable=False),
-        "total sulfur dioxide": pa.Column(float, pa.Check(lambda s: (s >= 0).all()), nullable=False),
-        "density": pa.Column(float, pa.Check(lambda s: ((s >= 0.9) & (s <= 1.1)).all()), nullable=False),
-        "pH": pa.Column(float, pa.Check(lambda s: ((s >= 0) & (s <= 14)).all()), nullable=False),
-        "sulphates": pa.Column(float, pa.Check(lambda s: (s >= 0).all()), nullable=False),
-        "alcohol": pa.Column(float, pa.Check(lambda s: ((s >= 5) & (s <= 20)).all()), nullable=False),
+        "fixed acidity": pa.Column(float, in_bounds(min_value=0, include_min=False), nullable=False),
+        "volatile acidity": pa.Column(float, in_bounds(min_value=0, include_min=False), nullable=False),
+        "citric acid": pa.Column(float, in_bounds(min_value=0), nullable=False),
+        "residual sugar": pa.Column(float, in_bounds(min_value=0), nullable=False),
+        "chlorides": pa.Column(float, in_bounds(min_value=0), nullable=False),
+        "free sulfur dioxide": pa.Column(float, in_bounds(min_value=0), nullable=False),
+        "total sulfur dioxide": pa.Column(float, in_bounds(min_value=0), nullable=False),
+        "density": pa.Column(float, in_bounds(min_value=0.9, max_value=1.1), nullable=False),
+        "pH": pa.Column(float, in_bounds(min_value=0, max_value=14), nullable=False),
+        "sulphates": pa.Column(float, in_bounds(min_value=0), nullable=False),
+        "alcohol": pa.Column(float, in_bounds(min_value=5, max_value=20), nullable=False),
         "quality": pa.Column(int, pa.Check.isin(range(0, 11)), nullable=False),
     },
     checks=[
@@ -30,24 +46,159 @@ schema = pa.DataFrameSchema(
     ]
 )
 
-def validate_dataset(input_path):
+def stratified_sample(df, sample_size, label="quality", random_state=42):
+    """
+    Draw a sample of about ``sample_size`` rows that keeps the class proportions of the label.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Data to sample.
+    sample_size : int
+        Number of rows to draw. The whole frame is returned when it is not larger.
+    label : str, optional
+        Column whose class proportions are preserved (default is "quality").
+    random_state : int, optional
+        Seed of the sample (default is 42).
+
+    Returns:
+    -------
+    pd.DataFrame
+        The sampled rows.
+    """
+    if sample_size >= len(df):
+        return df
+    frac = sample_size / len(df)
+    return df.groupby(label, group_keys=False).sample(frac=frac, random_state=random_state)
+
+
+def feature_label_pps(df, label="quality"):
+    """
+    Compute the predictive power score of every feature for the label with deepchecks.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Data with the feature and label columns.
+    label : str, optional
+        Label column (default is "quality").
+
+    Returns:
+    -------
+    dict
+        Mapping of feature name to its predictive power score.
+    """
+    # deepchecks is imported here so that modules only needing the schema do not pay for its import
+    from deepchecks.tabular import Dataset
+    from deepchecks.tabular.checks import FeatureLabelCorrelation
+
+    wine_ds = Dataset(df, label=label, cat_features=[])
+    result = FeatureLabelCorrelation().run(dataset=wine_ds)
+    return {feature: float(score) for feature, score in result.value.items()}
+
+
+def _pps_cache_path(cache_dir, digest, columns, sample_size):
+    digest = digest.copy()
+    digest.update(json.dumps([list(map(str, columns)), SCHEMA_VERSION, sample_size]).encode())
+    return os.path.join(cache_dir, f"pps_{digest.hexdigest()}.json")
+
+
+def check_feature_label_correlation(df, sample_size=None, margin=0.05, cache_dir=None, digest=None, load_full=None):
     """
-    Validates the input CSV file against the predefined schema and performs deep checks.
+    Check that no feature predicts the label with a score at or above ``PPS_THRESHOLD``.
+
+    With a sample size, the scores are computed on a stratified sample, and the full data is
+    scored only when the largest sampled score is within ``margin`` of the threshold. The margin
+    is a fixed heuristic, not derived from the sample size or the variance of the scores, so a
+    sampled pass carries no stated confidence: a sample whose score is further than ``margin``
+    below the threshold is trusted even if the full data would exceed it. Use a larger sample or
+    margin, or no sample, when that matters. With a cache directory, the scores are stored under
+    a key made of the dataset content hash, the column names, ``SCHEMA_VERSION`` and the sample
+    size, so re-validating unchanged data skips the computation.
+
+    Parameters:
+    ----------
+    df : pd.DataFrame
+        Data with the feature columns and the "quality" label, or a sample of it when
+        ``load_full`` is given.
+    sample_size : int, optional
+        Number of rows to score. Defaults to scoring every row.
+    margin : float, optional
+        Heuristic distance below the threshold within which a sampled score is escalated to
+        the full data (default is 0.05).
+    cache_dir : str, optional
+        Directory of cached scores. Defaults to no caching.
+    digest : hashlib sha256 object, optional
+        Content hash of the full data, fed with its row hashes in order. Computed from ``df``
+        when not given.
+    load_full : callable, optional
+        Returns the full data when ``df`` is already a sample of it.
+
+    Returns:
+    -------
+    dict
+        "pps" (score per feature), "sampled" (whether the scores come from a sample) and
+        "cached" (whether they were read from the cache).
+    """
+    cache_path = None
+    if cache_dir:
+        if digest is None:
+            digest = hashlib.sha256(row_hashes(df).tobytes())
+        cache_path = _pps_cache_path(cache_dir, digest, df.columns, sample_size)
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, "r") as f:
+            result = json.load(f)
+        result["cached"] = True
+        return result
+
+    presampled = load_full is not None
+    sampled = presampled or (sample_size is not None and sample_size < len(df))
+    pps = feature_label_pps(stratified_sample(df, sample_size) if sampled and not presampled else df)
+    if sampled and max(pps.values(), default=0.0) >= PPS_THRESHOLD - margin:
+        print("Sampled feature-label correlation is near the threshold; checking the full data.")
+        pps, sampled = feature_label_pps(load_full() if presampled else df), False
+
+    result = {"pps": pps, "sampled": sampled}
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path, "w") as f:
+            json.dump(result, f)
+    result["cached"] = False
+    return result
+
+
+def validate_dataset(input_path, pps_sample_size=None, pps_margin=0.05, cache_dir=None):
+    """
+    Validates the input data file against the predefined schema and performs deep checks.
     
     Parameters:
-        input_path (str): Path to the CSV file to validate.
+        input_path (str): Path to the data file (CSV or .npy) to validate.
+        pps_sample_size (int, optional): Number of rows, drawn stratified by quality, on which the
+            feature-label correlation is computed. Defaults to every row.
+        pps_margin (float, optional): Sampled scores within this distance of the threshold are
+            recomputed on the full data (default is 0.05). A fixed heuristic, see
+            ``check_feature_label_correlation``.
+        cache_dir (str, optional): Directory caching feature-label correlation results by
+            dataset content hash and schema version.
     """
     try:
-        df = pd.read_csv(input_path)
-        schema.validate(df)
+        df = load_frame(input_path, schema=schema)
+
+        # Evaluate all bounds checks in one vectorized pass and report every failure. Only when
+        # something fails is the full pandera schema run, to raise its detailed SchemaError;
+        # otherwise pandera only runs the structural checks and the checks check_bounds skips.
+        _, failures = check_bounds(df, schema)
+        if len(failures):
+            print("Bounds validation failed:")
+            print(failures.to_string(index=False))
+            schema.validate(df)
+            raise ValueError("Bounds validation failed but the pandera schema passed.")
+        residual_schema(schema, df).validate(df)
         print("Dataset validation passed successfully.")
 
         # Incorporate deep check for feature-label correlation
-        wine_ds = Dataset(df, label="quality", cat_features=[])
-        check_feat_lab_corr = FeatureLabelCorrelation().add_condition_feature_pps_less_than(0.9)
-        check_feat_lab_corr_result = check_feat_lab_corr.run(dataset=wine_ds)
-
-        if not check_feat_lab_corr_result.passed_conditions():
+        correlation = check_feature_label_correlation(df, pps_sample_size, pps_margin, cache_dir)
+        if max(correlation["pps"].values(), default=0.0) >= PPS_THRESHOLD:
             raise ValueError("Feature-Label correlation exceeds the maximum acceptable threshold.")
 
         print("Deepchecks validation passed successfully.")
@@ -60,4 +211,100 @@ def validate_dataset(input_path):
         raise FileNotFoundError("Dataset file not found.")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def _validate_byte_range(task):
+    """
+    Validate one byte range of a CSV file in a worker process of ``validate_in_chunks``.
+    """
+    input_path, start, end, columns, sample_size = task
+    chunk = read_csv_range(input_path, start, end, columns, schema)
+    hashes = row_hashes(chunk)
+    within = batch_duplicates(chunk, hashes)
+    _, report = check_bounds(chunk, schema, duplicates=within)
+    report = report[report["Check"] != DUPLICATE_CHECK]
+    sample = stratified_sample(chunk, sample_size)
+    return len(chunk), report, hashes, row_hashes(chunk, FINGERPRINT_KEY), within, sample
+
+
+def validate_in_chunks(input_path, chunksize, workers=None, pps_sample_size=None, pps_margin=0.05, cache_dir=None):
+    """
+    Validate a large CSV file in parallel, one byte range per task, with the checks of ``validate_dataset``.
+
+    The file is split on newline-aligned byte ranges that worker processes parse and check
+    independently. Their reports are merged into one, with failing row positions relative to
+    the whole file. Duplicate rows across chunks are found by merging every chunk's row hashes,
+    in file order, into one shared row-hash index. The feature-label correlation is computed on
+    a sample drawn from every chunk in proportion to its size, and on the full file only when
+    the sampled score is near the threshold. A schema with checks other than the ones
+    ``check_bounds`` evaluates is validated on the whole file with ``validate_dataset``.
+
+    Parameters:
+        input_path (str): Path to the CSV file to validate.
+        chunksize (int): Approximate number of bytes per chunk.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        pps_sample_size (int): Number of rows sampled for the feature-label correlation. Required,
+            so that the workers only send a sample of their chunk back to the parent process.
+        pps_margin (float, optional): Sampled scores within this distance of the threshold are
+            recomputed on the full data (default is 0.05). A fixed heuristic, see
+            ``check_feature_label_correlation``.
+        cache_dir (str, optional): Directory caching feature-label correlation results by
+            dataset content hash and schema version.
+    """
+    if not os.path.exists(input_path):
+        print("Dataset file not found. Please check the file path.")
+        raise FileNotFoundError("Dataset file not found.")
+    if pps_sample_size is None:
+        raise ValueError("Chunked validation needs a pps_sample_size; otherwise every chunk is sent back "
+                         "to the parent process and memory is no longer bounded by the chunk size.")
+    header, ranges = byte_ranges(input_path, chunksize)
+    columns = list(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+
+    # Column presence and dtypes are checked once on the header; the workers parse every chunk
+    # straight into the schema dtypes, so a value that does not fit fails there.
+    dtypes = schema_dtypes(schema)
+    header_frame = pd.DataFrame(columns=columns).astype({c: dtypes[c] for c in columns if c in dtypes})
+    structural_schema(schema).validate(header_frame)
+
+    # Checks other than the bounds checks may not hold chunk by chunk, e.g. a column mean
+    if count_checks(residual_schema(schema, header_frame)):
+        print("The schema has checks that cannot be evaluated chunk by chunk; validating the whole file.")
+        return validate_dataset(input_path, pps_sample_size, pps_margin, cache_dir)
+
+    data_size = ranges[-1][1] - ranges[0][0] if ranges else 0
+    tasks = [(input_path, start, end, columns, round(pps_sample_size * (end - start) / data_size))
+             for start, end in ranges]
+
+    index = RowHashIndex()
+    digest = hashlib.sha256()
+    reports, offsets, samples = [], [], []
+    duplicate_count, duplicate_cases, rows = 0, [], 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for n_rows, report, hashes, fingerprints, within, sample in pool.map(_validate_byte_range, tasks):
+            duplicates = index.merge_hashes(hashes, fingerprints, within)
+            duplicate_count += int(duplicates.sum())
+            duplicate_cases = (duplicate_cases + (rows + np.flatnonzero(duplicates)[:5]).tolist())[:5]
+            digest.update(hashes.tobytes())
+            reports.append(report)
+            offsets.append(rows)
+            samples.append(sample)
+            rows += n_rows
+
+    if duplicate_count:
+        reports.append(pd.DataFrame([["<DataFrame>", DUPLICATE_CHECK, duplicate_count, duplicate_cases]],
+                                    columns=REPORT_COLUMNS))
+        offsets.append(0)
+    failures = merge_reports(reports, offsets)
+    if len(failures):
+        print("Bounds validation failed:")
+        print(failures.to_string(index=False))
+        raise ValueError("Bounds validation failed.")
+    print("Dataset validation passed successfully.")
+
+    sample = pd.concat(samples, ignore_index=True) if samples else pd.DataFrame(columns=columns)
+    correlation = check_feature_label_correlation(
+        sample, pps_sample_size, pps_margin, cache_dir, digest=digest,
+        load_full=lambda: load_frame(input_path, schema=schema))
+    if max(correlation["pps"].values(), default=0.0) >= PPS_THRESHOLD:
+        raise ValueError("Feature-Label correlation exceeds the maximum acceptable threshold.")
+    print("Deepchecks validation passed successfully.")
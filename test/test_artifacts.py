@@ -0,0 +1,59 @@
+import pytest
+import os
+import numpy as np
+import pandas as pd
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from artifacts import artifact_path, infer_format, save_frame, load_frame
+
+@pytest.fixture
+def sample_data():
+    return pd.DataFrame({
+        'fixed acidity': [7.4, 7.8, 11.2],
+        'alcohol': [9.4, 9.8, 9.8],
+        'quality': [5, 5, 6]
+    })
+
+# Test that artifact paths carry the extension of their format
+def test_artifact_path():
+    assert artifact_path('data/processed', 'X_train', 'npy') == os.path.join('data/processed', 'X_train.npy')
+    assert infer_format('data/processed/X_train.index') == 'index'
+    with pytest.raises(ValueError):
+        artifact_path('data/processed', 'X_train', 'xlsx')
+    with pytest.raises(ValueError):
+        infer_format('data/processed/X_train.txt')
+    with pytest.raises(ValueError):
+        infer_format('data/processed/X_train.parquet')
+
+# Test that CSV artifacts round-trip unchanged
+def test_csv_round_trip(tmp_path, sample_data):
+    path = str(tmp_path / 'cleaned_data.csv')
+    save_frame(sample_data, path)
+    pd.testing.assert_frame_equal(load_frame(path), sample_data)
+
+# Test that .npy artifacts are memory-mapped and restore column dtypes
+def test_npy_round_trip(tmp_path, sample_data):
+    path = str(tmp_path / 'cleaned_data.npy')
+    save_frame(sample_data, path)
+    assert os.path.exists(path + '.schema.json')
+
+    df = load_frame(path)
+    pd.testing.assert_frame_equal(df, sample_data)
+
+    features = load_frame(path, usecols=['fixed acidity', 'alcohol'])
+    assert list(features.columns) == ['fixed acidity', 'alcohol']
+    assert isinstance(np.load(path, mmap_mode='r'), np.memmap)
+
+# Test that single-column artifacts can be loaded as a Series
+def test_load_frame_squeeze(tmp_path, sample_data):
+    path = str(tmp_path / 'y_train.npy')
+    save_frame(sample_data['quality'], path)
+    y = load_frame(path, squeeze=True)
+    assert isinstance(y, pd.Series)
+    assert y.name == 'quality'
+    assert y.tolist() == [5, 5, 6]
+
+# Test that non-numeric data is rejected by the .npy format
+def test_npy_rejects_non_numeric(tmp_path):
+    with pytest.raises(ValueError):
+        save_frame(pd.DataFrame({'Column2': ['A', 'B']}), str(tmp_path / 'data.npy'))
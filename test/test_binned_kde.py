@@ -0,0 +1,50 @@
+import pytest
+import os
+import numpy as np
+import pandas as pd
+import sys
+from scipy.stats import gaussian_kde
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from binned_kde import scott_bandwidth, linear_bin, binned_kde
+
+@pytest.fixture
+def sample_data():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'a': rng.normal(size=500), 'b': rng.lognormal(size=500), 'c': rng.integers(0, 5, size=500)})
+
+# Test that the bandwidth matches the Scott factor of scipy's gaussian_kde, used by seaborn
+def test_scott_bandwidth_matches_scipy(sample_data):
+    bandwidth = scott_bandwidth(sample_data.to_numpy(dtype=float))
+    for i, column in enumerate(sample_data.columns):
+        assert bandwidth[i] == pytest.approx(np.sqrt(gaussian_kde(sample_data[column]).covariance[0, 0]))
+
+# Test that linear binning keeps the mass and the mean of every column
+def test_linear_bin_keeps_mass_and_mean(sample_data):
+    values = sample_data.to_numpy(dtype=float)
+    values[0, 1] = np.nan
+    low, delta = values.min(axis=0) - 1, np.full(3, 0.1)
+    low[1] = np.nanmin(values[:, 1]) - 1
+    weights = linear_bin(values, low, delta, 200)
+    assert weights.sum(axis=1) == pytest.approx([500, 499, 500])
+    grid = low[:, None] + delta[:, None] * np.arange(200)
+    assert (weights * grid).sum(axis=1)[0] / 500 == pytest.approx(values[:, 0].mean())
+
+# Test that the binned density matches the exact Gaussian KDE on seaborn's support
+def test_binned_kde_matches_exact_kde(sample_data):
+    grid, density = binned_kde(sample_data)
+    assert grid.shape == density.shape == (3, 1024)
+    for i, column in enumerate(sample_data.columns):
+        kde = gaussian_kde(sample_data[column])
+        bandwidth = np.sqrt(kde.covariance[0, 0])
+        assert grid[i, 0] == pytest.approx(sample_data[column].min() - 3 * bandwidth)
+        assert grid[i, -1] == pytest.approx(sample_data[column].max() + 3 * bandwidth)
+        exact = kde(grid[i])
+        assert np.abs(density[i] - exact).max() < 1e-3 * exact.max()
+
+# Test that constant columns get no density and missing values are ignored
+def test_binned_kde_constant_and_missing():
+    data = pd.DataFrame({'constant': [2.0, 2.0, 2.0, 2.0], 'missing': [1.0, np.nan, 2.0, 4.0]})
+    grid, density = binned_kde(data, grid_size=256)
+    assert np.isnan(density[0]).all()
+    _, expected = binned_kde(data[['missing']].dropna(), grid_size=256)
+    assert density[1] == pytest.approx(expected[0])
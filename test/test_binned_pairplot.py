@@ -0,0 +1,58 @@
+import pytest
+import os
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from binned_pairplot import bin_edges, PairHistogram, regression_lines, reservoir_sample, plot_binned_pairplot
+from profiler import DatasetProfile
+
+@pytest.fixture
+def sample_data():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=500)
+    return pd.DataFrame({'a': x, 'b': 2 * x + rng.normal(size=500), 'c': rng.uniform(size=500)})
+
+# Test that the pair histograms match numpy's histograms and skip missing values
+def test_pair_histogram_matches_numpy(sample_data):
+    histogram = PairHistogram.from_frame(sample_data, bins=10)
+    expected, _, _ = np.histogram2d(sample_data['a'], sample_data['c'], bins=[histogram.edges[0], histogram.edges[2]])
+    assert (histogram.joint[0, 2] == expected).all()
+    assert (histogram.joint[2, 0] == expected.T).all()
+    assert (histogram.counts[1] == np.histogram(sample_data['b'], bins=histogram.edges[1])[0]).all()
+
+    with_missing = sample_data.copy()
+    with_missing.loc[0, 'b'] = np.nan
+    histogram = PairHistogram.from_frame(with_missing, bins=10)
+    assert histogram.counts[1].sum() == 499 and histogram.joint[0, 1].sum() == 499 and histogram.joint[0, 2].sum() == 500
+
+# Test that chunks binned on shared edges add up to the histograms of the whole frame
+def test_pair_histogram_chunks(sample_data):
+    edges = bin_edges(sample_data.min().to_numpy(), sample_data.max().to_numpy(), bins=8)
+    chunked = PairHistogram(sample_data.columns, edges)
+    chunked.update(sample_data.iloc[:200]).update(sample_data.iloc[200:])
+    whole = PairHistogram(sample_data.columns, edges).update(sample_data)
+    assert (chunked.joint == whole.joint).all() and (chunked.counts == whole.counts).all()
+
+# Test that closed-form regression lines match a least-squares fit
+def test_regression_lines(sample_data):
+    slope, intercept = regression_lines(DatasetProfile.from_frame(sample_data))
+    fitted_slope, fitted_intercept = np.polyfit(sample_data['a'], sample_data['b'], 1)
+    assert slope[0, 1] == pytest.approx(fitted_slope)
+    assert intercept[0, 1] == pytest.approx(fitted_intercept)
+
+# Test that the reservoir sample has the requested size and keeps the row order
+def test_reservoir_sample(sample_data):
+    sample = reservoir_sample(sample_data, 50)
+    assert len(sample) == 50
+    assert sample.index.is_monotonic_increasing
+    assert reservoir_sample(sample_data, 1000) is sample_data
+
+# Test that the pairplot has one panel per pair of features
+def test_plot_binned_pairplot(sample_data):
+    fig = plot_binned_pairplot(sample_data, bins=10, sample_size=20)
+    try:
+        assert len(fig.axes) == 9
+    finally:
+        plt.close(fig)
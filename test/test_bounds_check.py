@@ -0,0 +1,76 @@
+import pytest
+import os
+import numpy as np
+import pandas as pd
+import pandera as pa
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from bounds_check import in_bounds, check_bounds, structural_schema, residual_schema, count_checks, merge_reports
+
+test_schema = pa.DataFrameSchema(
+    {
+        "acidity": pa.Column(float, in_bounds(min_value=0, include_min=False), nullable=False),
+        "pH": pa.Column(float, in_bounds(min_value=0, max_value=14), nullable=False),
+        "quality": pa.Column(int, pa.Check.isin(range(0, 11)), nullable=False),
+    }
+)
+
+valid_df = pd.DataFrame({"acidity": [7.4, 7.8, 0.1], "pH": [3.5, 14.0, 0.0], "quality": [5, 6, 10]})
+
+# Test that valid data produces an empty report and no flagged rows
+def test_check_bounds_valid():
+    mask, report = check_bounds(valid_df, test_schema)
+    assert (mask == 0).all()
+    assert report.empty
+    test_schema.validate(valid_df)
+
+# Test that every failing check is reported and flagged in the row bitmask
+def test_check_bounds_reports_all_failures():
+    df = pd.DataFrame({"acidity": [0.0, 7.8, 7.8, 7.8], "pH": [3.5, 15.0, 3.2, 3.2], "quality": [5, 6, 11, 11]})
+    mask, report = check_bounds(df, test_schema)
+
+    assert report["Column"].tolist() == ["acidity", "pH", "quality", "<DataFrame>"]
+    assert report["Failures"].tolist() == [1, 1, 2, 1]
+    assert mask.tolist() == [0b0001, 0b0010, 0b0100, 0b1100]
+
+# Test that the in_bounds check also works as a regular pandera check
+def test_in_bounds_is_a_pandera_check():
+    with pytest.raises(pa.errors.SchemaError, match="Column 'acidity' failed series or dataframe validator"):
+        test_schema.validate(pd.DataFrame({"acidity": [-1.0], "pH": [3.5], "quality": [5]}))
+
+# Test that the structural schema keeps dtype checks but drops value checks
+def test_structural_schema():
+    structural = structural_schema(test_schema)
+    structural.validate(pd.DataFrame({"acidity": [-1.0], "pH": [30.0], "quality": [50]}))
+    with pytest.raises(pa.errors.SchemaError):
+        structural.validate(pd.DataFrame({"acidity": ["a"], "pH": [3.5], "quality": [5]}))
+    assert test_schema.columns["acidity"].checks
+
+# Test that the residual schema keeps the checks check_bounds does not evaluate
+def test_residual_schema_keeps_other_checks():
+    custom = test_schema.update_columns({"pH": {"checks": [in_bounds(min_value=0, max_value=14),
+                                                           pa.Check(lambda s: s < 10, name="below_ten")]}})
+    custom.checks = [pa.Check(lambda df: not df.duplicated().any(), error="Duplicate rows found."),
+                     pa.Check(lambda df: len(df) > 1, error="Too few rows.")]
+    residual = residual_schema(custom, valid_df)
+    assert [check.name for check in residual.columns["pH"].checks] == ["below_ten"]
+    assert [check.error for check in residual.checks] == ["Too few rows."]
+    assert count_checks(residual) == 2
+    assert count_checks(residual_schema(test_schema, valid_df)) == 0
+
+    # check_bounds does not see the custom check, the residual schema does
+    assert check_bounds(valid_df, custom)[1].empty
+    with pytest.raises(pa.errors.SchemaError):
+        residual.validate(valid_df)
+
+# Test that reports of consecutive chunks merge into the report of the whole frame
+def test_merge_reports_matches_whole_frame():
+    df = pd.DataFrame({"acidity": [0.0, 7.8, np.nan, 7.8, -1.0], "pH": [3.5, 15.0, 3.2, 3.2, 3.0],
+                       "quality": [5, 6, 11, 11, 5]})
+    _, whole = check_bounds(df, test_schema)
+    reports = [check_bounds(df.iloc[:2], test_schema)[1], check_bounds(df.iloc[2:], test_schema)[1]]
+    merged = merge_reports(reports, [0, 2])
+
+    key = ["Column", "Check"]
+    pd.testing.assert_frame_equal(merged.sort_values(key).reset_index(drop=True),
+                                  whole.sort_values(key).reset_index(drop=True))
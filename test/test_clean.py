@@ -3,7 +3,7 @@ import os
 import pandas as pd
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
-from clean import load_data, save_overview, handle_missing_values, handle_duplicates, save_cleaned_data
+from clean import load_data, save_overview, handle_missing_values, handle_duplicates, save_cleaned_data, clean_in_chunks
 
 @pytest.fixture
 def sample_data():
@@ -94,6 +94,19 @@ def test_handle_duplicates(temp_directory, sample_data):
     # Check if duplicates are removed from the cleaned data
     assert cleaned_df.shape[0] == sample_data.shape[0] - 1
 
+# Test for deduplicating a new batch against a persistent row-hash index
+def test_handle_duplicates_with_index(temp_directory, sample_data):
+    index_path = os.path.join(temp_directory, 'row_index.npz')
+    handle_duplicates(sample_data, temp_directory, index_path)
+    assert os.path.exists(index_path)
+
+    new_batch = pd.concat([sample_data.iloc[1:3], pd.DataFrame({'Column1': [9], 'Column2': ['F'], 'Column3': [9]})],
+                          ignore_index=True)
+    cleaned_df = handle_duplicates(new_batch, temp_directory, index_path)
+
+    assert len(pd.read_csv(os.path.join(temp_directory, 'duplicates.csv'))) == 2
+    assert cleaned_df['Column2'].tolist() == ['F']
+
 # Test for saving cleaned data
 def test_save_cleaned_data(temp_directory, sample_data):
     output_path = os.path.join(temp_directory, 'cleaned_data.csv')
@@ -105,4 +118,32 @@ def test_save_cleaned_data(temp_directory, sample_data):
     # Check if the content matches the input data
     saved_df = pd.read_csv(output_path)
     assert saved_df.shape == sample_data.shape
-    assert list(saved_df.columns) == list(sample_data.columns)
\ No newline at end of file
+    assert list(saved_df.columns) == list(sample_data.columns)
+
+# Test that chunked cleaning matches the in-memory functions, including duplicates across chunks
+def test_clean_in_chunks(temp_directory, sample_data):
+    sample_data = pd.concat([sample_data, sample_data.iloc[[0, 3]], sample_data.iloc[[3]]], ignore_index=True)
+    input_path = os.path.join(temp_directory, 'raw_data.csv')
+    sample_data.to_csv(input_path, index=False, sep=';')
+    chunk_log_path = os.path.join(temp_directory, 'chunked')
+    output_path = os.path.join(chunk_log_path, 'cleaned_data.csv')
+
+    profile = clean_in_chunks(input_path, output_path, chunk_log_path, chunksize=2)
+
+    expected = handle_duplicates(load_data(input_path), temp_directory)
+    cleaned = pd.read_csv(output_path)
+    assert profile.rows == len(sample_data)
+    assert len(cleaned) == len(expected) == 5
+    pd.testing.assert_frame_equal(cleaned, expected.reset_index(drop=True))
+    assert len(pd.read_csv(os.path.join(chunk_log_path, 'duplicates.csv'))) == 3
+
+    save_overview(load_data(input_path), temp_directory)
+    handle_missing_values(load_data(input_path), temp_directory)
+    for report in ['dataset_overview.csv', 'missing_values.csv']:
+        pd.testing.assert_frame_equal(pd.read_csv(os.path.join(chunk_log_path, report)),
+                                      pd.read_csv(os.path.join(temp_directory, report)))
+
+# Test that chunked cleaning only writes CSV output
+def test_clean_in_chunks_requires_csv(temp_directory):
+    with pytest.raises(ValueError):
+        clean_in_chunks('raw_data.csv', os.path.join(temp_directory, 'cleaned_data.npy'), temp_directory, 2)
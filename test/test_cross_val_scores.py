@@ -50,4 +50,93 @@ def test_cross_val_scores_empty_datasets_error():
 # Test for correct error handling for wrong data types X_train or y_train.
 def test_cross_val_scores_wrong_type_datasets_error():
     with pytest.raises(TypeError):
-        get_cross_val_scores(test_model, test_X_train_numeric, test_y_train_bool)
\ No newline at end of file
+        get_cross_val_scores(test_model, test_X_train_numeric, test_y_train_bool)
+
+# Test that evaluating every (model, fold) pair on a worker pool gives the scores of sklearn's cross_validate.
+def test_cross_validate_models_matches_cross_validate():
+    from sklearn.model_selection import cross_validate
+    from sklearn.tree import DecisionTreeClassifier
+    from src.cross_val_scores import cross_validate_models, CVResult
+    models = {"dummy": DummyClassifier(), "tree": DecisionTreeClassifier(random_state=0)}
+    results = cross_validate_models(models, test_X_train, test_y_train, n_jobs=2, verbose=False)
+    assert list(results) == ["dummy", "tree"]
+    for model_key, model in models.items():
+        expected = cross_validate(model, test_X_train, test_y_train, cv=5, return_train_score=True)
+        assert isinstance(results[model_key], CVResult)
+        np.testing.assert_array_equal(results[model_key].test_score, expected["test_score"])
+        np.testing.assert_array_equal(results[model_key].train_score, expected["train_score"])
+
+
+# Test that peak memory is only measured, with a second traced fit, when asked for.
+def test_cross_validate_models_track_memory(monkeypatch):
+    import fold_cache
+    from src.cross_val_scores import cross_validate_models, results_table
+    traced = []
+    peak_memory = fold_cache._peak_memory
+    monkeypatch.setattr(fold_cache, "_peak_memory", lambda *args: traced.append(1) or peak_memory(*args))
+    models = {"dummy": DummyClassifier()}
+    results = cross_validate_models(models, test_X_train, test_y_train, verbose=False)
+    assert results["dummy"].peak_memory is None
+    assert "peak_memory_mb" not in results_table(results)
+    assert traced == []
+
+    results = cross_validate_models(models, test_X_train, test_y_train, verbose=False, track_memory=True)
+    assert len(traced) == 5
+    assert results_table(results).loc["dummy", "peak_memory_mb"] >= 0
+
+# Test that the numeric table, the formatted table and the selection come from the per-fold results.
+def test_results_tables_and_selection():
+    from src.cross_val_scores import CVResult, results_table, format_results, select_model
+    results = {
+        "slow": CVResult([1, 1], [2, 2], [0.9, 0.8], [1, 1], [1024 ** 2, 2 * 1024 ** 2], [10, 10]),
+        # "0.10" sorts after "0.85" as a string, but not as a number
+        "fast": CVResult([1, 1], [0.1, 0.1], [0.1, 0.1], [1, 1], [0, 0], [10, 10]),
+        "good": CVResult([1, 1], [1, 1], [0.85, 0.85], [1, 1], [0, 0], [10, 10]),
+    }
+    table = results_table(results)
+    assert table.loc["slow", "test_score_mean"] == pytest.approx(0.85)
+    assert table.loc["slow", "peak_memory_mb"] == 2
+    assert table.loc["fast", "predict_rows_per_s"] == pytest.approx(100)
+    assert format_results(results).loc["slow", "test_score"] == "0.850 (+/- 0.071)"
+    # Ties go to the first model, as idxmax does
+    assert select_model(results) == "slow"
+    assert select_model(results, min_throughput=10) == "good"
+    with pytest.raises(ValueError):
+        select_model(results, min_throughput=1000)
+
+
+# Test that cross_validate_models checks its data like get_cross_val_scores.
+def test_cross_validate_models_errors():
+    from src.cross_val_scores import cross_validate_models
+    with pytest.raises(ValueError):
+        cross_validate_models({"dummy": test_model}, test_X_train_empty, test_y_train)
+    with pytest.raises(TypeError):
+        cross_validate_models({"dummy": test_model}, test_X_train_numeric, test_y_train_bool)
+
+
+# Test that racing drops a dominated model early and keeps the full folds of the others.
+def test_race_models_eliminates_dominated_models():
+    from sklearn.linear_model import LogisticRegression
+    from src.cross_val_scores import race_models, cross_validate_models
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"A": rng.normal(size=200), "B": rng.normal(size=200)})
+    y = pd.Series(np.where(X["A"] + 0.3 * rng.normal(size=200) > 0, "class_1", "class_0"))
+    models = {"dummy": DummyClassifier(), "log reg": LogisticRegression(), "log reg C": LogisticRegression(C=0.5)}
+    results, finalists = race_models(models, X, y, cv=5, min_folds=2, verbose=False)
+    assert finalists == ["log reg", "log reg C"]
+    assert len(results["dummy"].test_score) == 2
+    expected = cross_validate_models({"log reg": models["log reg"]}, X, y, verbose=False)["log reg"]
+    np.testing.assert_array_equal(results["log reg"].test_score, expected.test_score)
+
+
+# Test that the race stops before exceeding its fit budget.
+def test_race_models_budget():
+    from src.cross_val_scores import race_models
+    models = {"a": DummyClassifier(), "b": DummyClassifier(strategy="uniform", random_state=0)}
+    results, finalists = race_models(models, test_X_train, test_y_train, max_fits=5, verbose=False)
+    assert sum(len(result.test_score) for result in results.values()) <= 5
+    with pytest.raises(ValueError):
+        race_models(models, test_X_train, test_y_train, confidence=1.5)
+    # A budget below the rounds run before the first elimination would stop the race with no results
+    with pytest.raises(ValueError, match="max_fits should be at least 4"):
+        race_models(models, test_X_train, test_y_train, max_fits=3, verbose=False)
@@ -1,6 +1,10 @@
 import pytest
 import os
+import json
+import hashlib
+import threading
 import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 from download_file import download_file
@@ -24,4 +28,114 @@ def test_download_file_invalid_url(tmp_path):
     output_path = tmp_path / "zip_2MB.zip"
 
     with pytest.raises(ValueError, match="Failed to fetch data from URL"):
-        download_file(url, str(output_path))
\ No newline at end of file
+        download_file(url, str(output_path))
+
+PAYLOAD = os.urandom(100_000)
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for a file server, optionally supporting byte ranges."""
+    accept_ranges = True
+    requested_ranges = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send_headers(self, status, length, content_range=None):
+        self.send_response(status)
+        self.send_header("Content-Length", str(length))
+        self.send_header("ETag", '"payload-v1"')
+        if self.accept_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        if content_range:
+            self.send_header("Content-Range", content_range)
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._send_headers(200, len(PAYLOAD))
+
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        if self.accept_ranges and range_header:
+            start, end = (int(x) for x in range_header.split("=")[1].split("-"))
+            type(self).requested_ranges.append(start)
+            body = PAYLOAD[start:end + 1]
+            self._send_headers(206, len(body), f"bytes {start}-{end}/{len(PAYLOAD)}")
+        else:
+            body = PAYLOAD
+            self._send_headers(200, len(body))
+        self.wfile.write(body)
+
+
+def _serve(accept_ranges):
+    handler = type("Handler", (_RangeHandler,), {"accept_ranges": accept_ranges, "requested_ranges": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, handler, f"http://127.0.0.1:{server.server_port}/payload.zip"
+
+
+@pytest.fixture
+def range_server():
+    server, handler, url = _serve(accept_ranges=True)
+    yield handler, url
+    server.shutdown()
+
+
+@pytest.fixture
+def plain_server():
+    server, handler, url = _serve(accept_ranges=False)
+    yield handler, url
+    server.shutdown()
+
+
+def test_download_file_parallel_ranges(tmp_path, range_server):
+    handler, url = range_server
+    output_path = tmp_path / "payload.zip"
+
+    download_file(url, str(output_path), num_workers=4, part_size=16_384)
+
+    assert output_path.read_bytes() == PAYLOAD
+    assert len(handler.requested_ranges) == 7
+    assert not (tmp_path / "payload.zip.state").exists()
+    assert not (tmp_path / "payload.zip.part").exists()
+
+
+def test_download_file_falls_back_without_range_support(tmp_path, plain_server):
+    handler, url = plain_server
+    output_path = tmp_path / "payload.zip"
+
+    download_file(url, str(output_path), num_workers=4, part_size=16_384)
+
+    assert output_path.read_bytes() == PAYLOAD
+    assert handler.requested_ranges == []
+
+
+def test_download_file_resumes_from_state(tmp_path, range_server):
+    handler, url = range_server
+    output_path = tmp_path / "payload.zip"
+    part_size = 16_384
+
+    # Simulate an interrupted transfer where the first three parts completed
+    partial = bytearray(len(PAYLOAD))
+    partial[:3 * part_size] = PAYLOAD[:3 * part_size]
+    (tmp_path / "payload.zip.part").write_bytes(bytes(partial))
+    state = {"url": url, "size": len(PAYLOAD), "validator": '"payload-v1"', "part_size": part_size, "done": [0, 1, 2]}
+    (tmp_path / "payload.zip.state").write_text(json.dumps(state))
+
+    download_file(url, str(output_path), num_workers=2, part_size=part_size)
+
+    assert output_path.read_bytes() == PAYLOAD
+    assert sorted(handler.requested_ranges) == [i * part_size for i in range(3, 7)]
+
+
+def test_download_file_checksum(tmp_path, range_server):
+    _, url = range_server
+    output_path = tmp_path / "payload.zip"
+
+    download_file(url, str(output_path), part_size=16_384, checksum=hashlib.sha256(PAYLOAD).hexdigest())
+    assert output_path.read_bytes() == PAYLOAD
+
+    bad_output_path = tmp_path / "bad.zip"
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        download_file(url, str(bad_output_path), part_size=16_384, checksum="sha256:" + "0" * 64)
+    assert not bad_output_path.exists()
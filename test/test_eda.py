@@ -1,11 +1,12 @@
 import pytest
 import os
 import pandas as pd
+import matplotlib.pyplot as plt
 import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.eda_charts import run_eda_charts
+from src.eda_charts import run_eda_charts, render_charts, CHARTS
 
 # Sample file paths for testing
 @pytest.fixture
@@ -84,6 +85,18 @@ def test_no_exceptions(setup_directories):
     except Exception as e:
         assert False, f"An exception occurred during EDA charts generation: {e}"
 
+# Test that charts rendered in worker processes or in-process are saved, timed and closed
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_charts(tmp_path, workers):
+    X_train = pd.DataFrame({'Feature1': [1.0, 2.0, 3.0, 4.0, 5.0], 'Feature2': [5.0, 4.0, 3.0, 2.5, 1.0]})
+    y_train = pd.DataFrame({'Target': [1, 0, 1, 0, 1]})
+    timings = render_charts(X_train, y_train, X_train.corr(), str(tmp_path), workers=workers)
+
+    assert list(timings) == [name for name, _ in CHARTS]
+    assert all(seconds > 0 for seconds in timings.values())
+    assert sorted(os.listdir(tmp_path)) == sorted(f"{name}.png" for name, _ in CHARTS)
+    assert plt.get_fignums() == []
+
 # Cleanup after all tests
 def test_cleanup_after_tests(setup_directories):
     test_figures_path, test_tables_path, test_train_test_path = setup_directories
@@ -1,9 +1,10 @@
 import pytest
 import os
 import zipfile
+import pandas as pd
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
-from extract_specific_file import extract_specific_file
+from extract_specific_file import extract_specific_file, extract_files, open_member
 
 @pytest.fixture
 def create_zip_file():
@@ -39,4 +40,34 @@ def test_extract_file_success(create_zip_file, cleanup_output):
 # Test for file not found in the zip archive
 def test_file_not_found_in_zip(create_zip_file, cleanup_output):
     with pytest.raises(ValueError):
-        extract_specific_file(create_zip_file, 'non_existent.txt', 'output/non_existent.txt')
\ No newline at end of file
+        extract_specific_file(create_zip_file, 'non_existent.txt', 'output/non_existent.txt')
+
+# Test for extracting several files in one pass
+def test_extract_files_multiple_members(create_zip_file, cleanup_output):
+    extract_files(create_zip_file, {'file1.txt': 'output/a/file1.txt', 'file2.txt': 'output/b/file2.txt'})
+
+    with open('output/a/file1.txt', 'r') as f:
+        assert f.read() == 'This is the content of file1.txt.'
+    with open('output/b/file2.txt', 'r') as f:
+        assert f.read() == 'This is the content of file2.txt.'
+
+# Test that a missing member fails before anything is written
+def test_extract_files_missing_member(create_zip_file, cleanup_output):
+    with pytest.raises(ValueError):
+        extract_files(create_zip_file, {'file1.txt': 'output/c/file1.txt', 'missing.txt': 'output/c/missing.txt'})
+    assert not os.path.exists('output/c/file1.txt')
+
+# Test for streaming a member straight into a CSV parser
+def test_open_member_to_csv_parser(tmp_path):
+    zip_path = tmp_path / 'wine.zip'
+    with zipfile.ZipFile(zip_path, 'w') as zipf:
+        zipf.writestr('winequality-red.csv', 'a;b\n1;2\n3;4\n')
+
+    with open_member(str(zip_path), 'winequality-red.csv') as stream:
+        df = pd.read_csv(stream, sep=';')
+
+    assert list(df.columns) == ['a', 'b']
+    assert df.shape == (2, 2)
+    with pytest.raises(ValueError, match="not found"):
+        with open_member(str(zip_path), 'missing.csv'):
+            pass
@@ -0,0 +1,101 @@
+import os
+import sys
+import tracemalloc
+import numpy as np
+import pandas as pd
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from sklearn.compose import make_column_transformer
+from sklearn.model_selection import StratifiedKFold
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler, MinMaxScaler
+from sklearn.svm import SVC
+from sklearn.dummy import DummyClassifier
+from fold_cache import FoldTransformCache, data_fingerprint, fit_and_score, fold_transforms, split_pipeline
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"a": rng.normal(size=60), "b": rng.normal(size=60)})
+    y = pd.Series([3, 4, 5] * 20, name="quality")
+    folds = list(StratifiedKFold(5).split(X, y))
+    return X, y, folds
+
+
+def test_split_pipeline():
+    """
+    The preprocessing steps are split from the final estimator, and single estimators have none.
+    """
+    preprocessor, estimator = split_pipeline(make_pipeline(StandardScaler(), SVC()))
+    assert [name for name, _ in preprocessor.steps] == ["standardscaler"]
+    assert isinstance(estimator, SVC)
+    assert split_pipeline(SVC())[0] is None
+
+
+def test_data_fingerprint_changes_with_content(data):
+    X, y, _ = data
+    assert data_fingerprint(X, y) == data_fingerprint(X.copy(), y.copy())
+    changed = X.copy()
+    changed.iloc[0, 0] += 1
+    assert data_fingerprint(changed, y) != data_fingerprint(X, y)
+    assert data_fingerprint(X, y.rename("label")) != data_fingerprint(X, y)
+
+
+def test_transforms_are_reused_across_models(data):
+    """
+    Pipelines sharing an equal preprocessor fit it once per fold, with the transforms of a fresh fit.
+    """
+    X, y, folds = data
+    cache = FoldTransformCache()
+    first = make_pipeline(make_column_transformer((StandardScaler(), ["a", "b"])), SVC())
+    second = make_pipeline(make_column_transformer((StandardScaler(), ["a", "b"])), SVC(C=10))
+    _, transformed = fold_transforms(first, X, y, folds, cache)
+    _, reused = fold_transforms(second, X, y, folds, cache)
+    assert (cache.misses, cache.hits) == (5, 5)
+    train, test = folds[0]
+    expected = StandardScaler().fit(X.iloc[train])
+    np.testing.assert_array_equal(transformed[0][0], expected.transform(X.iloc[train]))
+    np.testing.assert_array_equal(reused[0][2], expected.transform(X.iloc[test]))
+
+    # Other parameters or other data are new entries
+    fold_transforms(make_pipeline(MinMaxScaler(), SVC()), X, y, folds, cache)
+    fold_transforms(first, X * 2, y, folds, cache)
+    assert (cache.misses, cache.hits) == (15, 5)
+
+
+def test_eviction_keeps_memory_bounded(data):
+    X, y, folds = data
+    fold_bytes = X.shape[0] * X.shape[1] * 8
+    cache = FoldTransformCache(max_bytes=2 * fold_bytes)
+    fold_transforms(make_pipeline(StandardScaler(), SVC()), X, y, folds, cache)
+    assert len(cache) == 2
+    assert cache.evictions == 3
+    assert cache.nbytes <= cache.max_bytes
+
+    # The most recently used folds are the ones kept
+    fold_transforms(make_pipeline(StandardScaler(), SVC()), X, y, folds[3:], cache)
+    assert cache.hits == 2
+
+
+class TracingProbe(DummyClassifier):
+    """
+    Dummy classifier recording whether tracemalloc was on during each fit.
+    """
+
+    def fit(self, X, y):
+        type(self).traced.append(tracemalloc.is_tracing())
+        return super().fit(X, y)
+
+
+def test_memory_is_measured_outside_the_timed_fit(data):
+    """
+    The timed fit runs untraced; peak memory comes from a second, traced fit of a clone.
+    """
+    X, y, folds = data
+    train, test = folds[0]
+    TracingProbe.traced = []
+    scores = fit_and_score(TracingProbe(), X.iloc[train], y.iloc[train], X.iloc[test], y.iloc[test], track_memory=True)
+    assert TracingProbe.traced == [False, True]
+    assert scores["peak_memory"] > 0
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,121 @@
+import os
+import sys
+import json
+import numpy as np
+import pandas as pd
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from scipy.stats import loguniform
+from sklearn.model_selection import RandomizedSearchCV
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+from fold_cache import FoldTransformCache
+from hyperparameter_search import (DEFAULT_SEARCH_SPACE, SearchSpace, SearchBudget, FoldEvaluator, SEARCH_ENGINES,
+                                   run_search, _Plateau)
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(240, 3)), columns=["a", "b", "c"])
+    y = pd.Series(np.where(X["a"] + X["b"] ** 2 + rng.normal(scale=0.5, size=240) > 1, "high", "low"), name="label")
+    model = Pipeline([("scaler", StandardScaler()), ("svc", SVC())])
+    return model, X, y
+
+
+def test_search_space_config(tmp_path):
+    """
+    Ranges become the scipy distributions of RandomizedSearchCV, and spaces load from JSON.
+    """
+    space = SearchSpace(DEFAULT_SEARCH_SPACE)
+    distributions = space.distributions()
+    assert distributions["svc__C"].kwds == loguniform(1e-3, 1e3).kwds
+    assert distributions["svc__class_weight"] == [None, "balanced"]
+    assert space.kind("svc__gamma") == "loguniform"
+    assert space.bounds("svc__C") == (-3, 3)
+    assert space.decode("svc__C", space.encode("svc__C", 10.0)) == pytest.approx(10.0)
+
+    path = tmp_path / "space.json"
+    path.write_text(json.dumps({"svc__C": {"int": [1, 5]}, "svc__class_weight": [None, "balanced"]}))
+    loaded = SearchSpace.from_json(str(path))
+    assert loaded.config["svc__class_weight"] == [None, "balanced"]
+    assert set(loaded.distributions()["svc__C"].rvs(size=50, random_state=0)) <= {1, 2, 3, 4, 5}
+
+    with pytest.raises(ValueError):
+        SearchSpace({"svc__C": {"normal": [0, 1]}})
+    with pytest.raises(ValueError):
+        SearchSpace({"svc__C": {"uniform": [2, 1]}})
+    with pytest.raises(ValueError):
+        SearchSpace({"svc__C": []})
+
+
+def test_random_engine_matches_randomized_search(data):
+    model, X, y = data
+    space = {"svc__C": {"loguniform": [1e-2, 1e2]}, "svc__class_weight": [None, "balanced"]}
+    _, best_params, best_score, trials = run_search(model, space, X, y, n_iter=6, cv=3, random_state=0,
+                                                    cache=FoldTransformCache(), verbose=False)
+    search = RandomizedSearchCV(model, SearchSpace(space).distributions(), n_iter=6, cv=3, random_state=0).fit(X, y)
+    assert best_params == search.best_params_
+    assert best_score == search.best_score_
+    np.testing.assert_array_equal([score for _, score, _ in trials], search.cv_results_["mean_test_score"])
+
+
+@pytest.mark.parametrize("engine", ["halving", "tpe"])
+def test_engines_search_the_space(data, engine):
+    model, X, y = data
+    best_estimator, best_params, best_score, trials = run_search(
+        model, DEFAULT_SEARCH_SPACE, X, y, engine=engine, n_iter=12, cv=3, random_state=0,
+        cache=FoldTransformCache(), verbose=False
+    )
+    assert 1e-3 <= best_params["svc__C"] <= 1e3
+    assert best_params["svc__decision_function_shape"] in ["ovr", "ovo"]
+    assert best_estimator.get_params()["svc__C"] == best_params["svc__C"]
+    # The best score is one of the scores on full folds
+    assert best_score in [score for _, score, n_samples in trials if n_samples is None]
+
+
+def test_halving_fits_few_candidates_on_full_folds(data):
+    model, X, y = data
+    _, _, _, trials = run_search(model, DEFAULT_SEARCH_SPACE, X, y, engine="halving", n_iter=27, cv=3, random_state=0,
+                                 cache=FoldTransformCache(), verbose=False, factor=3)
+    rungs = [n_samples for _, _, n_samples in trials]
+    assert rungs.count(rungs[0]) == 27
+    assert 0 < rungs.count(None) < 27
+    # Every rung uses more rows than the previous one
+    sizes = [n for n in dict.fromkeys(rungs) if n is not None]
+    assert sizes == sorted(sizes)
+
+
+def test_budget_and_patience(data):
+    model, X, y = data
+    cache = FoldTransformCache()
+    _, _, _, trials = run_search(model, DEFAULT_SEARCH_SPACE, X, y, engine="tpe", n_iter=20, cv=3, max_fits=12,
+                                 random_state=0, cache=cache, verbose=False)
+    assert len(trials) == 4
+    _, _, _, trials = run_search(model, DEFAULT_SEARCH_SPACE, X, y, engine="random", n_iter=20, cv=3, patience=2,
+                                 random_state=0, cache=cache, verbose=False)
+    assert len(trials) < 20
+    with pytest.raises(RuntimeError):
+        run_search(model, DEFAULT_SEARCH_SPACE, X, y, max_fits=1, cv=3, cache=cache, verbose=False)
+    with pytest.raises(ValueError):
+        run_search(model, DEFAULT_SEARCH_SPACE, X, y, engine="grid", cache=cache, verbose=False)
+
+
+def test_plateau_and_budget_helpers():
+    plateau = _Plateau(patience=2)
+    assert [plateau.update(score) for score in [0.5, 0.6, 0.6, 0.55]] == [False, False, False, True]
+    budget = SearchBudget(max_fits=10)
+    budget.spend(8)
+    assert budget.allows(2) and not budget.allows(2.5)
+    assert SearchBudget(max_seconds=0).allows(0) is False
+
+
+def test_evaluator_subsets_are_nested(data):
+    model, X, y = data
+    evaluator = FoldEvaluator(model, X, y, cv=3, random_state=0, cache=FoldTransformCache())
+    small = evaluator._fold_data(0, 40)[1].index
+    large = evaluator._fold_data(0, 80)[1].index
+    assert set(small) <= set(large)
+    assert evaluator.cost(2, evaluator.n_samples // 2) == pytest.approx(3, abs=0.05)
+    assert set(SEARCH_ENGINES) == {"random", "halving", "tpe"}
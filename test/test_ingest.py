@@ -0,0 +1,75 @@
+import pytest
+import os
+import pandas as pd
+import pandera as pa
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from ingest import read_csv_typed, schema_dtypes, parser_engine, byte_ranges, read_csv_range
+
+test_schema = pa.DataFrameSchema({
+    "alcohol": pa.Column(float),
+    "quality": pa.Column(int),
+})
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "raw_data.csv"
+    pd.DataFrame({
+        "alcohol": [9.4, 9.8, 10.0],
+        "notes": ["a", "b", "c"],
+        "quality": [5, 6, 7],
+    }).to_csv(path, sep=";", index=False)
+    return str(path)
+
+# Test that schema dtypes are mapped, with optional float32 down-casting
+def test_schema_dtypes():
+    assert schema_dtypes(test_schema) == {"alcohol": "float64", "quality": "int64"}
+    assert schema_dtypes(test_schema, "float32") == {"alcohol": "float32", "quality": "int64"}
+    with pytest.raises(ValueError):
+        schema_dtypes(test_schema, "float16")
+
+# Test that schema columns are read in their declared dtypes
+def test_read_csv_typed_uses_schema(csv_path):
+    df = read_csv_typed(csv_path, test_schema, sep=";", float_dtype="float32")
+    assert list(df.columns) == ["alcohol", "notes", "quality"]
+    assert list(read_csv_typed(csv_path, test_schema, sep=";", usecols=list(test_schema.columns)).columns) == ["alcohol", "quality"]
+    assert str(df["alcohol"].dtype) == "float32"
+    assert str(df["quality"].dtype) == "int64"
+
+# Test that values not matching the schema dtypes fail at read time
+def test_read_csv_typed_dtype_drift(tmp_path):
+    path = tmp_path / "drift.csv"
+    pd.DataFrame({"alcohol": [9.4, 9.8], "quality": ["5", "six"]}).to_csv(path, index=False)
+    with pytest.raises(ValueError, match="Failed to parse"):
+        read_csv_typed(str(path), test_schema)
+
+# Test that reading without a schema infers dtypes as before
+def test_read_csv_typed_without_schema(csv_path):
+    df = read_csv_typed(csv_path, sep=";")
+    assert list(df.columns) == ["alcohol", "notes", "quality"]
+    assert parser_engine() in ("pyarrow", "c")
+
+# Test that the pyarrow parser returns the dtypes and values of the C parser
+def test_read_csv_typed_pyarrow_matches_c(csv_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    import ingest
+    pyarrow_df = read_csv_typed(csv_path, test_schema, sep=";", float_dtype="float32")
+    monkeypatch.setattr(ingest, "parser_engine", lambda: "c")
+    c_df = read_csv_typed(csv_path, test_schema, sep=";", float_dtype="float32")
+    pd.testing.assert_frame_equal(pyarrow_df, c_df)
+
+# Test that byte ranges are aligned to lines and together parse to the whole file
+def test_byte_ranges_cover_every_line(tmp_path):
+    path = tmp_path / "data.csv"
+    df = pd.DataFrame({"alcohol": [9.4 + i / 100 for i in range(50)], "quality": [5 + i % 3 for i in range(50)]})
+    df.to_csv(path, index=False)
+
+    header, ranges = byte_ranges(str(path), 37)
+    assert header == b"alcohol,quality\n"
+    assert len(ranges) > 1
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+
+    chunks = [read_csv_range(str(path), start, end, ["alcohol", "quality"], test_schema) for start, end in ranges]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), df)
+    with pytest.raises(ValueError):
+        byte_ranges(str(path), 0)
@@ -135,3 +135,67 @@ def test_invalid_model_path_raises_error(setup_mock_files):
             y_test_path=paths['y_test_path'],
             params_output_path=paths['params_output_path']
         )
+
+
+def test_cached_random_search_matches_randomized_search():
+    """
+    Test that the search on cached folds picks the candidate and score of RandomizedSearchCV.
+    """
+    import numpy as np
+    from scipy.stats import loguniform
+    from sklearn.model_selection import RandomizedSearchCV
+    from model_tuning import cached_random_search
+    from fold_cache import FoldTransformCache
+
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.normal(size=(60, 3)), columns=["a", "b", "c"])
+    y = pd.Series((X["a"] + rng.normal(scale=0.5, size=60) > 0).astype(int), name="label")
+    model = Pipeline([('scaler', StandardScaler()), ('svc', SVC())])
+    param_dist = {'svc__C': loguniform(1e-2, 1e2), 'svc__class_weight': [None, 'balanced']}
+    cache = FoldTransformCache()
+
+    best_estimator, best_params, best_score = cached_random_search(
+        model, param_dist, X, y, n_iter=6, cv=3, random_state=0, cache=cache
+    )
+    search = RandomizedSearchCV(model, param_dist, n_iter=6, cv=3, random_state=0).fit(X, y)
+    assert best_params == search.best_params_
+    assert best_score == search.best_score_
+    assert (best_estimator.predict(X) == search.best_estimator_.predict(X)).all()
+    # The scaler is fitted once per fold instead of once per candidate and fold
+    assert cache.misses == 3
+
+
+def test_cached_random_search_rejects_preprocessor_params():
+    from model_tuning import cached_random_search
+    model = Pipeline([('scaler', StandardScaler()), ('svc', SVC())])
+    with pytest.raises(ValueError):
+        cached_random_search(model, {'scaler__with_mean': [True, False]}, pd.DataFrame({"a": [1, 2]}),
+                             pd.Series([0, 1]))
+
+
+def test_fine_tune_model_search_engine_and_space(setup_mock_files, tmpdir):
+    """
+    Test that the search engine, its budget and a JSON search space are passed through.
+    """
+    import json
+    paths = setup_mock_files
+    space_path = tmpdir.join("space.json")
+    space_path.write(json.dumps({"svc__C": {"loguniform": [0.1, 10]}, "svc__class_weight": [None, "balanced"]}))
+
+    fine_tune_model(
+        model_path=paths['model_path'],
+        best_model_path=paths['best_model_path'],
+        x_train_path=paths['x_train_path'],
+        y_train_path=paths['y_train_path'],
+        x_test_path=paths['x_test_path'],
+        y_test_path=paths['y_test_path'],
+        params_output_path=paths['params_output_path'],
+        search="tpe",
+        search_space=str(space_path),
+        n_iter=12,
+        max_fits=40
+    )
+
+    params_df = pd.read_csv(paths['params_output_path'])
+    assert list(params_df.columns) == ['svc__C', 'svc__class_weight', 'best_score']
+    assert 0.1 <= params_df['svc__C'][0] <= 10
@@ -7,6 +7,7 @@ import os
 import sys
 import pandas as pd
 import numpy as np
+import matplotlib.pyplot as plt
 from sklearn.dummy import DummyClassifier
 
 # Import the get_save_confusion_matrix_multi function from multiconfusion_matrix
@@ -67,3 +68,24 @@ def test_cross_val_scores_wrong_type_datasets_error():
         save_confusion_matrix_multi(test_model, test_X_test_numeric, test_y_test_bool, test_save_path)
         save_confusion_matrix_multi(test_model, test_X_test_numeric, test_y_test_bool, test_save_path_bool)
 
+
+# Test that every matrix is drawn on one reused figure that is closed afterwards, or on one grid figure
+def test_save_confusion_matrix_multi_layouts(tmp_path):
+    save_path = f"{tmp_path}/"
+    expected = save_confusion_matrix_multi(test_model, test_X_test, test_y_test, save_path)
+    assert plt.get_fignums() == []
+
+    result = save_confusion_matrix_multi(test_model, test_X_test, test_y_test, save_path, layout="grid")
+    assert np.array_equal(result, expected)
+    assert os.path.exists(f"{save_path}confusion_matrices.png")
+    assert plt.get_fignums() == []
+
+    with pytest.raises(ValueError):
+        save_confusion_matrix_multi(test_model, test_X_test, test_y_test, save_path, layout="mosaic")
+
+# Test that no figures are rendered or saved when only the matrices are requested
+def test_save_confusion_matrix_multi_no_figures(tmp_path):
+    result = save_confusion_matrix_multi(test_model, test_X_test, test_y_test, None, figures=False)
+    assert result.shape == (3, 2, 2)
+    assert result[:, 1, 1].sum() + result[:, 1, 0].sum() == len(test_y_test)
+    assert os.listdir(tmp_path) == []
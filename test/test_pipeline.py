@@ -0,0 +1,123 @@
+import pytest
+import os
+import sys
+import time
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from pipeline import Stage, run_pipeline, code_fingerprint, local_modules
+
+def copy_upper(source, target, calls, name):
+    calls.append(name)
+    with open(source) as f, open(target, "w") as out:
+        out.write(f.read().upper())
+
+def toy_stages(tmp_path, calls):
+    raw, clean, report = str(tmp_path / "raw.txt"), str(tmp_path / "clean.txt"), str(tmp_path / "report.txt")
+    return raw, [
+        Stage("clean", lambda **p: copy_upper(raw, clean, calls, "clean"), inputs=[raw], outputs=[clean]),
+        Stage("report", lambda **p: copy_upper(clean, report, calls, "report"), inputs=[clean], outputs=[report]),
+    ]
+
+# Test that unchanged stages are skipped and only stages with changed inputs run again
+def test_run_pipeline_skips_unchanged_stages(tmp_path):
+    calls = []
+    raw, stages = toy_stages(tmp_path, calls)
+    with open(raw, "w") as f:
+        f.write("wine")
+    cache_dir = str(tmp_path / "cache")
+    assert run_pipeline(stages, cache_dir) == {"clean": "ran", "report": "ran"}
+    assert run_pipeline(stages, cache_dir) == {"clean": "cached", "report": "cached"}
+
+    # A new input that cleans to the same output does not re-run the downstream stage
+    with open(raw, "w") as f:
+        f.write("WINE")
+    assert run_pipeline(stages, cache_dir) == {"clean": "ran", "report": "cached"}
+    with open(raw, "w") as f:
+        f.write("red wine")
+    assert run_pipeline(stages, cache_dir) == {"clean": "ran", "report": "ran"}
+
+    # Forced stages run, skipped stages do not, and deleted outputs are written again
+    os.remove(str(tmp_path / "report.txt"))
+    assert run_pipeline(stages, cache_dir, force=["clean"], skip=[]) == {"clean": "ran", "report": "ran"}
+    assert run_pipeline(stages, cache_dir, skip=["clean"]) == {"clean": "skipped", "report": "cached"}
+    assert calls == ["clean", "report", "clean", "clean", "report", "clean", "report"]
+
+# Test that parameters are part of the cache key
+def test_run_pipeline_reruns_on_new_params(tmp_path):
+    target = str(tmp_path / "out.txt")
+    def write(value):
+        with open(target, "w") as f:
+            f.write(value)
+    cache_dir = str(tmp_path / "cache")
+    assert run_pipeline([Stage("write", write, outputs=[target], params={"value": "a"})], cache_dir) == {"write": "ran"}
+    assert run_pipeline([Stage("write", write, outputs=[target], params={"value": "a"})], cache_dir) == {"write": "cached"}
+    assert run_pipeline([Stage("write", write, outputs=[target], params={"value": "b"})], cache_dir) == {"write": "ran"}
+
+# Test that independent stages run concurrently while stages sharing a lock do not overlap
+def test_run_pipeline_concurrency(tmp_path):
+    barrier = threading.Barrier(2, timeout=10)
+    stages = [Stage(name, lambda: barrier.wait()) for name in ["eda", "select"]]
+    assert set(run_pipeline(stages, str(tmp_path / "a"))) == {"eda", "select"}
+
+    active, overlaps = [], []
+    def plot():
+        active.append(1)
+        overlaps.append(len(active))
+        time.sleep(0.05)
+        active.pop()
+    stages = [Stage(name, plot, locks=["pyplot"]) for name in ["eda", "evaluate", "report"]]
+    run_pipeline(stages, str(tmp_path / "b"))
+    assert overlaps == [1, 1, 1]
+
+# Test that a failing stage stops its dependents and that missing outputs and cycles are errors
+def test_run_pipeline_failures(tmp_path):
+    calls = []
+    def fail():
+        raise ValueError("bad data")
+    stages = [Stage("validate", fail), Stage("split", lambda: calls.append("split"), after=["validate"])]
+    with pytest.raises(RuntimeError, match="validate failed: bad data"):
+        run_pipeline(stages, str(tmp_path))
+    assert calls == []
+
+    with pytest.raises(RuntimeError, match="did not write"):
+        run_pipeline([Stage("clean", lambda: None, outputs=[str(tmp_path / "missing.csv")])], str(tmp_path))
+    with pytest.raises(ValueError, match="cycle"):
+        run_pipeline([Stage("a", lambda: None, after=["b"]), Stage("b", lambda: None, after=["a"])], str(tmp_path))
+    with pytest.raises(ValueError):
+        run_pipeline([Stage("a", lambda: None)], str(tmp_path), force=["b"])
+
+# Test that a failed stage is never recorded as up to date, even with outputs of an earlier run on disk
+def test_run_pipeline_failed_stage_reruns(tmp_path):
+    target, cache_dir = str(tmp_path / "out.txt"), str(tmp_path / "cache")
+    def write(value):
+        if value == "raise":
+            raise ValueError("bad data")
+        if value == "exit":
+            sys.exit(1)
+        if value != "swallow":
+            with open(target, "w") as f:
+                f.write(value)
+    assert run_pipeline([Stage("write", write, outputs=[target], params={"value": "a"})], cache_dir) == {"write": "ran"}
+    os.utime(target, (time.time() - 60, time.time() - 60))
+
+    for value, error in [("raise", "bad data"), ("exit", "exited with status 1"), ("swallow", "did not write")]:
+        with pytest.raises(RuntimeError, match=error):
+            run_pipeline([Stage("write", write, outputs=[target], params={"value": value})], cache_dir)
+        with pytest.raises(RuntimeError, match=error):
+            run_pipeline([Stage("write", write, outputs=[target], params={"value": value})], cache_dir)
+
+    # The stage that last succeeded with these parameters is not trusted after a failed run
+    assert run_pipeline([Stage("write", write, outputs=[target], params={"value": "a"})], cache_dir) == {"write": "ran"}
+    assert run_pipeline([Stage("write", write, outputs=[target], params={"value": "a"})], cache_dir) == {"write": "cached"}
+
+# Test that the code fingerprint ignores comments and docstrings and that local imports are found
+def test_code_fingerprint_and_local_modules(tmp_path):
+    helper, script = tmp_path / "helper.py", tmp_path / "script.py"
+    helper.write_text("import os\n")
+    script.write_text('"""Script."""\n# comment\ndef main():\n    """Run."""\n    from src.helper import os\n    return 1\n')
+    before = code_fingerprint([str(script)])
+    script.write_text('"""Other script."""\ndef main():\n    # another comment\n    from src.helper import os\n    return 1\n')
+    assert code_fingerprint([str(script)]) == before
+    script.write_text('def main():\n    from src.helper import os\n    return 2\n')
+    assert code_fingerprint([str(script)]) != before
+    assert local_modules(str(script), [str(tmp_path)]) == sorted([str(helper), str(script)])
@@ -0,0 +1,90 @@
+import pytest
+import os
+import numpy as np
+import pandas as pd
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from profiler import DatasetProfile, QuantileSketch, profile_in_chunks
+
+rng = np.random.default_rng(522)
+test_df = pd.DataFrame({
+    'fixed acidity': rng.normal(8, 1.7, size=500),
+    'alcohol': rng.normal(10, 1, size=500),
+    'quality': rng.integers(3, 9, size=500),
+})
+
+# Test that the describe table matches pandas on a fully in-memory profile
+def test_describe_table_matches_pandas():
+    profile = DatasetProfile.from_frame(test_df)
+    pd.testing.assert_frame_equal(profile.describe_table(), test_df.describe(), check_dtype=False)
+
+# Test that the correlation matrix matches pandas' Pearson correlation
+def test_correlation_matches_pandas():
+    profile = DatasetProfile.from_frame(test_df)
+    pd.testing.assert_frame_equal(profile.correlation(), test_df.corr(method='pearson'))
+
+# Test that merging chunk profiles gives the same statistics as a single pass
+def test_chunked_profile_merges():
+    profile = DatasetProfile()
+    for start in range(0, len(test_df), 128):
+        profile.update(test_df.iloc[start:start + 128])
+    pd.testing.assert_frame_equal(profile.describe_table(), test_df.describe(), check_dtype=False)
+    pd.testing.assert_frame_equal(profile.correlation(), test_df.corr())
+
+# Test that the overview and missing values tables match the cleaning reports
+def test_overview_and_missing_tables():
+    df = pd.DataFrame({'Column1': [1, 2, None], 'Column2': ['A', None, 'C']})
+    profile = DatasetProfile.from_frame(df)
+    assert profile.overview_table()['Non-Null Count'].tolist() == df.count().tolist()
+    assert profile.missing_table()['Missing Values'].tolist() == df.isnull().sum().tolist()
+    assert list(profile.describe_table().columns) == ['Column1']
+
+# Test that a compacted sketch still estimates quantiles closely
+def test_quantile_sketch_accuracy():
+    values = rng.uniform(0, 1, size=100_000)
+    sketch = QuantileSketch(size=512)
+    for chunk in np.array_split(values, 10):
+        sketch.update(chunk)
+    for q in [0.25, 0.5, 0.75]:
+        assert abs(sketch.quantile(q) - q) < 0.02
+
+# Test that profiles round-trip through the saved artifact
+def test_profile_save_load(tmp_path):
+    path = str(tmp_path / 'profile.pickle')
+    DatasetProfile.from_frame(test_df).save(path)
+    pd.testing.assert_frame_equal(DatasetProfile.load(path).correlation(), test_df.corr())
+
+# Test that rank correlations are exact while the data fits in the rank sample and sketches
+@pytest.mark.parametrize("method", ["spearman", "kendall"])
+def test_rank_correlation_matches_pandas(method):
+    df = test_df.assign(ties=test_df['quality'] // 2)
+    profile = DatasetProfile()
+    for start in range(0, len(df), 128):
+        profile.update(df.iloc[start:start + 128])
+    pd.testing.assert_frame_equal(profile.correlation(method), df.corr(method=method))
+    with pytest.raises(ValueError):
+        profile.correlation("distance")
+
+# Test that the rank sample does not depend on chunking and approximates larger data closely
+def test_rank_sample_is_mergeable():
+    x = rng.normal(size=(20_000, 2))
+    df = pd.DataFrame({'a': x[:, 0], 'b': np.exp(x[:, 0] + 0.5 * x[:, 1])})
+    whole = DatasetProfile.from_frame(df, sketch_size=256, rank_sample_size=1000)
+    merged = DatasetProfile(sketch_size=256, rank_sample_size=1000)
+    for chunk in np.array_split(df, 7):
+        merged.merge(DatasetProfile.from_frame(chunk, sketch_size=256, rank_sample_size=1000))
+    assert len(merged.rank_sample) == 1000
+    assert np.array_equal(np.sort(whole.rank_keys), np.sort(merged.rank_keys))
+    assert abs(merged.correlation("spearman").loc['a', 'b'] - df.corr("spearman").loc['a', 'b']) < 0.03
+    assert abs(merged.correlation("kendall").loc['a', 'b'] - df.corr("kendall").loc['a', 'b']) < 0.03
+
+# Test that profiling a CSV file in parallel byte ranges matches profiling it in memory
+def test_profile_in_chunks(tmp_path):
+    path = tmp_path / "data.csv"
+    test_df.to_csv(path, index=False)
+    df = pd.read_csv(path)
+    profile = profile_in_chunks(str(path), chunksize=2048, workers=2)
+    assert profile.rows == len(df)
+    pd.testing.assert_frame_equal(profile.describe_table(), df.describe(), check_dtype=False)
+    for method in ["pearson", "spearman", "kendall"]:
+        pd.testing.assert_frame_equal(profile.correlation(method), df.corr(method=method))
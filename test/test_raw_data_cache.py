@@ -0,0 +1,91 @@
+import pytest
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from raw_data_cache import lookup, store, materialize, file_sha256, _load_index
+
+URL = "https://example.com/wine+quality.zip"
+
+@pytest.fixture
+def sample_file(tmp_path):
+    path = tmp_path / "raw_data.zip"
+    path.write_bytes(b"wine" * 1000)
+    return str(path)
+
+# Test that a stored file is found again with the same validator
+def test_store_and_lookup_hit(tmp_path, sample_file):
+    cache_dir = str(tmp_path / "cache")
+    sha256 = store(cache_dir, sample_file, URL, validator='"v1"')
+
+    cached = lookup(cache_dir, URL, validator='"v1"')
+    assert cached is not None
+    assert file_sha256(cached) == sha256
+
+# Test that a changed validator or an unknown member is a miss
+def test_lookup_miss(tmp_path, sample_file):
+    cache_dir = str(tmp_path / "cache")
+    store(cache_dir, sample_file, URL, validator='"v1"')
+
+    assert lookup(cache_dir, URL, validator='"v2"') is None
+    assert lookup(cache_dir, URL, validator='"v1"', member="winequality-red.csv") is None
+    assert lookup(str(tmp_path / "empty_cache"), URL, validator='"v1"') is None
+
+# Test that offline lookups ignore the validator
+def test_lookup_offline(tmp_path, sample_file):
+    cache_dir = str(tmp_path / "cache")
+    store(cache_dir, sample_file, URL, validator='"v1"')
+
+    assert lookup(cache_dir, URL, offline=True) is not None
+    assert lookup(cache_dir, "https://example.com/other.zip", offline=True) is None
+
+# Test that the least recently used object is evicted once the cache is full
+def test_store_evicts_lru(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"file_{i}.zip"
+        path.write_bytes(bytes([i]) * 100)
+        paths.append(str(path))
+
+    store(cache_dir, paths[0], URL + "0", validator="a", max_bytes=250)
+    store(cache_dir, paths[1], URL + "1", validator="a", max_bytes=250)
+    lookup(cache_dir, URL + "0", validator="a")
+    store(cache_dir, paths[2], URL + "2", validator="a", max_bytes=250)
+
+    assert lookup(cache_dir, URL + "0", validator="a") is not None
+    assert lookup(cache_dir, URL + "1", validator="a") is None
+    assert lookup(cache_dir, URL + "2", validator="a") is not None
+    assert len(_load_index(cache_dir)) == 2
+
+# Test that materialized files have the cached contents
+def test_materialize(tmp_path, sample_file):
+    cache_dir = str(tmp_path / "cache")
+    store(cache_dir, sample_file, URL, validator='"v1"')
+    output_path = tmp_path / "data" / "raw" / "raw_data.zip"
+
+    materialize(lookup(cache_dir, URL, validator='"v1"'), str(output_path))
+    assert output_path.read_bytes() == b"wine" * 1000
+
+# Test that rewriting a materialized file leaves the cached object intact
+def test_materialized_file_rewrite(tmp_path, sample_file):
+    cache_dir = str(tmp_path / "cache")
+    sha256 = store(cache_dir, sample_file, URL, validator='"v1"')
+    output_path = tmp_path / "data" / "raw" / "raw_data.zip"
+    materialize(lookup(cache_dir, URL, validator='"v1"'), str(output_path))
+
+    with open(output_path, 'wb') as f:
+        f.write(b"other" * 10)
+    cached = lookup(cache_dir, URL, validator='"v1"')
+    assert cached is not None
+    assert file_sha256(cached) == sha256
+
+# Test that an object whose contents no longer match its digest is a miss
+def test_lookup_corrupted_object(tmp_path, sample_file):
+    cache_dir = str(tmp_path / "cache")
+    store(cache_dir, sample_file, URL, validator='"v1"')
+    cached = lookup(cache_dir, URL, validator='"v1"')
+    with open(cached, 'wb') as f:
+        f.write(b"bad!" * 1000)
+
+    assert lookup(cache_dir, URL, validator='"v1"') is None
+    assert not os.path.exists(cached)
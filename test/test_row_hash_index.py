@@ -0,0 +1,94 @@
+import pytest
+import os
+import numpy as np
+import pandas as pd
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+import row_hash_index
+from row_hash_index import RowHashIndex, row_hashes
+
+@pytest.fixture
+def sample_data():
+    return pd.DataFrame({
+        'Column1': [1, 2, 1, None, None, 2],
+        'Column2': ['A', 'B', 'A', 'D', 'D', 'C'],
+    })
+
+# Test that the mask matches pandas' duplicated, including rows with missing values
+def test_find_duplicates_matches_pandas(sample_data):
+    mask = RowHashIndex().find_duplicates(sample_data)
+    assert mask.tolist() == sample_data.duplicated().tolist()
+
+# Test that int and float representations of the same values hash identically
+def test_row_hashes_ignore_int_float():
+    ints = pd.DataFrame({'a': [1, 2]})
+    floats = pd.DataFrame({'a': [1.0, 2.0]})
+    assert (row_hashes(ints) == row_hashes(floats)).all()
+
+# Test that later batches are deduplicated against earlier ones, also after a save/load
+def test_incremental_batches(tmp_path, sample_data):
+    index = RowHashIndex()
+    index.find_duplicates(sample_data)
+    assert len(index) == 4
+
+    index_path = str(tmp_path / 'row_index.npz')
+    index.save(index_path)
+    loaded = RowHashIndex.load(index_path)
+
+    batch = pd.DataFrame({'Column1': [1.0, 7.0, 7.0], 'Column2': ['A', 'E', 'E']})
+    assert loaded.find_duplicates(batch).tolist() == [True, False, True]
+    assert len(loaded) == 5
+    assert len(RowHashIndex.load(str(tmp_path / 'missing.npz'))) == 0
+
+# Test that rows with colliding hashes but different values are both kept
+def test_collisions_are_verified(monkeypatch):
+    monkeypatch.setattr(row_hash_index, 'row_hashes', lambda df, hash_key=None: np.zeros(len(df), dtype=np.uint64))
+    df = pd.DataFrame({'a': [1, 2, 1]})
+    assert RowHashIndex().find_duplicates(df).tolist() == [False, False, True]
+
+# Test that mixed numeric dtypes hash like their float64 cast, whichever columns need casting
+def test_row_hashes_mixed_dtypes():
+    df = pd.DataFrame({'a': np.array([1, 2], dtype='int32'), 'b': np.array([0.5, 1.5], dtype='float32'),
+                       'c': [0.25, 0.75], 'd': ['x', 'y']})
+    assert (row_hashes(df) == row_hashes(df.astype({'a': 'float64', 'b': 'float64'}))).all()
+    assert df['a'].dtype == np.int32
+
+# Test that every repeat is checked against the first row with its hash, with interleaved duplicates
+def test_first_occurrence_lookup():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'a': rng.integers(0, 5, 200), 'b': rng.integers(0, 5, 200)})
+    assert RowHashIndex().find_duplicates(df, update=False).tolist() == df.duplicated().tolist()
+
+# Test that fingerprints are only hashed when the batch is matched against or added to the index
+def test_fingerprints_only_when_needed(monkeypatch, sample_data):
+    keys = []
+    hash_rows = row_hash_index.row_hashes
+    monkeypatch.setattr(row_hash_index, 'row_hashes',
+                        lambda df, hash_key=row_hash_index.HASH_KEY: keys.append(hash_key) or hash_rows(df, hash_key))
+    index = RowHashIndex()
+    index.find_duplicates(sample_data, update=False)
+    assert keys == [row_hash_index.HASH_KEY]
+    assert len(index) == 0
+
+    index.find_duplicates(sample_data)
+    assert keys[1:] == [row_hash_index.HASH_KEY, row_hash_index.FINGERPRINT_KEY]
+    assert index.find_duplicates(sample_data, update=False).all()
+
+# Test that rows sharing a primary hash are told apart by every stored fingerprint
+def test_seen_checks_every_fingerprint_of_a_hash():
+    index = RowHashIndex(np.array([5, 5, 5, 9], dtype=np.uint64), np.array([1, 2, 3, 4], dtype=np.uint64))
+    seen = index._seen(np.array([5, 5, 6, 9], dtype=np.uint64), np.array([3, 4, 1, 4], dtype=np.uint64))
+    assert seen.tolist() == [True, False, False, True]
+
+# Test that many small batches give pandas' result on the whole data and keep few sorted runs
+def test_many_batches(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'a': rng.integers(0, 30, 2000), 'b': rng.integers(0, 30, 2000)})
+    index = RowHashIndex()
+    mask = np.concatenate([index.find_duplicates(df.iloc[start:start + 50]) for start in range(0, len(df), 50)])
+    assert mask.tolist() == df.duplicated().tolist()
+    assert len(index._runs) <= np.log2(len(index)) + 1
+    assert (np.diff(index.hashes.astype(np.float64)) >= 0).all()
+
+    index.save(str(tmp_path / 'row_index.npz'))
+    assert RowHashIndex.load(str(tmp_path / 'row_index.npz')).find_duplicates(df).all()
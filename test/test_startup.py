@@ -0,0 +1,66 @@
+import pytest
+import os
+import sys
+import subprocess
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+import startup
+from startup import parse_importtime, import_profile, heavy_imports, startup_time, budget_error
+from click.testing import CliRunner
+
+CLI = os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts/cli.py'))
+STAGES = ["download", "clean", "validate", "split-eda", "select", "tune", "evaluate", "pipeline"]
+
+# Test that the -X importtime report is parsed into modules, times and nesting depths
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     _io\n"
+        "import time:       300 |        420 |   encodings\n"
+        "import time:      1500 |       1920 | click\n"
+        "some other output\n"
+    )
+    assert parse_importtime(stderr) == [("_io", 120, 120, 2), ("encodings", 300, 420, 1), ("click", 1500, 1920, 0)]
+
+# Test that heavy packages are found from any of their submodules
+def test_heavy_imports():
+    records = [("pandas.core", 1, 1, 1), ("pandas", 1, 2, 0), ("sklearn.utils", 1, 1, 0), ("click", 1, 1, 0)]
+    assert heavy_imports(records) == ["pandas", "sklearn"]
+    assert heavy_imports(import_profile(["-c", "import json"])) == []
+
+# Test that the help of the CLI and of every stage is printed without importing a heavy package
+@pytest.mark.parametrize("command", [[]] + [[stage] for stage in STAGES])
+def test_cli_help_is_light(command):
+    records = import_profile([CLI, *command, "--help"])
+    assert heavy_imports(records) == []
+    assert "click" in [module for module, _, _, _ in records]
+
+# Test that stage commands are loaded from their scripts and that failing commands are reported
+def test_cli_dispatch():
+    result = subprocess.run([sys.executable, CLI, "validate", "--help"], capture_output=True, text=True)
+    assert result.returncode == 0 and "--pps_sample_size" in result.stdout
+    result = subprocess.run([sys.executable, CLI, "importtime", "--stage"], capture_output=True, text=True)
+    assert result.returncode != 0 and "--stage requires a COMMAND" in result.stderr
+    with pytest.raises(RuntimeError):
+        import_profile(["-c", "import a_module_that_does_not_exist"])
+
+# Test that the budget fails slow startups and heavy imports
+def test_budget_error():
+    assert budget_error(100, 250, []) is None
+    assert budget_error(300, 250, []) == "Startup is over budget."
+    assert "heavy packages" in budget_error(100, 250, ["pandas"])
+
+# Test that the importtime command reports the startup and enforces the budget, on an injected
+# startup time; the real measurement is left to make importtime, as it depends on the machine's load
+def test_importtime_command(monkeypatch):
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("cli", CLI)
+    cli = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(cli)
+    monkeypatch.setattr(startup, "startup_time", lambda args: 120.0)
+
+    result = CliRunner().invoke(cli.cli, ["importtime", "tune", "--top", "3"])
+    assert result.exit_code == 0, result.output
+    assert "Heavy packages imported: none" in result.output and f"Startup time: 120 ms (budget {startup.STARTUP_BUDGET_MS} ms)" in result.output
+    result = CliRunner().invoke(cli.cli, ["importtime", "--budget", "100"])
+    assert result.exit_code == 1 and "over budget" in result.output
+    assert startup_time(["-c", "pass"], repeat=2) > 0
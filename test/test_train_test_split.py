@@ -7,7 +7,8 @@ import os
 import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.train_test_split import run_TrainTestSplit
+from src.train_test_split import run_TrainTestSplit, RANDOM_STATE
+from src.artifacts import artifact_path, load_frame, load_split
 
 # Creating testing data
 os.makedirs('test/temp/data/processed/', exist_ok=True)
@@ -52,7 +53,46 @@ def test_train_test_split():
     os.remove(f"{test_output_path}y_train.csv")
     os.remove(f"{test_output_path}X_test.csv")
     os.remove(f"{test_output_path}y_test.csv")
+    os.remove(f"{test_output_path}split.npz")
     os.remove(f"{test_clean_data_path}")
     os.rmdir("test/temp/data/processed")
     os.rmdir("test/temp/data")
     os.rmdir(test_output_path)
+
+def test_index_split_is_deterministic_and_stratified(tmp_path, monkeypatch):
+    # A larger dataset with an imbalanced target, so the split can be stratified
+    df = pd.DataFrame({
+        'Col1': range(100),
+        'Col2': [i % 7 for i in range(100)],
+        'quality': [5] * 70 + [6] * 20 + [7] * 10
+    })
+    clean_path = str(tmp_path / 'cleaned_data.csv')
+    df.to_csv(clean_path, index=False)
+
+    run_TrainTestSplit(clean_path, str(tmp_path / 'csv'))
+    run_TrainTestSplit(clean_path, str(tmp_path / 'index'), fmt='index')
+    assert sorted(os.listdir(tmp_path / 'index')) == ['split.npz']
+
+    split = load_split(str(tmp_path / 'index' / 'split.npz'))
+    assert split['stratified'] and split['random_state'] == RANDOM_STATE
+    assert len(split['test']) == 20
+    assert df['quality'].iloc[split['test']].value_counts().to_dict() == {5: 14, 6: 4, 7: 2}
+
+    # Views materialized from the indices match the split files of an identical run
+    for name in ['X_train', 'y_train', 'X_test', 'y_test']:
+        view = load_frame(artifact_path(str(tmp_path / 'index'), name, 'index'))
+        pd.testing.assert_frame_equal(view, load_frame(artifact_path(str(tmp_path / 'csv'), name, 'csv')))
+
+    # A split of a relative path resolves the cleaned data against the split file, from any working directory
+    monkeypatch.chdir(tmp_path)
+    run_TrainTestSplit('cleaned_data.csv', 'relative', fmt='index')
+    monkeypatch.chdir(tmp_path / 'relative')
+    view = load_frame(artifact_path('.', 'X_train', 'index'))
+    pd.testing.assert_frame_equal(view, load_frame(artifact_path(str(tmp_path / 'csv'), 'X_train', 'csv')))
+
+    # Views refuse to materialize from a changed dataset
+    df.loc[0, 'Col1'] = -1
+    df.to_csv(clean_path, index=False)
+    os.utime(clean_path, (0, 1))
+    with pytest.raises(ValueError, match="changed since the train-test split"):
+        load_frame(artifact_path(str(tmp_path / 'index'), 'X_train', 'index'))
@@ -0,0 +1,88 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+from fold_cache import FoldTransformCache
+from hyperparameter_search import run_search
+from trial_store import TrialStore, trial_key, params_json
+
+SPACE = {"svc__C": {"loguniform": [1e-2, 1e2]}, "svc__class_weight": [None, "balanced"]}
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(150, 2)), columns=["a", "b"])
+    y = pd.Series(np.where(X["a"] + rng.normal(scale=0.5, size=150) > 0, "high", "low"), name="label")
+    return Pipeline([("scaler", StandardScaler()), ("svc", SVC())]), X, y
+
+
+def test_store_round_trip(tmp_path):
+    store = TrialStore(str(tmp_path / "trials" / "store.sqlite"))
+    params = {"svc__C": np.float64(0.5), "svc__class_weight": None}
+    assert params_json(params) == '{"svc__C": 0.5, "svc__class_weight": null}'
+    keys = [trial_key("m", "d", "s", fold, None, params) for fold in range(2)]
+    assert keys[0] != keys[1]
+    for fold, (key, score) in enumerate(zip(keys, [0.6, 0.8])):
+        store.put(key, "m", "d", "s", params, fold, None, score, 0.1, 0.01)
+    assert store.get(keys + ["missing"]) == {keys[0]: 0.6, keys[1]: 0.8}
+    assert store.best("m", "d", "s", n_folds=2) == [({"svc__C": 0.5, "svc__class_weight": None}, pytest.approx(0.7))]
+    # Candidates scored on fewer folds, or on other data, are not warm-start candidates
+    assert store.best("m", "d", "s", n_folds=3) == []
+    assert store.best("m", "other", "s", n_folds=2) == []
+    store.close()
+
+    # Trials persist across processes
+    reopened = TrialStore(str(tmp_path / "trials" / "store.sqlite"))
+    assert len(reopened) == 2
+    reopened.close()
+
+
+def test_interrupted_search_resumes_from_store(data, tmp_path):
+    """
+    A search stopped by its budget resumes without refitting, and gives the result of an uninterrupted search.
+    """
+    model, X, y = data
+    store = TrialStore(str(tmp_path / "store.sqlite"))
+    cache = FoldTransformCache()
+    _, _, _, partial = run_search(model, SPACE, X, y, n_iter=6, cv=3, max_fits=9, random_state=0, cache=cache,
+                                  store=store, verbose=False)
+    assert len(partial) == 3 and len(store) == 9
+
+    _, resumed_params, resumed_score, _ = run_search(model, SPACE, X, y, n_iter=6, cv=3, random_state=0, cache=cache,
+                                                     store=store, verbose=False)
+    assert len(store) == 18
+    _, params, score, _ = run_search(model, SPACE, X, y, n_iter=6, cv=3, random_state=0, cache=cache, verbose=False)
+    assert (resumed_params, resumed_score) == (params, score)
+
+    # Identical trials are read back without fitting, even for row subsets
+    for engine in ["random", "halving"]:
+        run_search(model, SPACE, X, y, engine=engine, n_iter=6, cv=3, random_state=0, cache=cache, store=store,
+                   verbose=False)
+        _, _, _, trials = run_search(model, SPACE, X, y, engine=engine, n_iter=6, cv=3, random_state=0, cache=cache,
+                                     store=store, max_fits=0.5, verbose=False)
+        assert len(trials) >= 6
+    store.close()
+
+
+def test_warm_start_scores_prior_best_first(data, tmp_path):
+    model, X, y = data
+    store = TrialStore(str(tmp_path / "store.sqlite"))
+    cache = FoldTransformCache()
+    _, best_params, _, _ = run_search(model, SPACE, X, y, n_iter=8, cv=3, random_state=0, cache=cache, store=store,
+                                      verbose=False)
+    _, _, _, trials = run_search(model, SPACE, X, y, engine="tpe", n_iter=4, cv=3, random_state=5, cache=cache,
+                                 store=store, warm_start=2, verbose=False)
+    assert trials[0][0] == best_params
+
+    # Prior candidates outside a narrower space are not used
+    narrow = {"svc__C": {"loguniform": [1e-2, 1e-1]}, "svc__class_weight": [None, "balanced"]}
+    _, _, _, trials = run_search(model, narrow, X, y, n_iter=3, cv=3, random_state=5, cache=cache, store=store,
+                                 warm_start=8, verbose=False)
+    assert all(1e-2 <= params["svc__C"] <= 1e-1 for params, _, _ in trials)
+    store.close()
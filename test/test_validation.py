@@ -1,10 +1,12 @@
 import pytest
 import pandas as pd
 import pandera as pa
+import numpy as np
 import os
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
-from validation import validate_dataset
+import validation
+from validation import validate_dataset, stratified_sample, check_feature_label_correlation, validate_in_chunks
 
 # Define a helper function to create temporary CSV files
 def create_temp_csv(data, file_name):
@@ -66,4 +68,116 @@ def test_file_not_found():
     """
     with pytest.raises(FileNotFoundError, match="Dataset file not found"):
         validate_dataset("non_existent_file.csv")
-        
\ No newline at end of file
+        
+def _wine_frame(n_rows=120):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "fixed acidity": rng.uniform(4, 15, n_rows),
+        "alcohol": rng.uniform(8, 14, n_rows),
+        "quality": rng.integers(4, 8, n_rows),
+    })
+
+def test_stratified_sample_keeps_class_proportions():
+    """
+    Test that the stratified sample has the requested size and the label proportions of the data.
+    """
+    df = pd.DataFrame({"alcohol": np.arange(100.0), "quality": [5] * 60 + [6] * 40})
+    sample = stratified_sample(df, 50)
+    assert len(sample) == 50
+    assert sample["quality"].value_counts().to_dict() == {5: 30, 6: 20}
+    assert stratified_sample(df, 500) is df
+
+def test_feature_label_correlation_escalates_near_threshold(monkeypatch):
+    """
+    Test that a sampled score near the threshold is recomputed on the full data.
+    """
+    calls = []
+    def fake_pps(df, label="quality"):
+        calls.append(len(df))
+        return {"alcohol": 0.88 if len(calls) == 1 else 0.5}
+    monkeypatch.setattr(validation, "feature_label_pps", fake_pps)
+
+    result = check_feature_label_correlation(_wine_frame(), sample_size=40, margin=0.05)
+    assert calls == [40, 120]
+    assert result["pps"] == {"alcohol": 0.5} and not result["sampled"]
+
+    calls.clear()
+    result = check_feature_label_correlation(_wine_frame(), sample_size=40, margin=0.01)
+    assert calls == [40]
+    assert result["sampled"]
+
+def test_feature_label_correlation_cache(monkeypatch, tmp_path):
+    """
+    Test that scores are cached by dataset content and recomputed when the data changes.
+    """
+    calls = []
+    def fake_pps(df, label="quality"):
+        calls.append(len(df))
+        return {"alcohol": 0.2}
+    monkeypatch.setattr(validation, "feature_label_pps", fake_pps)
+    df = _wine_frame()
+
+    assert not check_feature_label_correlation(df, cache_dir=str(tmp_path))["cached"]
+    assert check_feature_label_correlation(df.copy(), cache_dir=str(tmp_path))["cached"]
+    assert len(calls) == 1
+
+    changed = df.copy()
+    changed.loc[0, "alcohol"] += 1
+    assert not check_feature_label_correlation(changed, cache_dir=str(tmp_path))["cached"]
+    assert not check_feature_label_correlation(df, sample_size=40, cache_dir=str(tmp_path))["cached"]
+    assert len(calls) == 3
+
+def _full_wine_frame(n_rows=200):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        "fixed acidity": rng.uniform(4, 15, n_rows),
+        "volatile acidity": rng.uniform(0.1, 1.5, n_rows),
+        "citric acid": rng.uniform(0, 1, n_rows),
+        "residual sugar": rng.uniform(1, 15, n_rows),
+        "chlorides": rng.uniform(0.01, 0.6, n_rows),
+        "free sulfur dioxide": rng.uniform(1, 70, n_rows),
+        "total sulfur dioxide": rng.uniform(6, 280, n_rows),
+        "density": rng.uniform(0.99, 1.0, n_rows),
+        "pH": rng.uniform(2.7, 4.0, n_rows),
+        "sulphates": rng.uniform(0.3, 2.0, n_rows),
+        "alcohol": rng.uniform(8, 15, n_rows),
+        "quality": rng.integers(3, 9, n_rows),
+    })
+    return df
+
+def test_validate_in_chunks(tmp_path, capsys):
+    """
+    Test that chunked validation passes valid data and reports failures across chunks.
+    """
+    df = _full_wine_frame()
+    path = tmp_path / "chunked.csv"
+    df.to_csv(path, index=False)
+    validate_in_chunks(str(path), chunksize=2000, workers=2, pps_sample_size=100)
+    assert "Deepchecks validation passed successfully." in capsys.readouterr().out
+
+    # A duplicate of the first row at the end of the file and an out-of-bounds pH in the middle
+    invalid = pd.concat([df, df.iloc[[0]]], ignore_index=True)
+    invalid.loc[100, "pH"] = 15.0
+    invalid.to_csv(path, index=False)
+    with pytest.raises(ValueError, match="Bounds validation failed"):
+        validate_in_chunks(str(path), chunksize=2000, workers=2, pps_sample_size=100)
+    out = capsys.readouterr().out
+    assert "Duplicate rows found." in out and "[200]" in out
+    assert "[15.0]" in out
+
+    # Without a sample, every chunk would be sent back to the parent process
+    with pytest.raises(ValueError, match="needs a pps_sample_size"):
+        validate_in_chunks(str(path), chunksize=2000, workers=2)
+
+def test_custom_checks_are_validated(tmp_path, monkeypatch):
+    """
+    Test that checks the bounds pass does not recognise still fail validation, in one pass and in chunks.
+    """
+    custom = validation.schema.update_columns({"chlorides": {"checks": [pa.Check(lambda s: s < 0.5)]}})
+    monkeypatch.setattr(validation, "schema", custom)
+    path = tmp_path / "custom.csv"
+    _full_wine_frame().to_csv(path, index=False)
+    with pytest.raises(pa.errors.SchemaError):
+        validate_dataset(str(path))
+    with pytest.raises(pa.errors.SchemaError):
+        validate_in_chunks(str(path), chunksize=2000, workers=2, pps_sample_size=100)